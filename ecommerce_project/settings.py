@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 from datetime import timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +46,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'store.middleware.MetricsMiddleware',
+    'store.middleware.PerformanceMiddleware',
+    'store.middleware.TrafficCaptureMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,13 +56,71 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'store.db_router.ReplicaPinMiddleware',
 ]
 
+# Serve the product list/detail and category list with async views on the async ORM.
+# Worth it under ASGI (ecommerce_project.asgi); under WSGI each request would need its own event loop.
+ASYNC_CATALOG_VIEWS = config('ASYNC_CATALOG_VIEWS', default=False, cast=bool)
+
+# Per-request timing (Server-Timing header plus a JSON log line on store.performance).
+# Off by default; when off the middleware drops out of the chain entirely.
+PERFORMANCE = {
+    'ENABLED': config('PERFORMANCE_MIDDLEWARE', default=False, cast=bool),
+    'SERVER_TIMING': config('PERFORMANCE_SERVER_TIMING', default=True, cast=bool),
+    'SLOW_REQUEST_MS': config('PERFORMANCE_SLOW_REQUEST_MS', default=500, cast=float),
+    'SLOW_QUERY_LIMIT': 10,  # Statements logged for a slow request, slowest first
+}
+
+# Per-view latency histograms, status codes and query counts, served at
+# /api/metrics/ in the Prometheus text format to scrapers sending METRICS_TOKEN
+# as a Bearer token; without a token the endpoint refuses every request. Set
+# METRICS_DIRECTORY to a path all workers can write to so each one reports the
+# totals of the whole server.
+METRICS = {
+    'ENABLED': config('METRICS_ENABLED', default=True, cast=bool),
+    'DIRECTORY': config('METRICS_DIRECTORY', default=None),
+    'FLUSH_INTERVAL': config('METRICS_FLUSH_INTERVAL', default=5, cast=float),
+    'BUCKETS': None,  # Seconds; None uses store.metrics.DEFAULT_BUCKETS
+    'TOKEN': config('METRICS_TOKEN', default=None),  # Bearer token required to scrape
+}
+
+# Samples requests into a JSONL file for `manage.py replay_traffic`. Bodies are
+# recorded with strings masked and users as pseudonyms. Off by default.
+TRAFFIC_CAPTURE = {
+    'ENABLED': config('TRAFFIC_CAPTURE', default=False, cast=bool),
+    'PATH': config('TRAFFIC_CAPTURE_PATH', default=os.path.join(BASE_DIR, 'traffic.jsonl')),
+    'SAMPLE_RATE': config('TRAFFIC_CAPTURE_SAMPLE_RATE', default=0.01, cast=float),
+    'MAX_BODY_BYTES': 64 * 1024,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'store': {'handlers': ['console'], 'level': config('STORE_LOG_LEVEL', default='WARNING')},
+        'store.performance': {'level': config('PERFORMANCE_LOG_LEVEL', default='INFO')},
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'store.authentication.CustomJWTAuthentication',
     ),
     'EXCEPTION_HANDLER': 'store.exceptions.custom_exception_handler',
+    # orjson-backed JSON in and out when it is installed (store.renderers, store.parsers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'store.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'store.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'PAGE_SIZE': 10,
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
 }
@@ -75,6 +136,35 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Cache of decoded tokens and authenticated users (store.authentication)
+AUTH_CACHE = {
+    'USER_TTL': config('AUTH_CACHE_USER_TTL', default=60, cast=int),
+    'MAX_USERS': 10000,
+    'MAX_TOKENS': 10000,
+    'SHARED_CACHE': config('AUTH_CACHE_SHARED_ALIAS', default=None),  # e.g. 'default'
+}
+
+# Caching. Defaults to per-process local memory; point CACHE_BACKEND/CACHE_LOCATION
+# at Redis or Memcached to share cached responses between workers.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Versioned cache of catalog read endpoints (store.cache)
+RESPONSE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int),
+}
+
+# Stored order responses are replayed for retried Idempotency-Keys until
+# purge_idempotency_keys removes them, TTL seconds after they were created.
+IDEMPOTENCY = {
+    'TTL': config('IDEMPOTENCY_KEY_TTL', default=86400, cast=int),
+}
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -106,17 +196,54 @@ WSGI_APPLICATION = 'ecommerce_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Opening a connection (TCP, TLS, authentication) can cost more than a short
+# request's queries. With DATABASE_POOL each worker process keeps a pool of
+# open connections (store.backends.postgresql, store.pool) that requests borrow;
+# without it DATABASE_CONN_MAX_AGE keeps each thread's own connection open.
+DATABASE_POOL = {
+    'max_size': config('DATABASE_POOL_MAX_SIZE', default=10, cast=int),
+    'min_size': config('DATABASE_POOL_MIN_SIZE', default=0, cast=int),
+    'max_lifetime': config('DATABASE_POOL_MAX_LIFETIME', default=1800, cast=float),  # Seconds
+    'max_idle': config('DATABASE_POOL_MAX_IDLE', default=300, cast=float),  # Seconds, beyond min_size
+    'timeout': config('DATABASE_POOL_TIMEOUT', default=30, cast=float),  # Seconds to wait for a free connection
+    'check_after': config('DATABASE_POOL_CHECK_AFTER', default=1, cast=float),  # Ping connections idle longer
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'store.backends.postgresql',
         'NAME': config('DATABASE_NAME'),
         'USER': config('DATABASE_USER'),
         'PASSWORD': config('DATABASE_PASSWORD'),
         'HOST': config('DATABASE_HOST'),
         'PORT': config('DATABASE_PORT'),
+        'OPTIONS': {'pool': DATABASE_POOL} if config('DATABASE_POOL', default=False, cast=bool) else {},
+        # Must stay 0 with the pool, which keeps connections open itself
+        'CONN_MAX_AGE': config('DATABASE_CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas: safe requests to the catalog and order list views read from
+# these, one replica after another. A user who has just written is pinned to
+# the primary for PIN_SECONDS so they read their own writes despite replica lag.
+for _number, _host in enumerate(config('DATABASE_REPLICA_HOSTS', default='', cast=Csv()), 1):
+    DATABASES[f'replica{_number}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        # By default tests see the replica as the primary under another name. Turn the
+        # mirror off to give each replica its own test database (store.tests.test_db_router).
+        'TEST': {'MIRROR': 'default'} if config('DATABASE_REPLICA_TEST_MIRROR', default=True, cast=bool) else {},
+    }
+
+REPLICAS = {
+    'ALIASES': [alias for alias in DATABASES if alias != 'default'],
+    'PIN_SECONDS': config('DATABASE_REPLICA_PIN_SECONDS', default=5, cast=int),
+    'CACHE_ALIAS': 'default',  # Must be shared by all workers for pins to hold across them
+}
+
+DATABASE_ROUTERS = ['store.db_router.ReplicaRouter']
+
 AUTH_USER_MODEL = 'store.CustomUser'
 
 PASSWORD_HASHERS = [
@@ -126,7 +253,9 @@ PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.Argon2PasswordHasher',
 ]
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Use 'django.core.mail.backends.locmem.EmailBackend' or the filebased backend to keep mail local
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=os.path.join(BASE_DIR, 'sent_emails'))
 EMAIL_HOST = config('EMAIL_HOST')
 EMAIL_PORT = config('EMAIL_PORT', cast=int) 
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', cast=bool)
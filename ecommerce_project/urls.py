@@ -26,6 +26,7 @@ urlpatterns = [
     path('api/categories/', include('store.urls.category')),
     path('api/orders/', include('store.urls.order')),
     path('api/cart/', include('store.urls.cart')),
+    path('api/metrics/', include('store.urls.metrics')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 if settings.DEBUG:  # Only serve media files during development
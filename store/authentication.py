@@ -1,8 +1,145 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import get_user_model
 
+
+class ExpiringLRU:
+    """Thread-safe LRU mapping whose entries also expire at a given time."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class AuthCache:
+    """
+    Caches decoded access tokens and the users they belong to.
+
+    Users live in a per-process LRU for ``USER_TTL`` seconds and, when
+    ``SHARED_CACHE`` names a Django cache alias, in that cache as a second
+    tier shared between workers. Decoded tokens are kept until they expire.
+    Entries are dropped by the CustomUser save/delete signals; other workers'
+    local copies can lag behind by at most ``USER_TTL``.
+    """
+
+    key_prefix = 'store:auth:user:'
+
+    def __init__(self, options=None):
+        options = {**getattr(settings, 'AUTH_CACHE', {}), **(options or {})}
+        self.user_ttl = options.get('USER_TTL', 60)
+        self.users = ExpiringLRU(options.get('MAX_USERS', 10000))
+        self.tokens = ExpiringLRU(options.get('MAX_TOKENS', 10000))
+        self.shared_alias = options.get('SHARED_CACHE')
+        self.counters = dict.fromkeys(
+            ('user_hits', 'user_shared_hits', 'user_misses', 'token_hits', 'token_misses'), 0
+        )
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias] if self.shared_alias else None
+
+    def decode(self, token):
+        """Return the user id of a valid access token, decoding it only once."""
+        user_id = self.tokens.get(token)
+        if user_id is not None:
+            self.counters['token_hits'] += 1
+            return user_id
+        self.counters['token_misses'] += 1
+        decoded_token = AccessToken(token)
+        user_id = decoded_token.get('user_id')
+        self.tokens.set(token, user_id, decoded_token['exp'])
+        return user_id
+
+    def get_user(self, user_id):
+        user = self.users.get(user_id)
+        if user is not None:
+            self.counters['user_hits'] += 1
+            return copy.copy(user)
+
+        shared = self.shared
+        if shared is not None:
+            user = shared.get(f'{self.key_prefix}{user_id}')
+            if user is not None:
+                self.counters['user_shared_hits'] += 1
+                self.users.set(user_id, user, time.time() + self.user_ttl)
+                return copy.copy(user)
+
+        self.counters['user_misses'] += 1
+        user = get_user_model().objects.get(id=user_id)
+        self.users.set(user_id, user, time.time() + self.user_ttl)
+        if shared is not None:
+            shared.set(f'{self.key_prefix}{user_id}', user, self.user_ttl)
+        return copy.copy(user)
+
+    def invalidate_user(self, user_id):
+        self.users.delete(user_id)
+        shared = self.shared
+        if shared is not None:
+            shared.delete(f'{self.key_prefix}{user_id}')
+
+    def clear(self):
+        self.users.clear()
+        self.tokens.clear()
+        for name in self.counters:
+            self.counters[name] = 0
+
+    def stats(self):
+        lookups = self.counters['user_hits'] + self.counters['user_shared_hits'] + self.counters['user_misses']
+        hits = self.counters['user_hits'] + self.counters['user_shared_hits']
+        return {
+            **self.counters,
+            'user_hit_ratio': hits / lookups if lookups else 0.0,
+            'cached_users': len(self.users),
+            'cached_tokens': len(self.tokens),
+        }
+
+
+auth_cache = AuthCache()
+
+
+def get_auth_cache_stats():
+    return auth_cache.stats()
+
+
 class CustomJWTAuthentication(BaseAuthentication):
     def authenticate(self, request):
         auth_header = request.headers.get('Authorization')
@@ -14,10 +151,9 @@ class CustomJWTAuthentication(BaseAuthentication):
             if prefix.lower() != 'bearer':
                 raise AuthenticationFailed('Invalid token header. No credentials provided.')
 
-            # Decode the token and get user info
-            decoded_token = AccessToken(token)
-            user_id = decoded_token.get('user_id')
-            user = get_user_model().objects.get(id=user_id)
+            # Decode the token and get user info, both served from cache when possible
+            user_id = auth_cache.decode(token)
+            user = auth_cache.get_user(user_id)
         except (ValueError, get_user_model().DoesNotExist):
             raise AuthenticationFailed('Invalid token.')
 
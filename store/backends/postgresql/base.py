@@ -0,0 +1,95 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from django.db.backends.postgresql import base, creation
+
+from store.pool import ConnectionPool, PoolTimeout, close_pool, get_pool
+
+# psycopg's transaction status codes (the same numbers in psycopg2 and psycopg 3)
+IDLE, INTRANS, INERROR = 0, 2, 3
+
+
+def check(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def reset(connection):
+    """Roll back whatever transaction ``connection`` was left in; False if it cannot be reused."""
+    if connection.closed:
+        return False
+    try:
+        status = connection.info.transaction_status
+        if status in (INTRANS, INERROR):
+            connection.rollback()
+            status = connection.info.transaction_status
+    except base.Database.Error:
+        return False
+    return status == IDLE
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the test database busy and block DROP DATABASE
+        close_pool((self.connection.alias, test_database_name))
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Django's PostgreSQL backend, with connections borrowed from a pool.
+
+    ``OPTIONS['pool']`` (True, or a dict of ConnectionPool arguments) turns
+    the pool on; without it this is Django's backend unchanged. Each process
+    keeps one pool per database, shared by its threads, so it works the same
+    for WSGI workers and for the thread ASGI runs sync code on. Django closes
+    connections at the end of every request, which here hands them back to
+    the pool, so CONN_MAX_AGE must stay 0.
+    """
+    creation_class = DatabaseCreation
+
+    def __init__(self, settings_dict, alias=DEFAULT_DB_ALIAS):
+        super().__init__(settings_dict, alias)
+        self.pool_options = settings_dict['OPTIONS'].get('pool')
+        if self.pool_options and settings_dict['CONN_MAX_AGE']:
+            raise ImproperlyConfigured(
+                f"DATABASES['{alias}'] has a connection pool: set CONN_MAX_AGE to 0, "
+                f"pooled connections are reused across requests anyway."
+            )
+
+    @property
+    def pool(self):
+        if not self.pool_options:
+            return None
+        return get_pool((self.alias, self.settings_dict['NAME']), self._create_pool)
+
+    def _create_pool(self):
+        conn_params = self.get_connection_params()
+        options = {} if self.pool_options is True else self.pool_options
+        return ConnectionPool(
+            connect=lambda: base.DatabaseWrapper.get_new_connection(self, conn_params),
+            check=check, reset=reset, **options,
+        )
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop('pool', None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        try:
+            return pool.checkout()
+        except PoolTimeout as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        if self.in_atomic_block:
+            # The wrapper keeps the connection until the atomic block exits, so no one else may have it
+            pool.discard(self.connection)
+        else:
+            pool.checkin(self.connection)
@@ -0,0 +1,162 @@
+import asyncio
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.db import connection, connections
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+
+@contextmanager
+def benchmark_database(keepdb=False, verbosity=0):
+    """
+    Run a benchmark against a throwaway test database.
+
+    Benchmarks write a lot of rows, so they never touch the configured database
+    directly. With ``keepdb`` the test database survives between runs, which
+    lets expensive seed data be reused.
+    """
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity, interactive=False, keepdb=keepdb, aliases={'default'})
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples`` (``pct`` in 0-100)."""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def time_call(func, repeat=20, warmup=2):
+    """Call ``func`` repeatedly and return the per-call timings in milliseconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    """Reduce a list of millisecond timings to the figures the reports print."""
+    return {
+        'runs': len(samples),
+        'mean_ms': round(statistics.fmean(samples), 3) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+    }
+
+
+def run_concurrently(func, requests, concurrency, teardown=None):
+    """
+    Make ``requests`` calls of ``func(worker)`` spread over ``concurrency`` threads.
+
+    ``worker`` is the thread's index, so callers can give each thread its own
+    client and fixtures; ``teardown(worker)``, if given, runs once the thread
+    is done. ``func`` returns whether the call succeeded. Returns the per-call
+    timings in milliseconds, the wall time in seconds and the number of
+    failed calls.
+    """
+    samples, failures = [], 0
+    lock = threading.Lock()
+    start_line = threading.Barrier(concurrency)
+    shares = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def worker(index):
+        nonlocal failures
+        local_samples, local_failures = [], 0
+        start_line.wait()
+        try:
+            for _ in range(shares[index]):
+                start = time.perf_counter()
+                ok = func(index)
+                local_samples.append((time.perf_counter() - start) * 1000)
+                local_failures += not ok
+        finally:
+            if teardown is not None:
+                teardown(index)
+            connection.close()
+        with lock:
+            samples.extend(local_samples)
+            failures += local_failures
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started, failures
+
+
+def run_asgi(application, paths, concurrency):
+    """
+    GET every path in ``paths`` from an ASGI ``application``, ``concurrency`` requests at a time.
+
+    Requests are driven on one event loop in this process, as one server
+    worker would run them, with no network in between. Returns the per-request
+    timings in milliseconds, the wall time in seconds and the number of
+    responses that were not 2xx.
+    """
+    async def request(url):
+        path, _, query = url.partition('?')
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(), 'query_string': query.encode(), 'root_path': '',
+            'headers': [(b'host', b'testserver')], 'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+        finished = asyncio.Event()
+        status = None
+        body_read = False
+
+        async def receive():
+            nonlocal body_read
+            if not body_read:
+                body_read = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await finished.wait()  # The client stays connected until the response is complete
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body' and not message.get('more_body'):
+                finished.set()
+
+        await application(scope, receive, send)
+        finished.set()
+        return status
+
+    async def main():
+        pending = iter(paths)
+        samples, failures = [], 0
+
+        async def client():
+            nonlocal failures
+            for url in pending:
+                start = time.perf_counter()
+                status = await request(url)
+                samples.append((time.perf_counter() - start) * 1000)
+                failures += not 200 <= (status or 0) < 300
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+        # Closes the connection of the thread sync_to_async ran the ORM on
+        await sync_to_async(connections.close_all)()
+        return samples, wall, failures
+
+    return asyncio.run(main())
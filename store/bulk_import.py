@@ -0,0 +1,165 @@
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Q
+from rest_framework import serializers
+
+from store.cache import invalidate
+from store.models import Category, Product
+from store.search import search_index
+from store.serializers import ProductSerializer
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+UPDATE_FIELDS = ['name', 'description', 'price', 'stock_quantity', 'category', 'image']
+ERROR_SAMPLE_SIZE = 100
+
+
+class ProductImportSerializer(ProductSerializer):
+    """
+    ProductSerializer for import rows: same fields and the same validate(),
+    but the category is a raw id or name (resolved once per chunk), the image
+    is a stored path, and an ``id`` marks the row as an update.
+    """
+    id = serializers.IntegerField(required=False, min_value=1)
+    category = serializers.CharField()
+    image = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    errors: list = field(default_factory=list)  # The first ERROR_SAMPLE_SIZE rejections; ``failed`` counts them all
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def read_rows(source, import_format):
+    """Yield ``(line number, row dict or None, parse error)`` from an open text file."""
+    if import_format == 'csv':
+        reader = csv.DictReader(source)
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if value != ''}, None
+        return
+    for line_number, line in enumerate(source, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, 'Each line must be a JSON object.'
+            continue
+        yield line_number, row, None
+
+
+def _resolve_categories(refs):
+    ids = {int(ref) for ref in refs if str(ref).isdigit()}
+    names = {ref for ref in refs if not str(ref).isdigit()}
+    by_ref = {}
+    for category in Category.objects.filter(Q(id__in=ids) | Q(name__in=names)):
+        by_ref[str(category.id)] = category
+        by_ref[category.name] = category
+    return by_ref
+
+
+def _record_rejected(rejected, report, writer):
+    rejected.sort(key=lambda error: error[0])
+    report.failed += len(rejected)
+    report.errors.extend(rejected[:ERROR_SAMPLE_SIZE - len(report.errors)])
+    if writer is not None:
+        writer.writerows([line_number, json.dumps(errors)] for line_number, errors in rejected)
+    rejected.clear()
+
+
+def _import_chunk(chunk, validator, created_by, batch_size, report, rejected):
+    valid = []
+    for line_number, row in chunk:
+        try:
+            valid.append((line_number, validator.run_validation(row)))
+        except serializers.ValidationError as e:
+            rejected.append((line_number, e.detail))
+
+    # One query per chunk for categories and for the products being updated
+    categories = _resolve_categories({data['category'] for _, data in valid})
+    existing = Product.objects.in_bulk([data['id'] for _, data in valid if 'id' in data])
+
+    to_create, to_update = [], []
+    for line_number, data in valid:
+        category = categories.get(str(data['category']))
+        if category is None:
+            rejected.append((line_number, {'category': [f"Category {data['category']} does not exist."]}))
+            continue
+        data['category'] = category
+        product_id = data.pop('id', None)
+        if product_id is None:
+            to_create.append(Product(created_by=created_by, **data))
+        elif product_id in existing:
+            product = existing[product_id]
+            for name, value in data.items():
+                setattr(product, name, value)
+            to_update.append(product)
+        else:
+            rejected.append((line_number, {'id': [f"Product with ID {product_id} does not exist."]}))
+
+    with transaction.atomic():
+        Product.objects.bulk_create(to_create, batch_size=batch_size)
+        Product.objects.bulk_update(to_update, UPDATE_FIELDS, batch_size=batch_size)
+    report.created += len(to_create)
+    report.updated += len(to_update)
+
+
+def import_products(source, import_format, created_by, chunk_size=1000, batch_size=1000, error_file=None):
+    """
+    Import products from an open CSV or NDJSON text stream.
+
+    Rows are validated ``chunk_size`` at a time with ProductImportSerializer and
+    written with bulk_create / bulk_update in ``batch_size`` batches. A row with
+    an ``id`` updates that product; any other row creates one. Rejected rows are
+    written to ``error_file`` as CSV, if given, as each chunk finishes; the
+    report keeps their count and only the first ``ERROR_SAMPLE_SIZE`` of them.
+    """
+    if import_format not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format {import_format!r}")
+
+    writer = None
+    if error_file is not None:
+        writer = csv.writer(error_file)
+        writer.writerow(['line', 'errors'])
+
+    report = ImportReport()
+    validator = ProductImportSerializer()
+    started = time.perf_counter()
+    chunk, rejected = [], []
+    for line_number, row, parse_error in read_rows(source, import_format):
+        report.rows += 1
+        if parse_error:
+            rejected.append((line_number, {'non_field_errors': [parse_error]}))
+        else:
+            chunk.append((line_number, row))
+        # Unparseable rows count toward the chunk too, so the pending errors stay bounded
+        if len(chunk) + len(rejected) >= chunk_size:
+            if chunk:
+                _import_chunk(chunk, validator, created_by, batch_size, report, rejected)
+            _record_rejected(rejected, report, writer)
+            chunk = []
+    if chunk:
+        _import_chunk(chunk, validator, created_by, batch_size, report, rejected)
+    _record_rejected(rejected, report, writer)
+    report.elapsed = time.perf_counter() - started
+
+    # Bulk writes bypass the model signals
+    if report.created or report.updated:
+        invalidate('product')
+        search_index.reset()
+    return report
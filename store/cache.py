@@ -0,0 +1,214 @@
+import functools
+import hashlib
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from rest_framework.response import Response
+
+from store.db_router import reading_from_replica, replica_aliases
+from store.responses import JSONResponse
+
+
+def _options():
+    return {
+        'ALIAS': 'default',
+        'TIMEOUT': 300,
+        'KEY_PREFIX': 'store:response',
+        **getattr(settings, 'RESPONSE_CACHE', {}),
+    }
+
+
+def _cache():
+    return caches[_options()['ALIAS']]
+
+
+def _version_key(namespace):
+    return f"{_options()['KEY_PREFIX']}:version:{namespace}"
+
+
+def _changed_key(namespace):
+    return f"{_options()['KEY_PREFIX']}:changed:{namespace}"
+
+
+def get_versions(*namespaces):
+    """
+    Current version of each namespace, fetched in one cache round trip.
+
+    A missing counter (never set, or evicted) starts from the clock rather
+    than 1, so a fresh counter can never collide with keys written under an
+    old one.
+    """
+    cache = _cache()
+    keys = [_version_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+        versions.append(found[key])
+    return versions
+
+
+async def _acall(cache, method, *args, **kwargs):
+    # Backends that never wait on I/O are called inline: their a*() methods would hop to a thread
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        return getattr(cache, method)(*args, **kwargs)
+    return await getattr(cache, f'a{method}')(*args, **kwargs)
+
+
+async def aget_versions(*namespaces):
+    cache = _cache()
+    keys = [_version_key(namespace) for namespace in namespaces]
+    found = await _acall(cache, 'get_many', keys)
+    versions = []
+    for key in keys:
+        if key not in found:
+            await _acall(cache, 'add', key, time.time_ns(), timeout=None)
+            found[key] = await _acall(cache, 'get', key)
+        versions.append(found[key])
+    return versions
+
+
+def bump_version(*namespaces):
+    """Invalidate every cached response built from ``namespaces``."""
+    cache = _cache()
+    for namespace in namespaces:
+        key = _version_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+    if replica_aliases():
+        # Replicas may lag this write by up to PIN_SECONDS; see recently_changed()
+        cache.set_many({_changed_key(namespace): 1 for namespace in namespaces}, settings.REPLICAS['PIN_SECONDS'])
+
+
+def recently_changed(*namespaces):
+    """Whether any of ``namespaces`` was written within ``REPLICAS['PIN_SECONDS']``, so a replica may not have it yet."""
+    return bool(_cache().get_many([_changed_key(namespace) for namespace in namespaces]))
+
+
+async def arecently_changed(*namespaces):
+    return bool(await _acall(_cache(), 'get_many', [_changed_key(namespace) for namespace in namespaces]))
+
+
+def invalidate(*namespaces):
+    """
+    Bump ``namespaces`` now and again once the current transaction commits.
+
+    The first bump stops the writer's own transaction from reading stale
+    entries; the second drops anything another request cached from the
+    pre-commit state in between.
+    """
+    bump_version(*namespaces)
+    transaction.on_commit(lambda: bump_version(*namespaces))
+
+
+class CacheStats:
+    """Per-process hit/miss counters of the response cache, by view."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+
+    def record(self, view_name, hit):
+        with self._lock:
+            (self.hits if hit else self.misses)[view_name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            views = set(self.hits) | set(self.misses)
+            report = {}
+            for view_name in sorted(views):
+                hits, misses = self.hits[view_name], self.misses[view_name]
+                report[view_name] = {'hits': hits, 'misses': misses, 'hit_ratio': hits / (hits + misses)}
+            return report
+
+    def clear(self):
+        with self._lock:
+            self.hits.clear()
+            self.misses.clear()
+
+
+cache_stats = CacheStats()
+
+
+def response_cache_stats():
+    return cache_stats.snapshot()
+
+
+def cache_key(view_name, versions, request, kwargs):
+    query = sorted((key, sorted(values)) for key, values in request.query_params.lists())
+    # Responses read from a lagging replica are never served to users pinned to the primary
+    raw = repr((request.get_host(), request.path, query, sorted(kwargs.items()), reading_from_replica()))
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    version = '.'.join(str(v) for v in versions)
+    return f"{_options()['KEY_PREFIX']}:{view_name}:{version}:{digest}"
+
+
+def cache_response(*namespaces):
+    """
+    Cache successful responses of a read-only view method.
+
+    Entries are keyed by the normalized query string plus the version of each
+    namespace (model) the response is built from, so bumping a version makes
+    every older entry unreachable without having to find and delete it.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            view_name = type(self).__name__
+            key = cache_key(view_name, get_versions(*namespaces), request, kwargs)
+            cache = _cache()
+            cached = cache.get(key)
+            if cached is not None:
+                cache_stats.record(view_name, hit=True)
+                data, status = cached
+                response = Response(data, status=status)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            cache_stats.record(view_name, hit=False)
+            response = method(self, request, *args, **kwargs)
+            # A lagging replica may have answered with pre-write rows; stored under the new version they would
+            # be served until the entry expires
+            if response.status_code == 200 and not (reading_from_replica() and recently_changed(*namespaces)):
+                cache.set(key, (response.data, response.status_code), _options()['TIMEOUT'])
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def acache_response(*namespaces):
+    """cache_response for async view methods returning a store.responses.JSONResponse."""
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, request, *args, **kwargs):
+            view_name = type(self).__name__
+            key = cache_key(view_name, await aget_versions(*namespaces), request, kwargs)
+            cache = _cache()
+            cached = await _acall(cache, 'get', key)
+            if cached is not None:
+                cache_stats.record(view_name, hit=True)
+                data, status = cached
+                response = JSONResponse(data, status=status)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            cache_stats.record(view_name, hit=False)
+            response = await method(self, request, *args, **kwargs)
+            if response.status_code == 200 and not (reading_from_replica() and await arecently_changed(*namespaces)):
+                await _acall(cache, 'set', key, (response.data, response.status_code), _options()['TIMEOUT'])
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
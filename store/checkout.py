@@ -0,0 +1,72 @@
+from collections import Counter
+
+from django.db import transaction
+
+from store.exceptions import EmptyCart
+from store.inventory import reserve_stock
+from store.models import CartItem, Order, OrderItem
+
+
+def place_order(user, lines, shipping_address, payment_method):
+    """
+    Create an order for ``lines`` ((product id, quantity) pairs), taking the stock.
+
+    Stock is reserved with reserve_stock, so InsufficientStock is raised and
+    nothing is written if any line cannot be filled. Prices come from the
+    locked product rows and the items go in with one INSERT, so the number of
+    queries does not depend on the number of lines.
+    """
+    quantities = Counter()
+    for product_id, quantity in lines:
+        quantities[product_id] += quantity
+
+    with transaction.atomic():
+        products = reserve_stock(quantities)
+
+        items = []
+        total_price = 0
+        for product_id, quantity in lines:
+            product = products[product_id]
+            item_price = product.price * quantity
+            total_price += item_price
+            items.append(OrderItem(product=product, quantity=quantity, price=item_price))
+
+        order = Order.objects.create(
+            user=user,
+            shipping_address=shipping_address,
+            payment_method=payment_method,
+            total_price=total_price,
+        )
+        for item in items:
+            item.order = order
+        OrderItem.objects.bulk_create(items)
+    return order
+
+
+def checkout_cart(user, shipping_address, payment_method):
+    """
+    Turn the user's cart into an order and empty the cart, all in one transaction.
+
+    The cart lines are locked first so a concurrent add or a second checkout of
+    the same cart waits for this one. Raises EmptyCart if there is nothing to
+    order and InsufficientStock (with the cart left untouched) if the stock no
+    longer covers it.
+    """
+    with transaction.atomic():
+        lines = list(
+            CartItem.objects.select_for_update()
+            .filter(cart__user=user)
+            .order_by('id')
+            .values_list('id', 'product_id', 'quantity')
+        )
+        if not lines:
+            raise EmptyCart()
+
+        order = place_order(
+            user,
+            [(product_id, quantity) for _, product_id, quantity in lines],
+            shipping_address,
+            payment_method,
+        )
+        CartItem.objects.filter(id__in=[line_id for line_id, _, _ in lines]).delete()
+    return order
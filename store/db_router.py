@@ -0,0 +1,135 @@
+import itertools
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from store.middleware import AsyncCapableMiddleware
+
+# Set for the duration of a safe request to a replica-enabled view
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+_rotation = itertools.count()
+
+
+def reading_from_replica():
+    return _read_from_replica.get()
+
+
+def replica_aliases():
+    return settings.REPLICAS['ALIASES']
+
+
+def _pin_key(user_id):
+    return f'store:db:pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """Send ``user_id``'s reads to the primary for ``REPLICAS['PIN_SECONDS']``, so they see their own writes."""
+    if replica_aliases():
+        caches[settings.REPLICAS['CACHE_ALIAS']].set(_pin_key(user_id), 1, settings.REPLICAS['PIN_SECONDS'])
+
+
+async def apin_to_primary(user_id):
+    if replica_aliases():
+        await caches[settings.REPLICAS['CACHE_ALIAS']].aset(_pin_key(user_id), 1, settings.REPLICAS['PIN_SECONDS'])
+
+
+def is_pinned(user_id):
+    return caches[settings.REPLICAS['CACHE_ALIAS']].get(_pin_key(user_id)) is not None
+
+
+async def ais_pinned(user_id):
+    return await caches[settings.REPLICAS['CACHE_ALIAS']].aget(_pin_key(user_id)) is not None
+
+
+class use_replica:
+    """Route reads made inside this block to a replica (a no-op when none are configured)."""
+
+    def __enter__(self):
+        self.token = _read_from_replica.set(bool(replica_aliases()))
+
+    def __exit__(self, *exc_info):
+        _read_from_replica.reset(self.token)
+
+
+class ReplicaRouter:
+    """
+    Reads go to a replica inside use_replica(), everything else to ``default``.
+
+    Replicas are taken in turn. A read inside a transaction on ``default``
+    stays there, so it sees the transaction's own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get() or connections['default'].in_atomic_block:
+            return 'default'
+        aliases = replica_aliases()
+        return aliases[next(_rotation) % len(aliases)]
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+
+class ReadReplicaMixin:
+    """
+    For APIViews whose safe requests may be served from a replica.
+
+    Routing is decided after authentication, so a user pinned by a recent
+    write keeps reading from the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and replica_aliases():
+            user = request.user
+            if not (user.is_authenticated and is_pinned(user.pk)):
+                self._replica_token = _read_from_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_replica_token', None)
+        if token is not None:
+            _read_from_replica.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+def _writer(request, response):
+    """The authenticated user who just wrote successfully in ``request``, if any."""
+    if request.method in SAFE_METHODS or response.status_code >= 400:
+        return None
+    user = getattr(request, 'user', None)
+    return user if user is not None and user.is_authenticated else None
+
+
+class ReplicaPinMiddleware(AsyncCapableMiddleware):
+    """Pin users to the primary after a successful write. Unused when no replica is configured."""
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed()
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        user = _writer(request, response)
+        if user is not None:
+            pin_to_primary(user.pk)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        user = _writer(request, response)
+        if user is not None:
+            await apin_to_primary(user.pk)
+        return response
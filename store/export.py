@@ -0,0 +1,92 @@
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from store.models import Product
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+# (output column, Product.values() lookup)
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('name', 'name'),
+    ('description', 'description'),
+    ('price', 'price'),
+    ('stock_quantity', 'stock_quantity'),
+    ('category_id', 'category_id'),
+    ('category', 'category__name'),
+    ('image', 'image'),
+]
+
+# Rows are grouped into writes of roughly this many bytes
+FLUSH_BYTES = 64 * 1024
+
+
+def export_rows(chunk_size=2000):
+    """
+    Yield every product as a plain dict, in id order.
+
+    ``iterator()`` streams from a server-side cursor on PostgreSQL (and in
+    ``chunk_size`` batches elsewhere), so memory does not grow with the catalog.
+    """
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    for values in Product.objects.order_by('id').values_list(*lookups).iterator(chunk_size=chunk_size):
+        yield dict(zip((column for column, _ in EXPORT_COLUMNS), values))
+
+
+def _buffered(lines):
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def ndjson_chunks(rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    return _buffered(encoder.encode(row) + '\n' for row in rows)
+
+
+class _Line:
+    """File-like object that hands back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(rows):
+    writer = csv.writer(_Line())
+
+    def lines():
+        yield writer.writerow([column for column, _ in EXPORT_COLUMNS])
+        for row in rows:
+            yield writer.writerow(row.values())
+
+    return _buffered(lines())
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a stream of byte chunks on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_chunks(export_format='ndjson', gzip=False, chunk_size=2000):
+    """Byte chunks of the whole catalog in ``export_format``, optionally gzipped."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {export_format!r}")
+    rows = export_rows(chunk_size=chunk_size)
+    chunks = ndjson_chunks(rows) if export_format == 'ndjson' else csv_chunks(rows)
+    return gzip_chunks(chunks) if gzip else chunks
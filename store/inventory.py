@@ -0,0 +1,70 @@
+from django.db import transaction
+from django.db.models import Case, F, Q, When
+
+from store.cache import invalidate
+from store.exceptions import InsufficientStock
+from store.models import Product
+
+
+class _StockChanged(Exception):
+    """The guarded UPDATE skipped a row: its stock changed after it was read."""
+
+
+def _shortages(quantities, stock_by_id):
+    return {
+        product_id: stock_by_id.get(product_id)
+        for product_id, quantity in quantities.items()
+        if stock_by_id.get(product_id) is None or stock_by_id[product_id] < quantity
+    }
+
+
+def check_stock(quantities):
+    """
+    Raise InsufficientStock unless every product has the requested units.
+
+    ``quantities`` maps product ids to units. This only reads, so callers that
+    do not hold stock (like the cart) get the same answer as reserve_stock would
+    give at this moment.
+    """
+    stock_by_id = dict(Product.objects.filter(id__in=list(quantities)).values_list('id', 'stock_quantity'))
+    shortages = _shortages(quantities, stock_by_id)
+    if shortages:
+        raise InsufficientStock(shortages)
+
+
+def reserve_stock(quantities):
+    """
+    Take ``quantities`` (product id -> units) out of stock, all or nothing.
+
+    The rows are locked in id order so concurrent reservations over
+    overlapping products cannot deadlock, then decremented with one guarded
+    UPDATE (``stock_quantity >= units``). If the guard skips any row the whole
+    reservation is rolled back and InsufficientStock is raised. Returns the
+    locked products keyed by id, with their pre-reservation stock.
+    """
+    try:
+        with transaction.atomic():
+            products = {
+                product.id: product
+                for product in Product.objects.select_for_update().filter(id__in=list(quantities)).order_by('id')
+            }
+            shortages = _shortages(quantities, {product_id: product.stock_quantity for product_id, product in products.items()})
+            if shortages:
+                raise InsufficientStock(shortages)
+
+            enough_stock = Q()
+            new_stock = []
+            for product_id, quantity in quantities.items():
+                enough_stock |= Q(id=product_id, stock_quantity__gte=quantity)
+                new_stock.append(When(id=product_id, then=F('stock_quantity') - quantity))
+            if Product.objects.filter(enough_stock).update(stock_quantity=Case(*new_stock)) != len(quantities):
+                raise _StockChanged  # Leaving the block rolls back the rows the guard let through
+
+            # Cached product responses show stock levels
+            invalidate('product')
+    except _StockChanged:
+        # Only reachable where row locks are unavailable (e.g. SQLite). Read after the rollback,
+        # so the rows this reservation decremented show their real stock again
+        stock_by_id = dict(Product.objects.filter(id__in=list(quantities)).values_list('id', 'stock_quantity'))
+        raise InsufficientStock(_shortages(quantities, stock_by_id)) from None
+    return products
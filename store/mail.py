@@ -0,0 +1,73 @@
+import logging
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from store.models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts, base_seconds=30, max_seconds=3600):
+    """Exponential backoff: 30s, 60s, 120s, ... capped at an hour."""
+    return timedelta(seconds=min(base_seconds * 2 ** (attempts - 1), max_seconds))
+
+
+def send_pending(batch_size=100, max_attempts=5):
+    """
+    Send one batch of due outbox emails over a single mail connection.
+
+    Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several
+    workers can drain the outbox side by side. Failed sends are rescheduled
+    with exponential backoff until ``max_attempts`` is reached, after which
+    the row is marked failed. Returns ``(sent, failed)`` for the batch.
+    """
+    sent = failed = 0
+    with transaction.atomic():
+        batch = list(OutboxEmail.objects.due().select_for_update(skip_locked=True)[:batch_size])
+        if not batch:
+            return sent, failed
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            open_error = None
+        except Exception as e:
+            open_error = e
+
+        now = timezone.now()
+        try:
+            for email in batch:
+                error = open_error
+                if error is None:
+                    try:
+                        EmailMessage(
+                            email.subject, email.body, email.from_email, email.recipients,
+                            connection=connection,
+                        ).send()
+                    except Exception as e:
+                        error = e
+
+                email.attempts += 1
+                if error is None:
+                    email.status = 'sent'
+                    email.sent_at = now
+                    email.last_error = ''
+                    sent += 1
+                    continue
+
+                logger.warning("Sending outbox email %s failed (attempt %s): %s", email.id, email.attempts, error)
+                email.last_error = str(error)
+                if email.attempts >= max_attempts:
+                    email.status = 'failed'
+                else:
+                    email.next_attempt_at = now + retry_delay(email.attempts)
+                failed += 1
+        finally:
+            if open_error is None:
+                connection.close()
+
+        OutboxEmail.objects.bulk_update(batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'])
+    return sent, failed
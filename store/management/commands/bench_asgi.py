@@ -0,0 +1,127 @@
+import json
+import logging
+import random
+import time
+import types
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.urls import path
+
+from ecommerce_project.urls import urlpatterns as project_urlpatterns
+from store.benchmarks import benchmark_database, run_asgi, summarize
+from store.middleware import wrap_queries
+from store.models import Category, Product
+from store.seeding import seed_store
+from store.views import AsyncCategoryListView, AsyncProductDetailView, AsyncProductListView
+
+ENDPOINTS = ('product-list', 'product-detail', 'category-list')
+
+
+def async_urlconf():
+    """The project's routes as with ASYNC_CATALOG_VIEWS=True."""
+    module = types.ModuleType('bench_asgi_urls')
+    module.urlpatterns = [
+        path('api/products/', AsyncProductListView.as_view(), name='product-list'),
+        path('api/products/<int:pk>/', AsyncProductDetailView.as_view(), name='product-detail'),
+        path('api/categories/all/', AsyncCategoryListView.as_view(), name='category-list'),
+    ] + project_urlpatterns
+    return module
+
+
+class Command(BaseCommand):
+    help = (
+        'Serve the catalog reads through the ASGI application, with the sync views and with their async '
+        'versions (ASYNC_CATALOG_VIEWS), at several concurrency levels, and report throughput and latency. '
+        'Requests run in-process on one event loop, i.e. as one ASGI worker.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='Requests per endpoint, mode and concurrency level.')
+        parser.add_argument('--concurrency', default='1,16,64', help='Comma-separated numbers of requests in flight.')
+        parser.add_argument('--products', type=int, default=10_000, help='Seeded products.')
+        parser.add_argument('--only', default='', help=f'Comma-separated endpoints to run (default: {",".join(ENDPOINTS)}).')
+        parser.add_argument('--db-latency-ms', type=float, default=0.0, help=(
+            'Sleep this long in every query, as a stand-in for the network round trip to a remote PostgreSQL.'
+        ))
+        parser.add_argument('--cache', action='store_true', help='Keep the response cache on (by default every request reaches the database).')
+        parser.add_argument('--output', default=None, help='Also write the results as JSON here.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        only = [name for name in options['only'].split(',') if name] or list(ENDPOINTS)
+        unknown = set(only) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f'Unknown endpoints: {", ".join(sorted(unknown))}. Choose from {", ".join(ENDPOINTS)}.')
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        rng = random.Random(options['seed'])
+
+        overrides = {'DEBUG': False}
+        if not options['cache']:
+            overrides['CACHES'] = {**settings.CACHES, 'bench-asgi': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+            overrides['RESPONSE_CACHE'] = {**settings.RESPONSE_CACHE, 'ALIAS': 'bench-asgi'}
+
+        latency = options['db_latency_ms'] / 1000
+
+        def slow_query(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        results = {}
+        logging.disable(logging.ERROR)
+        try:
+            with override_settings(**overrides), benchmark_database():
+                self.stdout.write('Seeding...')
+                seed_store(
+                    users=100, categories=max(1, options['products'] // 500), products=options['products'],
+                    carts=0, orders=0, seed=options['seed'],
+                )
+                product_ids = list(Product.objects.values_list('id', flat=True))
+                pages = max(1, len(product_ids) // 10)
+                urls = {
+                    'product-list': lambda: f'/api/products/?page={rng.randint(1, min(pages, 100))}',
+                    'product-detail': lambda: f'/api/products/{rng.choice(product_ids)}/',
+                    'category-list': lambda: '/api/categories/all/',
+                }
+                self.stdout.write(f'{Category.objects.count()} categories, {len(product_ids)} products on {connection.vendor}')
+
+                application = get_asgi_application()
+                for name in only:
+                    for mode, urlconf in (('sync', settings.ROOT_URLCONF), ('async', async_urlconf())):
+                        with override_settings(ROOT_URLCONF=urlconf), wrap_queries(slow_query) if latency else nullcontext():
+                            run_asgi(application, [urls[name]() for _ in range(20)], 4)  # Warm-up
+                            for level in levels:
+                                samples, wall, failures = run_asgi(
+                                    application, [urls[name]() for _ in range(options['requests'])], level,
+                                )
+                                results.setdefault(name, {}).setdefault(mode, {})[level] = {
+                                    **summarize(samples),
+                                    'errors': failures,
+                                    'throughput_rps': round(len(samples) / wall, 1) if wall else 0.0,
+                                }
+                    self.stdout.write(f'{name:<16} done')
+        finally:
+            logging.disable(logging.NOTSET)
+
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'db_latency_ms': options['db_latency_ms'], 'cache': options['cache'], 'results': results}, f, indent=2)
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"endpoint":<16}{"in flight":>10}{"sync req/s":>12}{"async req/s":>13}{"change":>9}'
+            f'{"sync p99":>10}{"async p99":>11}{"errors":>8}'
+        )
+        for name, modes in results.items():
+            for level, sync in modes['sync'].items():
+                async_ = modes['async'][level]
+                change = (async_['throughput_rps'] / sync['throughput_rps'] - 1) * 100 if sync['throughput_rps'] else 0.0
+                self.stdout.write(
+                    f'{name:<16}{level:>10}{sync["throughput_rps"]:>12.1f}{async_["throughput_rps"]:>13.1f}{change:>+8.1f}%'
+                    f'{sync["p99_ms"]:>10.2f}{async_["p99_ms"]:>11.2f}{sync["errors"] + async_["errors"]:>8}'
+                )
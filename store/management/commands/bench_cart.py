@@ -0,0 +1,54 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from store.benchmarks import benchmark_database, summarize, time_call
+from store.models import Cart, CartItem, Category, CustomUser, Product
+
+
+def legacy_add(user, product_id, quantity):
+    """The add-to-cart path before the upsert, statement for statement."""
+    product = Product.objects.get(id=product_id)
+    cart, _ = Cart.objects.get_or_create(user=user)
+    # CartItemSerializer's PrimaryKeyRelatedField re-read the product
+    product = Product.objects.get(pk=product.id)
+    if quantity > product.stock_quantity:
+        return None
+    cart_item, created = CartItem.objects.get_or_create(cart=cart, product=product)
+    if created:
+        cart_item.quantity = quantity
+    else:
+        cart_item.quantity += quantity
+    cart_item.save()
+    return cart_item
+
+
+def upsert_add(user, product_id, quantity):
+    cart, _ = Cart.objects.get_or_create(user=user)
+    return CartItem.objects.add(cart, product_id, quantity)
+
+
+class Command(BaseCommand):
+    help = 'Compare the old read-modify-write add-to-cart path with the single-statement upsert.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            user = CustomUser.objects.create(email='bench@example.com', password=make_password(None))
+            category = Category.objects.create(name='Bench', created_by=user)
+            product = Product.objects.create(
+                name='Bench product', description='Cart benchmark', price=10, stock_quantity=10**9,
+                category=category, image='products/bench.jpg', created_by=user,
+            )
+
+            self.stdout.write(f'{"path":<10}{"statements":>12}{"p50 ms":>10}{"p95 ms":>10}')
+            for label, add in (('before', legacy_add), ('after', upsert_add)):
+                CartItem.objects.all().delete()
+                add(user, product.id, 1)
+                with CaptureQueriesContext(connection) as queries:
+                    add(user, product.id, 1)
+                stats = summarize(time_call(lambda: add(user, product.id, 1), repeat=options['repeat']))
+                self.stdout.write(f'{label:<10}{len(queries):>12}{stats["p50_ms"]:>10.3f}{stats["p95_ms"]:>10.3f}')
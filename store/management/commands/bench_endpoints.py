@@ -0,0 +1,240 @@
+import io
+import itertools
+import json
+import logging
+import platform
+import random
+import subprocess
+import tempfile
+import time
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from store.benchmarks import benchmark_database, run_concurrently, summarize
+from store.models import Category, CustomUser, Order, Product
+from store.seeding import seed_store
+from store.views import ProductPagination
+
+PASSWORD = 'bench-password'
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive every API endpoint concurrently through the test client and report throughput and latency '
+        'percentiles. On SQLite concurrent writers contend for table locks, so write endpoints show errors there.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Client threads per endpoint.')
+        parser.add_argument('--users', type=int, default=1000, help='Seeded users.')
+        parser.add_argument('--products', type=int, default=10_000, help='Seeded products.')
+        parser.add_argument('--orders', type=int, default=10_000, help='Seeded orders.')
+        parser.add_argument('--only', default='', help='Comma-separated endpoint names to run (default: all).')
+        parser.add_argument('--output', default='bench_endpoints.json', help='Where to write the JSON results.')
+        parser.add_argument('--baseline', default=None, help='Earlier JSON results to compare against.')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the benchmark database (and its seed data) between runs.')
+
+    def handle(self, *args, **options):
+        self.rngs = [random.Random(options['seed'] + i) for i in range(options['concurrency'])]
+        scenarios = self.scenarios()
+        only = [name for name in options['only'].split(',') if name]
+        unknown = set(only) - set(scenarios)
+        if unknown:
+            raise CommandError(f'Unknown endpoints: {", ".join(sorted(unknown))}. Choose from {", ".join(scenarios)}.')
+
+        results = {}
+        # Failed requests are counted in the report; their logged tracebacks would drown it
+        logging.disable(logging.ERROR)
+        try:
+            # Uploaded product images land in a scratch directory, and no email leaves the machine
+            with tempfile.TemporaryDirectory() as media_root, \
+                    override_settings(MEDIA_ROOT=media_root, EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'), \
+                    benchmark_database(keepdb=options['keepdb']):
+                if CustomUser.objects.count() < options['users']:
+                    self.stdout.write('Seeding...')
+                    seed_store(
+                        users=options['users'], categories=max(1, options['products'] // 500),
+                        products=options['products'], carts=options['users'] // 2, orders=options['orders'],
+                        seed=options['seed'],
+                    )
+                self.prepare(options)
+                for name, (setup, call) in scenarios.items():
+                    if only and name not in only:
+                        continue
+                    if setup is not None:
+                        setup(options['requests'])
+                    samples, wall, failures = run_concurrently(
+                        lambda worker: 200 <= call(worker).status_code < 300, options['requests'], options['concurrency'],
+                    )
+                    results[name] = {
+                        **summarize(samples),
+                        'errors': failures,
+                        'throughput_rps': round(len(samples) / wall, 1) if wall else 0.0,
+                    }
+                    self.stdout.write(f'{name:<22} done')
+                vendor = connection.vendor
+        finally:
+            logging.disable(logging.NOTSET)
+
+        report = {
+            'revision': git_revision(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': vendor,
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'dataset': {key: options[key] for key in ('users', 'products', 'orders')},
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)['results']
+        self.report(results, baseline)
+        self.stdout.write(f'Results written to {options["output"]}')
+
+    def report(self, results, baseline):
+        header = f'{"endpoint":<22}{"req/s":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"errors":>8}'
+        if baseline:
+            header += f'{"p50 vs base":>13}{"p99 vs base":>13}'
+        self.stdout.write(header)
+        for name, stats in results.items():
+            line = (
+                f'{name:<22}{stats["throughput_rps"]:>9.1f}{stats["p50_ms"]:>9.2f}'
+                f'{stats["p95_ms"]:>9.2f}{stats["p99_ms"]:>9.2f}{stats["errors"]:>8}'
+            )
+            if baseline and name in baseline:
+                for key in ('p50_ms', 'p99_ms'):
+                    before = baseline[name][key]
+                    change = (stats[key] - before) / before * 100 if before else 0.0
+                    line += f'{change:>+12.1f}%'
+            self.stdout.write(line)
+
+    def prepare(self, options):
+        """One authenticated client per thread, each acting as its own user with its own category."""
+        password_hash = make_password(PASSWORD)
+        self.actors, self.clients, self.categories = [], [], []
+        for i in range(options['concurrency']):
+            user, _ = CustomUser.objects.update_or_create(
+                email=f'bench-actor{i}@example.com',
+                defaults={'name': f'Bench actor {i}', 'address': '1 Bench St', 'phone_number': '+12025550100', 'password': password_hash},
+            )
+            category, _ = Category.objects.get_or_create(name=f'Bench actor {i}', defaults={'created_by': user})
+            client = APIClient()
+            client.raise_request_exception = False  # A crashing view counts as an error, not a benchmark failure
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+            self.actors.append(user)
+            self.categories.append(category)
+            self.clients.append(client)
+
+        # Orders and cart adds draw on products that cannot run out
+        self.hot_products = list(Product.objects.bulk_create([
+            Product(
+                name=f'Bench hot product {i}', description='Always in stock', price=10, stock_quantity=10**9,
+                category=self.categories[0], image='products/bench.jpg', created_by=self.actors[0],
+            )
+            for i in range(20)
+        ]))
+        self.product_ids = list(Product.objects.values_list('id', flat=True))
+        # Only pages that exist: past the last one the list answers 404, which would count as a failure
+        page_size = ProductPagination.page_size
+        self.product_pages = min(50, max(1, (len(self.product_ids) + page_size - 1) // page_size))
+        self.order_ids = list(Order.objects.values_list('id', flat=True)) or [0]
+        self.user_ids = list(CustomUser.objects.values_list('id', flat=True))
+        self.emails = itertools.count()
+
+        image = io.BytesIO()
+        Image.new('RGB', (64, 64), color='red').save(image, format='JPEG')
+        self.image_bytes = image.getvalue()
+
+    def owned(self, create):
+        """Set up ``create(actor, category)`` rows per thread, for requests that use one up each."""
+        def setup(requests):
+            self.pools = []
+            for actor, category in zip(self.actors, self.categories):
+                self.pools.append([create(actor, category) for _ in range(requests // len(self.actors) + 1)])
+        return setup
+
+    def own_product(self, actor, category):
+        return Product.objects.create(
+            name='Bench own product', description='Owned by a bench actor', price=10, stock_quantity=10,
+            category=category, image='products/bench.jpg', created_by=actor,
+        ).id
+
+    def scenarios(self):
+        """Endpoint name -> (setup run before timing or None, request for one thread)."""
+        def order_lines(worker):
+            return [
+                {'product_id': product.id, 'quantity': 1, 'price': 10}
+                for product in self.rngs[worker].sample(self.hot_products, 3)
+            ]
+
+        return {
+            'signup': (None, lambda w: self.clients[w].post('/api/auth/signup/', {
+                'name': 'Bench signup', 'email': f'bench-signup{next(self.emails)}@example.com',
+                'password': PASSWORD, 'confirm_password': PASSWORD, 'address': '1 Bench St', 'phone_number': '+12025550100',
+            }, format='json')),
+            'login': (None, lambda w: self.clients[w].post('/api/auth/login/', {
+                'email': self.actors[w].email, 'password': PASSWORD,
+            }, format='json')),
+            'profile': (None, lambda w: self.clients[w].get('/api/auth/profile/')),
+            'product-list': (None, lambda w: self.clients[w].get(f'/api/products/?page={self.rngs[w].randint(1, self.product_pages)}')),
+            'product-detail': (None, lambda w: self.clients[w].get(f'/api/products/{self.rngs[w].choice(self.product_ids)}/')),
+            'product-create': (None, lambda w: self.clients[w].post('/api/products/create/', {
+                'name': 'Bench created product', 'description': 'Created by bench_endpoints', 'price': '12.50',
+                'stock_quantity': 10, 'category': self.categories[w].id,
+                'image': SimpleUploadedFile('bench.jpg', self.image_bytes, content_type='image/jpeg'),
+            }, format='multipart')),
+            'product-update': (self.owned(self.own_product), lambda w: self.clients[w].patch(
+                f'/api/products/{self.pools[w][0]}/update/', {'price': f'{self.rngs[w].randint(100, 9999) / 100:.2f}'}, format='json',
+            )),
+            'product-delete': (self.owned(self.own_product), lambda w: self.clients[w].delete(
+                f'/api/products/{self.pools[w].pop()}/delete/',
+            )),
+            'category-list': (None, lambda w: self.clients[w].get('/api/categories/all/')),
+            'category-create': (None, lambda w: self.clients[w].post('/api/categories/add/', {
+                'name': f'Bench category {next(self.emails)}', 'description': 'Created by bench_endpoints',
+            }, format='json')),
+            'category-update': (None, lambda w: self.clients[w].put(
+                f'/api/categories/{self.categories[w].id}/update/', {'description': f'Updated {self.rngs[w].random()}'}, format='json',
+            )),
+            'category-delete': (self.owned(lambda actor, category: Category.objects.create(
+                name=f'Bench disposable {next(self.emails)}', created_by=actor,
+            ).id), lambda w: self.clients[w].delete(f'/api/categories/{self.pools[w].pop()}/delete/')),
+            'order-create': (None, lambda w: self.clients[w].post('/api/orders/create/', {
+                'user_id': self.actors[w].id, 'products': order_lines(w),
+                'shipping_address': '1 Bench St', 'payment_method': 'Credit Card',
+            }, format='json')),
+            'order-list': (None, lambda w: self.clients[w].get(f'/api/orders/all/?user_id={self.rngs[w].choice(self.user_ids)}')),
+            'order-detail': (None, lambda w: self.clients[w].get(f'/api/orders/{self.rngs[w].choice(self.order_ids)}/')),
+            'order-status-update': (self.owned(lambda actor, category: Order.objects.create(
+                user=actor, shipping_address='1 Bench St', payment_method='PayPal', total_price=10,
+            ).id), lambda w: self.clients[w].put(f'/api/orders/{self.pools[w].pop()}/status', {'shipping_status': 'shipped'}, format='json')),
+            'cart-add': (None, lambda w: self.clients[w].post('/api/cart/add/', {
+                'product_id': self.rngs[w].choice(self.hot_products).id, 'quantity': 1,
+            }, format='json')),
+            'cart': (None, lambda w: self.clients[w].get('/api/cart/')),
+        }
@@ -0,0 +1,53 @@
+import logging
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from store.benchmarks import benchmark_database, summarize, time_call
+from store.models import Cart, CartItem, Category, CustomUser, Product
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request overhead of PerformanceMiddleware, disabled and enabled.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=1000)
+        parser.add_argument('--lines', type=int, default=10, help='Cart lines, i.e. rows serialized per request.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            user = CustomUser.objects.create(email='bench@example.com', password=make_password(None))
+            category = Category.objects.create(name='Bench', created_by=user)
+            cart = Cart.objects.create(user=user)
+            for i in range(options['lines']):
+                product = Product.objects.create(
+                    name=f'Bench product {i}', description='Middleware benchmark', price=10, stock_quantity=100,
+                    category=category, image='products/bench.jpg', created_by=user,
+                )
+                CartItem.objects.create(cart=cart, product=product, quantity=1)
+
+            # Log records are still built and formatted; only the console output is dropped
+            store_logger = logging.getLogger('store')
+            handlers, store_logger.handlers = store_logger.handlers, [logging.NullHandler()]
+            try:
+                results = {}
+                for label, enabled in (('disabled', False), ('enabled', True)):
+                    with override_settings(PERFORMANCE={
+                        'ENABLED': enabled, 'SERVER_TIMING': True, 'SLOW_REQUEST_MS': 10_000, 'SLOW_QUERY_LIMIT': 10,
+                    }):
+                        # A fresh client builds its middleware chain under these settings
+                        client = APIClient()
+                        client.force_authenticate(user=user)
+                        results[label] = summarize(time_call(lambda: client.get('/api/cart/'), repeat=options['repeat']))
+            finally:
+                store_logger.handlers = handlers
+
+        self.stdout.write(f'{"middleware":<12}{"mean ms":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+        for label, stats in results.items():
+            self.stdout.write(
+                f'{label:<12}{stats["mean_ms"]:>10.3f}{stats["p50_ms"]:>10.3f}{stats["p95_ms"]:>10.3f}{stats["p99_ms"]:>10.3f}'
+            )
+        overhead = results['enabled']['p50_ms'] - results['disabled']['p50_ms']
+        self.stdout.write(f'Overhead at p50: {overhead:.3f} ms per request')
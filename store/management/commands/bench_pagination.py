@@ -0,0 +1,77 @@
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from store.benchmarks import benchmark_database, summarize, time_call
+from store.models import Category, CustomUser, Product
+from store.views import ProductKeysetPagination
+
+
+class Command(BaseCommand):
+    help = 'Compare page-number and keyset pagination of the product list at shallow and deep pages.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000, help='Number of products to seed.')
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--deep-page', type=int, default=10_000, help='Page number used as the deep page.')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the benchmark database between runs.')
+
+    def handle(self, *args, **options):
+        rows = max(options['rows'], options['deep_page'] * options['page_size'])
+        with benchmark_database(keepdb=options['keepdb']):
+            self.seed(rows)
+            self.run(options)
+
+    def seed(self, rows):
+        existing = Product.objects.count()
+        if existing >= rows:
+            return
+        user, _ = CustomUser.objects.get_or_create(
+            email='bench@example.com', defaults={'password': make_password(None)}
+        )
+        category, _ = Category.objects.get_or_create(name='Bench', defaults={'created_by': user})
+        self.stdout.write(f'Seeding {rows - existing} products...')
+        batch = []
+        for i in range(existing, rows):
+            batch.append(Product(
+                name=f'Product {i}',
+                description='Benchmark product',
+                price=(i * 7919) % 100_000 / 100 + 1,
+                stock_quantity=100,
+                category=category,
+                image='products/bench.jpg',
+                created_by=user,
+            ))
+            if len(batch) == 5000:
+                Product.objects.bulk_create(batch)
+                batch = []
+        Product.objects.bulk_create(batch)
+
+    def run(self, options):
+        client = Client()
+        size, deep = options['page_size'], options['deep_page']
+        paginator = ProductKeysetPagination()
+
+        # Build the cursors that start the deep page once, outside the timings
+        deep_cursors = {}
+        for ordering, key_fields in paginator.orderings.items():
+            boundary = Product.objects.order_by(*key_fields)[(deep - 1) * size - 1]
+            position = [getattr(boundary, field) for field in key_fields]
+            deep_cursors[ordering] = paginator.encode_cursor(position, reverse=False)
+
+        cases = [
+            ('page-number, page 1', {'page': 1, 'page_size': size}),
+            (f'page-number, page {deep}', {'page': deep, 'page_size': size}),
+            ('keyset by id, page 1', {'pagination': 'cursor', 'page_size': size}),
+            (f'keyset by id, page {deep}', {'cursor': deep_cursors['id'], 'page_size': size}),
+            ('keyset by price, page 1', {'pagination': 'cursor', 'ordering': 'price', 'page_size': size}),
+            (f'keyset by price, page {deep}', {'cursor': deep_cursors['price'], 'ordering': 'price', 'page_size': size}),
+        ]
+        self.stdout.write(f'{"case":<32}{"p50 ms":>10}{"p95 ms":>10}')
+        for label, params in cases:
+            response = client.get('/api/products/', params)
+            if response.status_code != 200:
+                raise CommandError(f'{label}: unexpected status {response.status_code}')
+            stats = summarize(time_call(lambda: client.get('/api/products/', params), repeat=options['repeat']))
+            self.stdout.write(f'{label:<32}{stats["p50_ms"]:>10.2f}{stats["p95_ms"]:>10.2f}')
@@ -0,0 +1,102 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.utils import load_backend
+
+from store.benchmarks import benchmark_database, run_concurrently, summarize
+from store.models import Product
+from store.pool import close_pool, pool_stats
+from store.seeding import seed_store
+
+MODES = ('none', 'persistent', 'pool')
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare a new connection per request (CONN_MAX_AGE=0), persistent per-thread connections '
+        '(CONN_MAX_AGE) and the connection pool (OPTIONS["pool"]) under concurrent short requests. '
+        'PostgreSQL only: SQLite connections are local files and cost almost nothing to open.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per mode.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Threads, i.e. requests in flight.')
+        parser.add_argument('--pool-size', type=int, default=8, help='max_size of the pool, below --concurrency to show waiting.')
+        parser.add_argument('--products', type=int, default=1000, help='Seeded products.')
+        parser.add_argument('--only', default='', help=f'Comma-separated modes to run (default: {",".join(MODES)}).')
+        parser.add_argument('--output', default=None, help='Also write the results as JSON here.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError(f'bench_pool needs PostgreSQL; the default database is {connection.vendor}.')
+        only = [name for name in options['only'].split(',') if name] or list(MODES)
+        unknown = set(only) - set(MODES)
+        if unknown:
+            raise CommandError(f'Unknown modes: {", ".join(sorted(unknown))}. Choose from {", ".join(MODES)}.')
+
+        results = {}
+        with benchmark_database():
+            self.stdout.write('Seeding...')
+            seed_store(users=10, categories=10, products=options['products'], carts=0, orders=0, seed=options['seed'])
+            product_ids = list(Product.objects.values_list('id', flat=True))
+            settings_dict = connection.settings_dict
+            for mode in only:
+                results[mode] = self.run(mode, settings_dict, product_ids, options)
+                self.stdout.write(f'{mode:<12} done')
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+
+    def run(self, mode, settings_dict, product_ids, options):
+        alias = f'bench-pool-{mode}'
+        settings_dict = {
+            **settings_dict,
+            'OPTIONS': {key: value for key, value in settings_dict['OPTIONS'].items() if key != 'pool'},
+            'CONN_MAX_AGE': 600 if mode == 'persistent' else 0,
+        }
+        if mode == 'pool':
+            settings_dict['OPTIONS']['pool'] = {'max_size': options['pool_size']}
+        backend = load_backend('store.backends.postgresql')
+        # One wrapper per thread, as django.db.connections keeps them; each is used only by its own thread
+        wrappers = [backend.DatabaseWrapper(settings_dict, alias) for _ in range(options['concurrency'])]
+        for wrapper in wrappers:
+            wrapper.inc_thread_sharing()
+        rng = random.Random(options['seed'])
+
+        def request(worker):
+            # What close_old_connections does on request_started and request_finished
+            wrapper = wrappers[worker]
+            wrapper.close_if_unusable_or_obsolete()
+            try:
+                with wrapper.cursor() as cursor:
+                    cursor.execute('SELECT name, price FROM store_product WHERE id = %s', [rng.choice(product_ids)])
+                    return cursor.fetchone() is not None
+            finally:
+                wrapper.close_if_unusable_or_obsolete()
+
+        def close(worker):
+            wrappers[worker].close()
+
+        run_concurrently(request, min(options['requests'], 100), options['concurrency'], teardown=close)  # Warm-up
+        samples, wall, failures = run_concurrently(request, options['requests'], options['concurrency'], teardown=close)
+        stats = pool_stats().get((alias, settings_dict['NAME']))
+        close_pool((alias, settings_dict['NAME']))
+        return {
+            **summarize(samples),
+            'errors': failures,
+            'throughput_rps': round(len(samples) / wall, 1) if wall else 0.0,
+            'pool': stats,
+        }
+
+    def report(self, results):
+        self.stdout.write(f'{"mode":<12}{"req/s":>10}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"errors":>8}{"connects":>10}{"waits":>7}')
+        for mode, result in results.items():
+            pool = result['pool'] or {}
+            self.stdout.write(
+                f'{mode:<12}{result["throughput_rps"]:>10.1f}{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}'
+                f'{result["p99_ms"]:>9.2f}{result["errors"]:>8}{pool.get("connects", "-"):>10}{pool.get("waits", "-"):>7}'
+            )
@@ -0,0 +1,59 @@
+import io
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from store.benchmarks import benchmark_database, summarize, time_call
+from store.models import Product
+from store.parsers import FastJSONParser
+from store.renderers import FastJSONRenderer, orjson
+from store.responses import envelope
+from store.seeding import seed_store
+from store.serializers import ProductSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering and parsing one page of ProductSerializer output with DRF's JSONRenderer/JSONParser "
+        'and with store.renderers.FastJSONRenderer/store.parsers.FastJSONParser.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100, help='Products on the page.')
+        parser.add_argument('--repeat', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            seed_store(users=10, categories=5, products=options['page_size'], carts=0, orders=0, seed=1)
+            request = Request(APIRequestFactory().get('/api/products/'))
+            products = list(Product.objects.order_by('id')[:options['page_size']])
+            data = envelope('Successfully retrieved all products', {
+                'products': ProductSerializer(products, many=True, context={'request': request}).data,
+                'next': None,
+                'previous': None,
+            })
+
+            drf_content = JSONRenderer().render(data)
+            fast_content = FastJSONRenderer().render(data)
+            if JSONParser().parse(io.BytesIO(fast_content)) != JSONParser().parse(io.BytesIO(drf_content)):
+                self.stderr.write('Warning: the two renderers produced different documents.')
+
+            cases = [
+                ('serialize page', lambda: ProductSerializer(products, many=True, context={'request': request}).data),
+                ('render, DRF', lambda: JSONRenderer().render(data)),
+                ('render, fast', lambda: FastJSONRenderer().render(data)),
+                ('parse, DRF', lambda: JSONParser().parse(io.BytesIO(drf_content))),
+                ('parse, fast', lambda: FastJSONParser().parse(io.BytesIO(drf_content))),
+            ]
+            results = {label: summarize(time_call(func, repeat=options['repeat'], warmup=20)) for label, func in cases}
+
+        self.stdout.write(f'{len(products)} products, {len(drf_content)} bytes; fast JSON backend: '
+                          f'{"orjson " + orjson.__version__ if orjson else "json (orjson not installed)"}')
+        self.stdout.write(f'{"case":<18}{"mean ms":>10}{"p50 ms":>10}{"p99 ms":>10}{"speed-up":>10}')
+        for label, stats in results.items():
+            baseline = results.get(label.replace('fast', 'DRF'))
+            speedup = f'{baseline["mean_ms"] / stats["mean_ms"]:.1f}x' if 'fast' in label and stats['mean_ms'] else ''
+            self.stdout.write(f'{label:<18}{stats["mean_ms"]:>10.3f}{stats["p50_ms"]:>10.3f}{stats["p99_ms"]:>10.3f}{speedup:>10}')
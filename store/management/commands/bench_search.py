@@ -0,0 +1,73 @@
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from store.benchmarks import benchmark_database, summarize, time_call
+from store.models import Category, CustomUser, Product
+from store.search import search_index, search_products
+from store.seeding import WORDS
+
+
+class Command(BaseCommand):
+    help = 'Compare ranked full-text product search with icontains scans.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--keepdb', action='store_true', help='Reuse the benchmark database between runs.')
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options['keepdb']):
+            self.seed(options['rows'])
+            self.run(options)
+
+    def seed(self, rows):
+        existing = Product.objects.count()
+        if existing >= rows:
+            return
+        rng = random.Random(7)
+        user, _ = CustomUser.objects.get_or_create(
+            email='bench@example.com', defaults={'password': make_password(None)}
+        )
+        category, _ = Category.objects.get_or_create(name='Bench', defaults={'created_by': user})
+        self.stdout.write(f'Seeding {rows - existing} products...')
+        batch = []
+        for i in range(existing, rows):
+            batch.append(Product(
+                # A model code gives every query a selective term, as real catalogs have
+                name=' '.join(rng.sample(WORDS, 3) + [f'model{rng.randrange(rows // 10)}']),
+                description=' '.join(rng.choices(WORDS, k=25)),
+                price=rng.randint(100, 100_000) / 100,
+                stock_quantity=100,
+                category=category,
+                image='products/bench.jpg',
+                created_by=user,
+            ))
+            if len(batch) == 5000:
+                Product.objects.bulk_create(batch)
+                batch = []
+        Product.objects.bulk_create(batch)
+
+    def run(self, options):
+        if connection.vendor != 'postgresql':
+            started = time.perf_counter()
+            search_index.build()
+            self.stdout.write(f'Built in-process index in {time.perf_counter() - started:.2f}s')
+
+        # Selective queries force icontains to scan the table; common ones let it stop at 20 rows
+        queries = ['model1234', 'keyboard model42', 'wireless headphones', 'stainless steel bottle']
+        self.stdout.write(f'{"query":<26}{"engine":<12}{"p50 ms":>10}{"p95 ms":>10}')
+        for query in queries:
+            def icontains():
+                match = Q()
+                for word in query.split():
+                    match &= Q(name__icontains=word) | Q(description__icontains=word)
+                return list(Product.objects.filter(match)[:20])
+
+            for engine, func in (('icontains', icontains), ('full-text', lambda: search_products(query, 20))):
+                stats = summarize(time_call(func, repeat=options['repeat']))
+                self.stdout.write(f'{query:<26}{engine:<12}{stats["p50_ms"]:>10.2f}{stats["p95_ms"]:>10.2f}')
@@ -0,0 +1,110 @@
+import random
+import threading
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from store.benchmarks import benchmark_database
+from store.exceptions import InsufficientStock
+from store.inventory import reserve_stock
+from store.models import Category, CustomUser, Product
+
+
+class Command(BaseCommand):
+    help = 'Hammer reserve_stock from many threads and verify that no product is oversold.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--products', type=int, default=5, help='Number of contended products.')
+        parser.add_argument('--stock', type=int, default=500, help='Initial units per product.')
+        parser.add_argument('--attempts', type=int, default=200, help='Reservations attempted per thread.')
+        parser.add_argument('--max-lines', type=int, default=3, help='Most products in one reservation.')
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            product_ids = self.seed(options['products'], options['stock'])
+            results = self.run(product_ids, options)
+            self.report(product_ids, options, results)
+
+    def seed(self, count, stock):
+        user = CustomUser.objects.create(email='bench@example.com', password=make_password(None))
+        category = Category.objects.create(name='Flash sale', created_by=user)
+        products = Product.objects.bulk_create([
+            Product(
+                name=f'Flash product {i}',
+                description='Contended product',
+                price=10,
+                stock_quantity=stock,
+                category=category,
+                image='products/bench.jpg',
+                created_by=user,
+            )
+            for i in range(count)
+        ])
+        return [product.id for product in products]
+
+    def run(self, product_ids, options):
+        results = {'reserved': dict.fromkeys(product_ids, 0), 'ok': 0, 'rejected': 0, 'retries': 0}
+        lock = threading.Lock()
+        start_line = threading.Barrier(options['threads'])
+
+        def worker(seed):
+            rng = random.Random(seed)
+            reserved = dict.fromkeys(product_ids, 0)
+            ok = rejected = retries = 0
+            start_line.wait()
+            try:
+                for _ in range(options['attempts']):
+                    lines = rng.sample(product_ids, rng.randint(1, min(options['max_lines'], len(product_ids))))
+                    quantities = {product_id: rng.randint(1, 5) for product_id in lines}
+                    while True:
+                        try:
+                            reserve_stock(quantities)
+                        except InsufficientStock:
+                            rejected += 1
+                        except OperationalError:
+                            # Lock timeouts / busy database: back off, then retry the same reservation
+                            retries += 1
+                            time.sleep(rng.uniform(0, 0.002 * min(retries, 10)))
+                            continue
+                        else:
+                            ok += 1
+                            for product_id, quantity in quantities.items():
+                                reserved[product_id] += quantity
+                        break
+            finally:
+                connection.close()
+            with lock:
+                results['ok'] += ok
+                results['rejected'] += rejected
+                results['retries'] += retries
+                for product_id, quantity in reserved.items():
+                    results['reserved'][product_id] += quantity
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results['elapsed'] = time.perf_counter() - started
+        return results
+
+    def report(self, product_ids, options, results):
+        remaining = dict(Product.objects.filter(id__in=product_ids).values_list('id', 'stock_quantity'))
+        attempts = results['ok'] + results['rejected']
+        self.stdout.write(f'{connection.vendor}: {options["threads"]} threads, {attempts} reservations in {results["elapsed"]:.2f}s')
+        self.stdout.write(f'  throughput: {attempts / results["elapsed"]:.0f} reservations/s')
+        self.stdout.write(f'  succeeded: {results["ok"]}, rejected: {results["rejected"]}, retried: {results["retries"]}')
+
+        oversold = []
+        for product_id in product_ids:
+            sold = results['reserved'][product_id]
+            if remaining[product_id] + sold != options['stock']:
+                oversold.append(product_id)
+            self.stdout.write(f'  product {product_id}: sold {sold}, remaining {remaining[product_id]}')
+        if oversold:
+            raise CommandError(f'Stock accounting is off for products {oversold}')
+        self.stdout.write(self.style.SUCCESS('No overselling: sold + remaining equals the initial stock for every product.'))
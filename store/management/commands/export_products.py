@@ -0,0 +1,26 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from store.export import EXPORT_FORMATS, export_chunks
+
+
+class Command(BaseCommand):
+    help = 'Stream the whole product catalog as NDJSON or CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-format', choices=EXPORT_FORMATS, default='ndjson')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output on the fly.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per database round trip.')
+        parser.add_argument('-o', '--output', help='File to write to (default: stdout).')
+
+    def handle(self, *args, **options):
+        chunks = export_chunks(options['output_format'], gzip=options['gzip'], chunk_size=options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
@@ -0,0 +1,42 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.bulk_import import IMPORT_FORMATS, import_products
+from store.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Bulk import products from a CSV or NDJSON file, writing rejected rows to an error report.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--created-by', required=True, help='Email of the user the new products belong to.')
+        parser.add_argument('--input-format', choices=IMPORT_FORMATS, help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows validated together.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT/UPDATE statement.')
+        parser.add_argument('--errors', help='Error report path (default: <path>.errors.csv).')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['input_format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if import_format not in IMPORT_FORMATS:
+            raise CommandError(f'Cannot tell the format of {path}; pass --input-format.')
+        try:
+            created_by = CustomUser.objects.get(email=options['created_by'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"No user with email {options['created_by']}")
+
+        errors_path = options['errors'] or f'{path}.errors.csv'
+        with open(path, newline='', encoding='utf-8') as source, open(errors_path, 'w', newline='') as error_file:
+            report = import_products(
+                source, import_format, created_by,
+                chunk_size=options['chunk_size'], batch_size=options['batch_size'], error_file=error_file,
+            )
+
+        self.stdout.write(
+            f'{report.rows} rows in {report.elapsed:.2f}s ({report.rows_per_second:.0f} rows/s): '
+            f'{report.created} created, {report.updated} updated, {report.failed} rejected.'
+        )
+        if report.failed:
+            self.stdout.write(f'Rejected rows written to {errors_path}')
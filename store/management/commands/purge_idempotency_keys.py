@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from store.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Delete stored Idempotency-Key responses older than the configured TTL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl', type=int, default=None, help=f"Seconds to keep keys (default: settings.IDEMPOTENCY['TTL']).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        ttl = settings.IDEMPOTENCY['TTL'] if options['ttl'] is None else options['ttl']
+        deleted = IdempotencyKey.objects.purge_expired(ttl, options['batch_size'])
+        self.stdout.write(f'Purged {deleted} idempotency key(s) older than {ttl}s.')
@@ -0,0 +1,267 @@
+import itertools
+import json
+import queue
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.urls import Resolver404, resolve, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from store.benchmarks import benchmark_database, summarize
+from store.models import CustomUser
+from store.seeding import seed_store
+from store.traffic import ROUTE_MODELS, read_traffic
+
+PASSWORD = 'replay-password'
+PLACEHOLDER = re.compile(r'^<str:(\d+)>$')
+OWNER_FIELDS = {'Product': 'created_by', 'Category': 'created_by', 'Order': 'user'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-issue captured traffic (see TRAFFIC_CAPTURE) at a chosen speed, in-process against a seeded '
+        'throwaway database or against a local server, and report latency per route.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=None, help="Capture file (default: TRAFFIC_CAPTURE['PATH']).")
+        parser.add_argument('--speed', type=float, default=1.0, help='Replay speed factor; 0 sends as fast as possible.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at most.')
+        parser.add_argument('--base-url', default=None, help=(
+            'Replay against this server (e.g. http://127.0.0.1:8000). Its database must be the configured one, '
+            'seeded with seed_store. Without it, requests run in-process against a freshly seeded test database.'
+        ))
+        parser.add_argument('--users', type=int, default=1000, help='Seeded users (in-process only).')
+        parser.add_argument('--products', type=int, default=10_000, help='Seeded products (in-process only).')
+        parser.add_argument('--orders', type=int, default=10_000, help='Seeded orders (in-process only).')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', default=None, help='Also write the per-route report as JSON here.')
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.TRAFFIC_CAPTURE['PATH']
+        try:
+            records = read_traffic(path)
+        except FileNotFoundError:
+            raise CommandError(f'No capture file at {path}.')
+        if not records:
+            raise CommandError(f'{path} holds no captured requests.')
+        self.rng = random.Random(options['seed'])
+        self.lock = threading.Lock()
+        self.counter = itertools.count()
+
+        with ExitStack() as stack:
+            if options['base_url'] is None:
+                stack.enter_context(override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'))
+                stack.enter_context(benchmark_database())
+                self.stdout.write('Seeding...')
+                seed_store(
+                    users=options['users'], categories=max(1, options['products'] // 500), products=options['products'],
+                    carts=options['users'] // 2, orders=options['orders'], password=PASSWORD, seed=options['seed'],
+                )
+            elif not CustomUser.objects.exists():
+                raise CommandError('The configured database has no users; fill it with seed_store first.')
+            self.prepare(records)
+            stats = self.replay(records, options)
+
+        self.report(stats, options['output'])
+
+    def prepare(self, records):
+        """Map every captured identity onto a local user and collect the ids requests may point at."""
+        identities = sorted({record['identity'] for record in records if record.get('identity')})
+        users = list(CustomUser.objects.order_by('id')[:max(len(identities), 1)])
+        self.users = {identity: users[i % len(users)] for i, identity in enumerate(identities)}
+        self.tokens = {identity: str(RefreshToken.for_user(user).access_token) for identity, user in self.users.items()}
+        user_ids = [user.id for user in users]
+
+        self.ids = {name: list(apps.get_model('store', name).objects.values_list('id', flat=True)) for name in OWNER_FIELDS}
+        self.category_names = list(apps.get_model('store', 'Category').objects.values_list('name', flat=True))
+        self.owned = defaultdict(list)  # (model name, user id) -> ids the user may update or delete
+        for name, owner in OWNER_FIELDS.items():
+            for row_id, owner_id in apps.get_model('store', name).objects.filter(**{f'{owner}__in': user_ids}).values_list('id', owner):
+                self.owned[(name, owner_id)].append(row_id)
+
+    def pick(self, model_name, user, consume=False):
+        with self.lock:
+            owned = self.owned.get((model_name, user.id)) if user is not None else None
+            pool = owned or self.ids[model_name]
+            if not pool:
+                return 0
+            if consume and owned:
+                return owned.pop(self.rng.randrange(len(owned)))
+            return self.rng.choice(pool)
+
+    def fill(self, value, user, key=''):
+        """Turn a captured body shape back into a body that is valid against the local data."""
+        if isinstance(value, dict):
+            return {k: self.fill(v, user, k) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.fill(item, user, key) for item in value]
+        if isinstance(value, bool) or value is None:
+            return value
+        if isinstance(value, (int, float)):
+            if key == 'product_id':
+                return self.pick('Product', None)
+            if key == 'category':
+                return self.pick('Category', None)
+            if key == 'user_id' and user is not None:
+                return user.id
+            return value
+        match = PLACEHOLDER.match(str(value))
+        if not match:
+            return value
+        if 'password' in key:
+            return PASSWORD
+        if 'email' in key:
+            return f'replay{next(self.counter)}.{time.time_ns()}@example.com'
+        if 'phone' in key:
+            return '+12025550100'
+        if key == 'category' and self.category_names:
+            with self.lock:
+                return self.rng.choice(self.category_names)  # The product list filters by name
+        if key == 'name':
+            return f'Replay {next(self.counter)}.{time.time_ns()}'  # Category names are unique
+        if key == 'shipping_status':
+            return 'shipped'
+        if key == 'payment_method':
+            return 'Credit Card'
+        return 'x' * max(int(match.group(1)), 1)
+
+    def build(self, record):
+        """Method, path with local ids, query string, JSON body and token of one captured request."""
+        identity = record.get('identity')
+        user = self.users.get(identity)
+        path = record['path']
+        route = record.get('route')
+        if route in ROUTE_MODELS:
+            try:
+                kwargs = dict(resolve(path).kwargs)
+            except Resolver404:
+                kwargs = {}
+            for name in kwargs:
+                kwargs[name] = self.pick(ROUTE_MODELS[route], user, consume=record['method'] == 'DELETE')
+            if kwargs:
+                path = reverse(route, kwargs=kwargs)
+        body = self.fill(record['body'], user) if record.get('body') is not None else None
+        query = {key: [self.fill(value, user, key) for value in values] for key, values in (record.get('query') or {}).items()}
+        return record['method'], path, query, body, self.tokens.get(identity)
+
+    def replay(self, records, options):
+        stats = defaultdict(lambda: {'samples': [], 'errors': 0, 'statuses': defaultdict(int)})
+        lags = []
+        skipped = 0
+        work = queue.Queue(maxsize=options['concurrency'] * 4)
+        base_url = options['base_url']
+
+        def send(method, path, query, body, token):
+            if base_url is None:
+                client = getattr(local, 'client', None)
+                if client is None:
+                    client = local.client = APIClient()
+                    client.raise_request_exception = False
+                extra = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+                url = path + ('?' + urllib.parse.urlencode(query, doseq=True) if query else '')
+                return getattr(client, method.lower())(url, body, format='json', **extra).status_code
+            headers = {'Content-Type': 'application/json'}
+            if token:
+                headers['Authorization'] = f'Bearer {token}'
+            url = base_url.rstrip('/') + path + ('?' + urllib.parse.urlencode(query, doseq=True) if query else '')
+            data = json.dumps(body).encode('utf-8') if body is not None else None
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers, method=method), timeout=30) as r:
+                    r.read()
+                    return r.status
+            except urllib.error.HTTPError as e:
+                return e.code
+            except OSError:
+                return 599  # Connection failure
+
+        local = threading.local()
+
+        def worker():
+            try:
+                while True:
+                    item = work.get()
+                    if item is None:
+                        return
+                    label, request = item
+                    start = time.perf_counter()
+                    status = send(*request)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    with self.lock:
+                        entry = stats[label]
+                        entry['samples'].append(elapsed)
+                        entry['statuses'][status] += 1
+                        entry['errors'] += status >= 500
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+
+        speed = options['speed']
+        first = records[0].get('t', 0)
+        started = time.perf_counter()
+        self.stdout.write(f'Replaying {len(records)} requests...')
+        try:
+            for record in records:
+                if record.get('body') is None and record['method'] in ('POST', 'PUT', 'PATCH') \
+                        and record.get('content_type') != 'application/json':
+                    skipped += 1  # Uploads were not captured
+                    continue
+                if speed > 0:
+                    due = (record.get('t', first) - first) / speed
+                    delay = due - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                    lags.append(max(0.0, -delay) * 1000)
+                work.put((record.get('route') or record['path'], self.build(record)))
+        finally:
+            for _ in threads:
+                work.put(None)
+            for thread in threads:
+                thread.join()
+
+        return {
+            'wall_s': time.perf_counter() - started,
+            'skipped': skipped,
+            'lag': summarize(lags) if lags else None,
+            'routes': stats,
+        }
+
+    def report(self, stats, output):
+        routes = {
+            label: {
+                **summarize(entry['samples']),
+                'errors': entry['errors'],
+                'statuses': {str(code): count for code, count in sorted(entry['statuses'].items())},
+            }
+            for label, entry in sorted(stats['routes'].items())
+        }
+        self.stdout.write(f'{"route":<24}{"requests":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"5xx":>6}  statuses')
+        for label, entry in routes.items():
+            statuses = ' '.join(f'{code}:{count}' for code, count in entry['statuses'].items())
+            self.stdout.write(
+                f'{label[:23]:<24}{entry["runs"]:>9}{entry["p50_ms"]:>9.2f}{entry["p95_ms"]:>9.2f}'
+                f'{entry["p99_ms"]:>9.2f}{entry["errors"]:>6}  {statuses}'
+            )
+        total = sum(entry['runs'] for entry in routes.values())
+        self.stdout.write(f'{total} requests in {stats["wall_s"]:.1f}s, {stats["skipped"]} upload(s) skipped.')
+        if stats['lag']:
+            self.stdout.write(f'Dispatch lag behind the capture schedule: p50 {stats["lag"]["p50_ms"]:.1f} ms, p99 {stats["lag"]["p99_ms"]:.1f} ms')
+        if output:
+            with open(output, 'w') as f:
+                json.dump({'wall_s': stats['wall_s'], 'skipped': stats['skipped'], 'lag': stats['lag'], 'routes': routes}, f, indent=2)
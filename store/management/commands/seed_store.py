@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.seeding import seed_store
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with synthetic users, products, carts and orders for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--categories', type=int, default=200)
+        parser.add_argument('--products', type=int, default=100_000)
+        parser.add_argument('--carts', type=int, default=5_000)
+        parser.add_argument('--orders', type=int, default=200_000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent of product, category and buyer popularity.')
+        parser.add_argument('--days', type=int, default=365, help='Spread order dates over this many past days.')
+        parser.add_argument('--password', default='password', help='Password shared by every seeded user.')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed, for a reproducible data set.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = seed_store(
+            users=options['users'],
+            categories=options['categories'],
+            products=options['products'],
+            carts=options['carts'],
+            orders=options['orders'],
+            batch_size=options['batch_size'],
+            skew=options['skew'],
+            days=options['days'],
+            password=options['password'],
+            seed=options['seed'],
+            log=self.stdout.write,
+        )
+        elapsed = time.perf_counter() - started
+        total = sum(written.values())
+        self.stdout.write(', '.join(f'{count} {name}' for name, count in written.items()))
+        self.stdout.write(f'Wrote {total} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s).')
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.mail import send_pending
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbox emails in batches, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting once the outbox is drained.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep between polls with --loop.')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_pending(options['batch_size'], options['max_attempts'])
+            total_sent += sent
+            total_failed += failed
+            if sent + failed == options['batch_size']:
+                continue  # A full batch: more may be waiting
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(f'Sent {total_sent} email(s), {total_failed} failed attempt(s).')
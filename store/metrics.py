@@ -0,0 +1,221 @@
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _merge(series, statuses, new_series, new_statuses):
+    for key, entry in new_series:
+        merged = series.setdefault(key, [0] * len(entry))
+        for i, value in enumerate(entry):
+            merged[i] += value
+    for key, count in new_statuses:
+        statuses[key] = statuses.get(key, 0) + count
+
+
+class _Shard:
+    """One thread's counters. Only the owning thread writes to it, so recording takes no lock."""
+
+    def __init__(self, bucket_count):
+        self.bucket_count = bucket_count
+        # (view, method) -> [count per bucket..., count above the last bucket, seconds, requests, queries]
+        self.series = {}
+        # (view, method, status) -> responses
+        self.statuses = {}
+
+
+class _ThreadToken:
+    """Kept only in a thread's locals, so it is freed when the thread finishes."""
+
+
+class MetricsRegistry:
+    """
+    Request latency histograms, status codes and query counts per view.
+
+    Each thread records into its own shard, so the hot path is a few dict
+    and list updates with no lock. Reads merge the shards. A finished
+    thread's shard is folded into a shared one, so a server that starts a
+    thread per request does not pile them up. When
+    ``DIRECTORY`` is set, every process also writes its totals to
+    ``<DIRECTORY>/<pid>.json`` at most every ``FLUSH_INTERVAL`` seconds, and
+    collect() merges all of those files, so any worker can report for the
+    whole server. Files of exited workers are kept, so their counts are not lost.
+    """
+
+    def __init__(self, options=None):
+        options = {**getattr(settings, 'METRICS', {}), **(options or {})}
+        self.buckets = tuple(options.get('BUCKETS') or DEFAULT_BUCKETS)
+        self.directory = options.get('DIRECTORY')
+        self.flush_interval = options.get('FLUSH_INTERVAL', 5)
+        self._local = threading.local()
+        self._shards = []
+        self._finished = _Shard(len(self.buckets) + 1)  # Counts of threads that have exited
+        self._shards_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard(len(self.buckets) + 1)
+            token = self._local.token = _ThreadToken()
+            with self._shards_lock:
+                self._shards.append(shard)
+            weakref.finalize(token, self._retire, shard).atexit = False
+        return shard
+
+    def _retire(self, shard):
+        # The thread is gone, so nothing writes to the shard any more
+        with self._shards_lock:
+            self._shards.remove(shard)
+            _merge(self._finished.series, self._finished.statuses, shard.series.items(), shard.statuses.items())
+
+    def record(self, view, method, status, seconds, queries):
+        shard = self._shard()
+        key = (view, method)
+        entry = shard.series.get(key)
+        if entry is None:
+            entry = shard.series[key] = [0] * (shard.bucket_count + 3)
+        entry[bisect_left(self.buckets, seconds)] += 1
+        entry[-3] += seconds
+        entry[-2] += 1
+        entry[-1] += queries
+        status_key = (view, method, status)
+        shard.statuses[status_key] = shard.statuses.get(status_key, 0) + 1
+
+        if self.directory and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def snapshot(self):
+        """This process's totals, as plain lists so they serialize to JSON."""
+        series, statuses = {}, {}
+        # Under the lock, so a shard being retired is counted exactly once
+        with self._shards_lock:
+            for shard in [self._finished, *self._shards]:
+                _merge(series, statuses, list(shard.series.items()), list(shard.statuses.items()))
+        return self._serialize(series, statuses)
+
+    def _serialize(self, series, statuses):
+        return {
+            'buckets': list(self.buckets),
+            'series': [[view, method, entry] for (view, method), entry in series.items()],
+            'statuses': [[view, method, status, count] for (view, method, status), count in statuses.items()],
+        }
+
+    def flush(self):
+        """Write this process's totals to its file. Skipped if another thread is already flushing."""
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = time.monotonic()
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as tmp:
+                json.dump(self.snapshot(), tmp)
+            # Readers only ever see a complete file
+            os.replace(tmp_path, os.path.join(self.directory, f'{os.getpid()}.json'))
+        finally:
+            self._flush_lock.release()
+
+    def collect(self):
+        """Totals for every process sharing ``DIRECTORY``, or just this one without it."""
+        if not self.directory:
+            return self.snapshot()
+        self.flush()
+        series, statuses = {}, {}
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue  # Removed or replaced while listing
+            if data['buckets'] != list(self.buckets):
+                continue
+            _merge(
+                series, statuses,
+                [((view, method), entry) for view, method, entry in data['series']],
+                [((view, method, status), count) for view, method, status, count in data['statuses']],
+            )
+        return self._serialize(series, statuses)
+
+    def clear(self):
+        with self._shards_lock:
+            for shard in [self._finished, *self._shards]:
+                shard.series.clear()
+                shard.statuses.clear()
+
+
+registry = MetricsRegistry()
+
+
+def _label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def render_prometheus(collected, auth_stats=None, response_cache_stats=None, pool_stats=None):
+    """Render collect() output, plus this worker's cache and connection pool counters, in the Prometheus text format."""
+    lines = [
+        '# HELP store_request_duration_seconds Request latency by view.',
+        '# TYPE store_request_duration_seconds histogram',
+    ]
+    bounds = [f'{bound:g}' for bound in collected['buckets']] + ['+Inf']
+    queries = []
+    for view, method, entry in sorted(collected['series']):
+        labels = f'view="{_label(view)}",method="{method}"'
+        cumulative = 0
+        for bound, count in zip(bounds, entry[:len(bounds)]):
+            cumulative += count
+            lines.append(f'store_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'store_request_duration_seconds_sum{{{labels}}} {entry[-3]:.6f}')
+        lines.append(f'store_request_duration_seconds_count{{{labels}}} {entry[-2]}')
+        queries.append(f'store_request_queries_total{{{labels}}} {entry[-1]}')
+
+    lines += ['# HELP store_request_queries_total Database queries run by requests, by view.',
+              '# TYPE store_request_queries_total counter'] + queries
+
+    lines += ['# HELP store_responses_total Responses by view and status code.',
+              '# TYPE store_responses_total counter']
+    for view, method, status, count in sorted(collected['statuses']):
+        lines.append(f'store_responses_total{{view="{_label(view)}",method="{method}",status="{status}"}} {count}')
+
+    if auth_stats is not None:
+        lines += ['# HELP store_auth_cache Authentication cache counters of the worker serving this scrape.',
+                  '# TYPE store_auth_cache gauge']
+        for name, value in sorted(auth_stats.items()):
+            lines.append(f'store_auth_cache{{stat="{name}"}} {value}')
+
+    if response_cache_stats is not None:
+        lines += ['# HELP store_response_cache_requests_total Response cache lookups of the worker serving this scrape.',
+                  '# TYPE store_response_cache_requests_total counter']
+        for view, stats in sorted(response_cache_stats.items()):
+            lines.append(f'store_response_cache_requests_total{{view="{_label(view)}",result="hit"}} {stats["hits"]}')
+            lines.append(f'store_response_cache_requests_total{{view="{_label(view)}",result="miss"}} {stats["misses"]}')
+
+    if pool_stats:
+        states, events, waited, longest = [], [], [], []
+        for (alias, database), stats in sorted(pool_stats.items()):
+            labels = f'alias="{_label(alias)}",database="{_label(database)}"'
+            for state in ('idle', 'in_use', 'waiting'):
+                states.append(f'store_db_pool_connections{{{labels},state="{state}"}} {stats[state]}')
+            for event in ('checkouts', 'connects', 'waits', 'timeouts', 'check_failures', 'expired', 'discarded'):
+                events.append(f'store_db_pool_events_total{{{labels},event="{event}"}} {stats[event]}')
+            waited.append(f'store_db_pool_wait_seconds_total{{{labels}}} {stats["wait_seconds_total"]}')
+            longest.append(f'store_db_pool_wait_seconds_max{{{labels}}} {stats["wait_seconds_max"]}')
+        lines += ['# HELP store_db_pool_connections Pooled database connections of the worker serving this scrape.',
+                  '# TYPE store_db_pool_connections gauge'] + states
+        lines += ['# HELP store_db_pool_events_total Connection pool checkouts, new connections, waits and closures.',
+                  '# TYPE store_db_pool_events_total counter'] + events
+        lines += ['# HELP store_db_pool_wait_seconds_total Time checkouts spent waiting for a free connection.',
+                  '# TYPE store_db_pool_wait_seconds_total counter'] + waited
+        lines += ['# HELP store_db_pool_wait_seconds_max Longest wait of a checkout for a free connection.',
+                  '# TYPE store_db_pool_wait_seconds_max gauge'] + longest
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,277 @@
+import functools
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from store.metrics import registry
+from store.traffic import TrafficRecorder, body_shape, capture_record
+
+logger = logging.getLogger('store.performance')
+
+# Metrics of the request being served, for code that has no handle on the middleware
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Wall, database and serializer time collected for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.sql = []  # (seconds, sql) for every statement, reported only for slow requests
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += elapsed
+            self.sql.append((elapsed, sql))
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+
+# Execute wrappers of the request being served. Unlike connection.execute_wrapper(),
+# a contextvar follows the request into the thread sync_to_async runs ORM calls in
+_query_wrappers = ContextVar('query_wrappers', default=())
+
+
+def _run_query_wrappers(execute, sql, params, many, context):
+    for wrapper in reversed(_query_wrappers.get()):
+        execute = functools.partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install_query_wrappers(connection):
+    """Pass every query of ``connection`` through the wrap_queries() wrappers (on connection_created)."""
+    if _run_query_wrappers not in connection.execute_wrappers:
+        # First, so that popping a temporary execute_wrapper() never removes it
+        connection.execute_wrappers.insert(0, _run_query_wrappers)
+
+
+@contextmanager
+def wrap_queries(wrapper):
+    """Run ``wrapper`` around every query made in this context, on any connection."""
+    token = _query_wrappers.set(_query_wrappers.get() + (wrapper,))
+    try:
+        yield
+    finally:
+        _query_wrappers.reset(token)
+
+
+class QueryCounter:
+    __slots__ = ('count',)
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def time_serializer(func, *args):
+    """Call ``func(*args)``, counting its duration as serializer time of the current request."""
+    metrics = _current.get()
+    # Nested serializers run inside their parent's timing, so only the outermost call counts
+    if metrics is None or metrics.serializer_depth:
+        return func(*args)
+    metrics.serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        metrics.serializer_time += time.perf_counter() - start
+        metrics.serializer_depth -= 1
+
+
+class AsyncCapableMiddleware:
+    """
+    Base for middleware that runs natively in both WSGI and ASGI chains.
+
+    Subclasses implement ``__call__`` for sync requests and ``__acall__`` for
+    async ones; an async view is then never pushed onto a thread to get
+    through the chain.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+
+class PerformanceMiddleware(AsyncCapableMiddleware):
+    """
+    Per-request wall time, query count, DB time and serializer time.
+
+    The figures go out as a ``Server-Timing`` header and one JSON log line on
+    the ``store.performance`` logger. Requests slower than
+    ``PERFORMANCE['SLOW_REQUEST_MS']`` are logged as warnings with their
+    slowest statements. Disabled (the default), the middleware removes itself
+    from the chain at startup and costs nothing.
+    """
+
+    def __init__(self, get_response):
+        self.config = settings.PERFORMANCE
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed()
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with wrap_queries(metrics.record_query):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with wrap_queries(metrics.record_query):
+                response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.report(request, response, metrics)
+        return response
+
+    def report(self, request, response, metrics):
+        total_ms = metrics.total_time * 1000
+        db_ms = metrics.db_time * 1000
+        serializer_ms = metrics.serializer_time * 1000
+        if self.config['SERVER_TIMING']:
+            response['Server-Timing'] = (
+                f'total;dur={total_ms:.2f}, '
+                f'db;dur={db_ms:.2f};desc="{metrics.queries} queries", '
+                f'serializer;dur={serializer_ms:.2f}'
+            )
+
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 2),
+            'db_ms': round(db_ms, 2),
+            'queries': metrics.queries,
+            'serializer_ms': round(serializer_ms, 2),
+        }
+        if total_ms >= self.config['SLOW_REQUEST_MS']:
+            slowest = sorted(metrics.sql, key=lambda query: query[0], reverse=True)[:self.config['SLOW_QUERY_LIMIT']]
+            record['slow_sql'] = [{'ms': round(elapsed * 1000, 2), 'sql': sql} for elapsed, sql in slowest]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Feed every request's latency, status and query count to the metrics registry.
+
+    Requests are labelled with their URL name (``product-list``,
+    ``order-create``...), or ``unmatched`` when no route resolved.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed()
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with wrap_queries(counter):
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, counter.count)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with wrap_queries(counter):
+            response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, counter.count)
+        return response
+
+    def record(self, request, response, elapsed, queries):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match._func_path) if match else 'unmatched'
+        registry.record(view, request.method, response.status_code, elapsed, queries)
+
+
+class TrafficCaptureMiddleware(AsyncCapableMiddleware):
+    """
+    Sample requests into a JSONL file that replay_traffic can re-issue.
+
+    A ``TRAFFIC_CAPTURE['SAMPLE_RATE']`` share of requests is recorded with
+    method, path, route, the shape of the query string and of JSON bodies
+    (strings masked, see store.traffic.body_shape) and a pseudonym of the
+    authenticated user. Disabled (the default), it leaves the chain.
+    """
+
+    def __init__(self, get_response):
+        self.config = settings.TRAFFIC_CAPTURE
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed()
+        super().__init__(get_response)
+        self.recorder = TrafficRecorder(self.config['PATH'])
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= self.config['SAMPLE_RATE']:
+            return self.get_response(request)
+        body = self.body(request)
+        started = time.time()
+        response = self.get_response(request)
+        self.recorder.write(capture_record(request, response, body, started))
+        return response
+
+    async def __acall__(self, request):
+        if random.random() >= self.config['SAMPLE_RATE']:
+            return await self.get_response(request)
+        body = self.body(request)
+        started = time.time()
+        response = await self.get_response(request)
+        self.recorder.write(capture_record(request, response, body, started))
+        return response
+
+    def body(self, request):
+        if request.content_type != 'application/json':
+            return None
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (ValueError, TypeError):
+            return None  # Django reads such a body as empty; leave it to the view
+        # Oversized bodies are left alone: reading them here would buffer them in memory
+        if content_length > self.config['MAX_BODY_BYTES']:
+            return None
+        try:
+            return body_shape(json.loads(request.body or b'null'))
+        except ValueError:
+            return None
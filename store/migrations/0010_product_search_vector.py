@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+def add_search_vector(apps, schema_editor):
+    # Other databases fall back to the in-process index in store.search
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        """
+        ALTER TABLE store_product ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+        """
+    )
+    schema_editor.execute(
+        "CREATE INDEX product_search_vector_idx ON store_product USING GIN (search_vector)"
+    )
+
+
+def remove_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS product_search_vector_idx")
+    schema_editor.execute("ALTER TABLE store_product DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0009_outboxemail'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, remove_search_vector),
+    ]
@@ -2,4 +2,6 @@ from .user import CustomUser, CustomUserManager
 from .product import Product
 from .category import Category
 from .order import Order, OrderItem
-from .cart import Cart, CartItem
\ No newline at end of file
+from .cart import Cart, CartItem
+from .outbox import OutboxEmail
+from .idempotency import IdempotencyKey
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum, Window
 from django.conf import settings
 from store.models import Product
 
@@ -8,11 +9,95 @@ class Cart(models.Model):
     def __str__(self):
         return f"Cart of {self.user.email}"
 
+class CartItemManager(models.Manager):
+    # Backends that support INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+    upsert_vendors = ('postgresql', 'sqlite')
+
+    def add(self, cart, product_id, quantity):
+        """
+        Add ``quantity`` of a product to ``cart`` in one statement.
+
+        Inserts the line or bumps the existing one, but only while the combined
+        quantity fits the product's stock. Returns the saved CartItem, or None
+        if the product does not exist or does not have enough stock.
+        """
+        using = self._db or router.db_for_write(self.model, instance=cart)
+        connection = connections[using]
+        if connection.vendor not in self.upsert_vendors:
+            return self._add_with_lock(cart, product_id, quantity, using)
+
+        qn = connection.ops.quote_name
+        item_table, product_table = qn(self.model._meta.db_table), qn(Product._meta.db_table)
+        sql = f"""
+            INSERT INTO {item_table} (cart_id, product_id, quantity)
+            SELECT %s, id, %s FROM {product_table} WHERE id = %s AND stock_quantity >= %s
+            ON CONFLICT (cart_id, product_id) DO UPDATE
+            SET quantity = {item_table}.quantity + excluded.quantity
+            WHERE {item_table}.quantity + excluded.quantity <= (
+                SELECT stock_quantity FROM {product_table} WHERE id = excluded.product_id
+            )
+            RETURNING id, quantity
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [cart.id, quantity, product_id, quantity])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return self.model(id=row[0], cart=cart, product_id=product_id, quantity=row[1])
+
+    def bulk_set(self, items):
+        """
+        Insert ``items`` in one statement, setting the quantity of any whose
+        (cart, product) line already exists instead of failing on it.
+        """
+        options = {'update_conflicts': True, 'update_fields': ['quantity']}
+        if connections[router.db_for_write(self.model)].features.supports_update_conflicts_with_target:
+            options['unique_fields'] = ['cart', 'product']
+        return self.bulk_create(items, **options)
+
+    def with_totals(self):
+        """
+        Cart lines annotated with ``line_total`` and the ``cart_total`` of their cart.
+
+        Both are computed by the database in the same query; the grand total is a
+        window SUM over each cart's lines.
+        """
+        line_total = ExpressionWrapper(
+            F('product__price') * F('quantity'),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+        return self.annotate(
+            line_total=line_total,
+            cart_total=Window(Sum(line_total), partition_by=[F('cart_id')]),
+        )
+
+    def _add_with_lock(self, cart, product_id, quantity, using):
+        with transaction.atomic(using=using):
+            product = Product.objects.using(using).select_for_update().filter(id=product_id).first()
+            if product is None:
+                return None
+            item = self.using(using).select_for_update().filter(cart=cart, product_id=product_id).first()
+            new_quantity = quantity + (item.quantity if item else 0)
+            if new_quantity > product.stock_quantity:
+                return None
+            if item is None:
+                return self.db_manager(using).create(cart=cart, product=product, quantity=new_quantity)
+            item.quantity = new_quantity
+            item.save(update_fields=['quantity'])
+            return item
+
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, related_name='items', on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
 
+    objects = CartItemManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='unique_cart_product'),
+        ]
+
     def __str__(self):
         return f"{self.quantity} of {self.product.name} in cart {self.cart.id}"
 
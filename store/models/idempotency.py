@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+class IdempotencyKeyManager(models.Manager):
+    def expired(self, ttl=None):
+        ttl = settings.IDEMPOTENCY['TTL'] if ttl is None else ttl
+        return self.filter(created_at__lt=timezone.now() - timedelta(seconds=ttl))
+
+    def purge_expired(self, ttl=None, batch_size=1000):
+        # Deletes in batches so a large backlog never holds long locks
+        deleted = 0
+        while True:
+            ids = list(self.expired(ttl).values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return deleted
+            deleted += self.filter(id__in=ids).delete()[0]
+
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)  # SHA-256 of the request body
+    response_code = models.PositiveSmallIntegerField()
+    response_body = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = IdempotencyKeyManager()
+
+    class Meta:
+        constraints = [
+            # Also the index the replay lookup reads
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_user_idempotency_key'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at'], name='idempotency_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.response_code})"
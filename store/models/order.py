@@ -21,6 +21,12 @@ class Order(models.Model):
         default='pending'
     )
 
+    class Meta:
+        indexes = [
+            # Serves a user's order list newest first
+            models.Index(fields=['user', 'created_at'], name='order_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"Order {self.id} - {self.user.email}"
 
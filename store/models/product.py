@@ -15,5 +15,11 @@ class Product(models.Model):
     image = models.ImageField(upload_to='products/')
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='products')
 
+    class Meta:
+        indexes = [
+            # Backs keyset pagination ordered by price
+            models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+        ]
+
     def __str__(self):
         return self.name
@@ -0,0 +1,213 @@
+import os
+import threading
+import time
+from collections import deque
+
+# Pools by (database alias, database name), shared by every thread of a process
+pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(Exception):
+    """No connection came free within the pool's ``timeout``."""
+
+
+class _Entry:
+    __slots__ = ('connection', 'created', 'returned')
+
+    def __init__(self, connection, now):
+        self.connection = connection
+        self.created = now
+        self.returned = now
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of DB-API connections, shared by all threads of a process.
+
+    At most ``max_size`` connections are open at once; a checkout beyond that
+    waits up to ``timeout`` seconds for one to come back. Connections older
+    than ``max_lifetime`` are closed instead of reused, and idle ones are
+    closed after ``max_idle`` seconds, down to ``min_size``. A connection that
+    sat idle for more than ``check_after`` seconds is pinged with ``check``
+    before it is handed out, so one the server dropped is replaced instead of
+    failing the request. Expired connections are closed as connections are
+    checked out and in; there is no background thread.
+    """
+
+    def __init__(self, connect, check, reset, max_size=10, min_size=0, max_lifetime=1800.0, max_idle=300.0,
+                 timeout=30.0, check_after=1.0):
+        self.connect = connect  # () -> new connection
+        self.check = check  # (connection) -> None, raises if the connection is unusable
+        self.reset = reset  # (connection) -> whether it can be reused, after undoing leftover state
+        self.max_size = max_size
+        self.min_size = min_size
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.check_after = check_after
+        self._idle = deque()  # Most recently returned on the right
+        self._out = {}  # id(connection) -> entry, for connections checked out
+        self._size = 0  # Open connections, idle or checked out
+        self._condition = threading.Condition()
+        self._pid = os.getpid()
+        self.counters = dict.fromkeys(
+            ('checkouts', 'connects', 'waits', 'timeouts', 'check_failures', 'expired', 'discarded'), 0
+        )
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self._waiting = 0
+
+    def _after_fork(self):
+        # Connections inherited from the parent share its sockets: forget them without closing
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._idle.clear()
+            self._out.clear()
+            self._size = 0
+
+    def _close(self, entry):
+        self._size -= 1
+        try:
+            entry.connection.close()
+        except Exception:
+            pass
+
+    def _expired(self, entry, now):
+        return now - entry.created > self.max_lifetime
+
+    def checkout(self):
+        """Return an open connection, reusing an idle one when possible."""
+        deadline = None
+        with self._condition:
+            self._after_fork()
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    entry = self._idle.pop()
+                    if self._expired(entry, now):
+                        self.counters['expired'] += 1
+                        self._close(entry)
+                        continue
+                    break
+                else:
+                    entry = None
+                    if self._size < self.max_size:
+                        self._size += 1  # Reserve the slot; the connection is opened outside the lock
+                        break
+                if entry is not None:
+                    break
+                if deadline is None:
+                    deadline = now + self.timeout
+                    self.counters['waits'] += 1
+                remaining = deadline - now
+                if remaining <= 0:
+                    self.counters['timeouts'] += 1
+                    raise PoolTimeout(f'No connection available within {self.timeout:g}s (max_size={self.max_size})')
+                self._waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            if deadline is not None:
+                waited = time.monotonic() - (deadline - self.timeout)
+                self.wait_time += waited
+                self.max_wait_time = max(self.max_wait_time, waited)
+            self.counters['checkouts'] += 1
+
+        if entry is not None and time.monotonic() - entry.returned > self.check_after:
+            try:
+                self.check(entry.connection)
+            except Exception:
+                with self._condition:
+                    self.counters['check_failures'] += 1
+                    self._close(entry)
+                    self._size += 1  # Keep the slot for the replacement
+                entry = None
+        if entry is None:
+            try:
+                connection = self.connect()
+            except BaseException:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self.counters['connects'] += 1
+            entry = _Entry(connection, time.monotonic())
+        with self._condition:
+            self._out[id(entry.connection)] = entry
+        return entry.connection
+
+    def checkin(self, connection):
+        """Give ``connection`` back, or close it if it cannot or should not be reused."""
+        with self._condition:
+            entry = self._out.pop(id(connection), None)
+        reusable = entry is not None and self.reset(connection)
+        with self._condition:
+            if os.getpid() != self._pid or entry is None:
+                return  # Checked out before a fork, or never from this pool: not ours to return
+            now = time.monotonic()
+            if not reusable or self._expired(entry, now):
+                self.counters['discarded' if not reusable else 'expired'] += 1
+                self._close(entry)
+            else:
+                entry.returned = now
+                self._idle.append(entry)
+            # Idle connections beyond min_size are let go once they have not been needed for max_idle
+            while len(self._idle) > self.min_size and now - self._idle[0].returned > self.max_idle:
+                self.counters['expired'] += 1
+                self._close(self._idle.popleft())
+            self._condition.notify()
+
+    def discard(self, connection):
+        """Close a checked-out connection that must not be reused, freeing its slot."""
+        with self._condition:
+            entry = self._out.pop(id(connection), None)
+            if entry is not None:
+                self.counters['discarded'] += 1
+                self._close(entry)
+                self._condition.notify()
+
+    def close(self):
+        """Close every idle connection. Checked-out ones are closed when they come back."""
+        with self._condition:
+            while self._idle:
+                self._close(self._idle.popleft())
+
+    def stats(self):
+        with self._condition:
+            return {
+                **self.counters,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'waiting': self._waiting,
+                'max_size': self.max_size,
+                'wait_seconds_total': round(self.wait_time, 6),
+                'wait_seconds_max': round(self.max_wait_time, 6),
+            }
+
+
+def get_pool(key, factory):
+    """The pool stored under ``key``, built with ``factory()`` on first use."""
+    pool = pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = pools.get(key)
+            if pool is None:
+                pool = pools[key] = factory()
+    return pool
+
+
+def close_pool(key):
+    """Close and forget the pool stored under ``key``, if any."""
+    with _pools_lock:
+        pool = pools.pop(key, None)
+    if pool is not None:
+        pool.close()
+
+
+def pool_stats():
+    """stats() of every pool in this process, by (database alias, database name)."""
+    return {key: pool.stats() for key, pool in sorted(pools.items())}
@@ -0,0 +1,65 @@
+import datetime
+import decimal
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional: without it the standard library encodes, more slowly
+    orjson = None
+
+_drf_encoder = JSONEncoder()
+
+
+def default(obj):
+    """Encode the types JSON has none for; anything else as DRF's encoder does."""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)  # Exact, as the serializers already present prices
+    if isinstance(obj, datetime.datetime):
+        # orjson encodes datetimes itself, in this format; this is for the fallback encoder
+        value = obj.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    return _drf_encoder.default(obj)
+
+
+if orjson is not None:
+    _options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def _dumps(data):
+        return orjson.dumps(data, default=default, option=_options)
+else:
+    _encode = json.JSONEncoder(default=default, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode
+
+    def _dumps(data):
+        return _encode(data).encode('utf-8')
+
+
+def dumps(data):
+    """``data`` as compact UTF-8 JSON bytes."""
+    content = _dumps(data)
+    # As JSONRenderer: the two line separators JSON allows raw are invalid in JavaScript source
+    if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+        content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return content
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed.
+
+    Compact output is produced by ``dumps``, which encodes Decimals as exact
+    strings and datetimes in ISO 8601 itself instead of through DRF's encoder.
+    Indented output (the browsable API, ``; indent=`` in Accept) and the
+    UNICODE_JSON/COMPACT_JSON opt-outs go through JSONRenderer unchanged.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self.compact or self.ensure_ascii or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
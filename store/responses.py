@@ -0,0 +1,42 @@
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from store.renderers import dumps
+
+_omitted = object()
+
+
+def envelope(message, data=_omitted, code=status.HTTP_200_OK, success=None, **extra):
+    """
+    The ``{code, message, data, success}`` body every endpoint answers with.
+
+    ``data`` is left out when not given, ``success`` defaults to whether
+    ``code`` is below 400, and ``extra`` keys go between data and success.
+    """
+    body = {'code': code, 'message': message}
+    if data is not _omitted:
+        body['data'] = data
+    if extra:
+        body.update(extra)
+    body['success'] = code < 400 if success is None else success
+    return body
+
+
+def api_response(message, data=_omitted, code=status.HTTP_200_OK, success=None, headers=None, **extra):
+    """A DRF Response with the envelope as its body and ``code`` as its status."""
+    return Response(envelope(message, data, code, success, **extra), status=code, headers=headers)
+
+
+class JSONResponse(HttpResponse):
+    """
+    A JSON response rendered up front, for views outside DRF's dispatch.
+
+    Encoded exactly like FastJSONRenderer output. ``data`` is kept, as on a
+    DRF Response, so the response cache can store it.
+    """
+
+    def __init__(self, data, status=status.HTTP_200_OK, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(dumps(data), status=status, **kwargs)
+        self.data = data
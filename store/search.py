@@ -0,0 +1,137 @@
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+from store.models import Product
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+STOP_WORDS = frozenset('a an and are as at be by for from in is it of on or the to with'.split())
+
+# Relative weight of a term found in each field, mirroring setweight 'A' / 'B'
+NAME_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall((text or '').lower()) if token not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """
+    In-process full-text index of product names and descriptions.
+
+    Used where PostgreSQL's tsvector/GIN index is not available. The index is
+    built lazily from the database on the first search and then kept up to
+    date by the Product save/delete signals of this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = defaultdict(dict)  # term -> {product id: weighted term frequency}
+        self._doc_terms = {}  # product id -> terms, for removal
+        self.built = False
+
+    def build(self, chunk_size=2000):
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            rows = Product.objects.values_list('id', 'name', 'description').iterator(chunk_size=chunk_size)
+            for product_id, name, description in rows:
+                self._add(product_id, name, description)
+            self.built = True
+
+    def reset(self):
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self.built = False
+
+    def _add(self, product_id, name, description):
+        weights = defaultdict(float)
+        for term in tokenize(name):
+            weights[term] += NAME_WEIGHT
+        for term in tokenize(description):
+            weights[term] += DESCRIPTION_WEIGHT
+        for term, weight in weights.items():
+            self._postings[term][product_id] = weight
+        self._doc_terms[product_id] = tuple(weights)
+
+    def _remove(self, product_id):
+        for term in self._doc_terms.pop(product_id, ()):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(product_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def update(self, product):
+        with self._lock:
+            if not self.built:
+                return  # Picked up by the first build
+            self._remove(product.pk)
+            self._add(product.pk, product.name, product.description)
+
+    def remove(self, product_id):
+        with self._lock:
+            if self.built:
+                self._remove(product_id)
+
+    def search(self, query, limit=20):
+        """Ids of the best ``limit`` products containing every query term, ranked by TF-IDF."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            if not self.built:
+                self.build()
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return []
+            total = len(self._doc_terms)
+            # Intersect starting from the rarest term to keep the candidate set small
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for term_postings in postings[1:]:
+                candidates.intersection_update(term_postings)
+                if not candidates:
+                    return []
+            weighted = [
+                (term_postings, math.log(1 + total / len(term_postings))) for term_postings in postings
+            ]
+
+            def score(product_id):
+                return sum(term_postings[product_id] * idf for term_postings, idf in weighted)
+
+            # Best score first, lowest id breaking ties so results are stable
+            return heapq.nsmallest(limit, candidates, key=lambda product_id: (-score(product_id), product_id))
+
+
+search_index = InvertedIndex()
+
+
+def _postgres_search(query, limit):
+    # search_vector is a generated tsvector column with a GIN index, see migration 0010
+    table = Product._meta.db_table
+    tsquery = "websearch_to_tsquery('english', %s)"
+    return (
+        Product.objects
+        .filter(RawSQL(f'"{table}"."search_vector" @@ {tsquery}', [query], output_field=BooleanField()))
+        .annotate(rank=RawSQL(f'ts_rank_cd("{table}"."search_vector", {tsquery})', [query], output_field=FloatField()))
+        .order_by('-rank', 'id')[:limit]
+    )
+
+
+def search_products(query, limit=20):
+    """Products matching ``query`` in name or description, best match first."""
+    if connection.vendor == 'postgresql':
+        return list(_postgres_search(query, limit))
+    ids = search_index.search(query, limit)
+    products = Product.objects.in_bulk(ids)
+    # Ids from rolled-back writes may still be indexed; in_bulk drops them
+    return [products[product_id] for product_id in ids if product_id in products]
@@ -0,0 +1,199 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from store.cache import invalidate
+from store.models import Cart, CartItem, Category, CustomUser, Order, OrderItem, Product
+from store.search import search_index
+
+WORDS = (
+    'wireless bluetooth headphones leather wallet stainless steel bottle cotton shirt running shoes '
+    'organic coffee beans ceramic mug gaming mouse mechanical keyboard usb cable charger phone case '
+    'glass screen protector yoga mat dumbbell set camping tent sleeping bag hiking backpack desk lamp '
+    'led bulb smart watch fitness tracker kitchen knife cutting board blender toaster kettle pillow '
+    'blanket towel soap shampoo sunscreen notebook pen pencil marker paint brush canvas frame mirror'
+).split()
+
+PAYMENT_METHODS = ['Credit Card', 'PayPal', 'Cash on Delivery']
+
+
+class Zipf:
+    """
+    Draw from ``population`` with Zipfian weights (the k-th most popular item has weight 1/k**s).
+
+    Popularity ranks are shuffled, so the most popular items are spread over
+    the id range rather than being the first rows inserted.
+    """
+
+    def __init__(self, population, s, rng):
+        self.population = list(population)
+        rng.shuffle(self.population)
+        self.cum_weights = list(accumulate(1 / rank ** s for rank in range(1, len(self.population) + 1)))
+        self.rng = rng
+
+    def sample(self, k=1):
+        return self.rng.choices(self.population, cum_weights=self.cum_weights, k=k)
+
+    def distinct(self, k):
+        # A handful of redraws at most: popular items collide, the tail rarely does
+        chosen = set()
+        while len(chosen) < min(k, len(self.population)):
+            chosen.update(self.sample(k - len(chosen)))
+        return chosen
+
+
+def _batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(model, rows, batch_size):
+    """bulk_create ``rows`` in batches and return the new primary keys."""
+    pks = []
+    for batch in _batches(rows, batch_size):
+        pks.extend(obj.pk for obj in model.objects.bulk_create(batch))
+    return pks
+
+
+def seed_store(users, categories, products, carts, orders, batch_size=5000, skew=1.1, days=365,
+               password='password', seed=None, log=None):
+    """
+    Fill the database with synthetic users, categories, products, carts and orders.
+
+    Product and category popularity follow a Zipf distribution with exponent
+    ``skew``, and so do the buyers, so a few products, categories and users
+    account for most of the cart lines and orders, as in real traffic. Rows
+    are written with bulk_create in ``batch_size`` batches, and every user
+    shares one password hash, computed once. Signals do not fire for bulk
+    inserts, so the response cache and the search index are reset at the end.
+    Returns the number of rows written per model.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    run = f'{rng.getrandbits(32):08x}'
+    written = {}
+    password_hash = make_password(password)
+
+    log(f'Users: {users}')
+    with transaction.atomic():
+        user_ids = _insert(CustomUser, (
+            CustomUser(
+                email=f'user{i}.{run}@example.com',
+                name=f'{rng.choice(WORDS).title()} User {i}',
+                address=f'{rng.randint(1, 9999)} {rng.choice(WORDS).title()} St',
+                phone_number=f'+1{rng.randint(2_000_000_000, 9_999_999_999)}',
+                password=password_hash,
+            )
+            for i in range(users)
+        ), batch_size)
+    written['users'] = len(user_ids)
+    if not user_ids:
+        return written
+
+    log(f'Categories: {categories}')
+    with transaction.atomic():
+        category_ids = _insert(Category, (
+            Category(
+                name=f'{" ".join(rng.sample(WORDS, 2)).title()} {i}.{run}',
+                description=' '.join(rng.choices(WORDS, k=12)),
+                created_by_id=rng.choice(user_ids),
+            )
+            for i in range(categories)
+        ), batch_size)
+    written['categories'] = len(category_ids)
+    if not category_ids:
+        return written
+
+    log(f'Products: {products}')
+    category_by_popularity = Zipf(category_ids, skew, rng)
+    prices = []
+
+    def product_rows():
+        for i in range(products):
+            price = Decimal(f'{min(max(rng.lognormvariate(3.2, 0.9), 1), 5000):.2f}')
+            prices.append(price)
+            yield Product(
+                name=' '.join(rng.sample(WORDS, 3) + [f'model{i}']),
+                description=' '.join(rng.choices(WORDS, k=25)),
+                price=price,
+                stock_quantity=rng.randint(0, 500),
+                category_id=category_by_popularity.sample()[0],
+                image='products/seed.jpg',
+                created_by_id=rng.choice(user_ids),
+            )
+
+    with transaction.atomic():
+        product_ids = _insert(Product, product_rows(), batch_size)
+    written['products'] = len(product_ids)
+    if not product_ids:
+        return written
+    price_by_id = dict(zip(product_ids, prices))
+    product_by_popularity = Zipf(product_ids, skew, rng)
+    buyer_by_activity = Zipf(user_ids, skew, rng)
+
+    carts = min(carts, len(user_ids))
+    log(f'Carts: {carts}')
+    with transaction.atomic():
+        cart_ids = _insert(Cart, (Cart(user_id=user_id) for user_id in rng.sample(user_ids, carts)), batch_size)
+        written['cart_items'] = len(_insert(CartItem, (
+            CartItem(cart_id=cart_id, product_id=product_id, quantity=rng.randint(1, 3))
+            for cart_id in cart_ids
+            for product_id in product_by_popularity.distinct(rng.randint(1, 8))
+        ), batch_size))
+    written['carts'] = len(cart_ids)
+
+    log(f'Orders: {orders}')
+    now = timezone.now()
+    written['orders'] = written['order_items'] = 0
+    for batch in _batches(range(orders), batch_size):
+        lines_per_order = []
+        order_rows = []
+        placed_at = []
+        for _ in batch:
+            lines = [
+                (product_id, rng.randint(1, 3))
+                # Mostly small baskets with a long tail
+                for product_id in product_by_popularity.distinct(min(1 + int(rng.expovariate(0.5)), 20))
+            ]
+            lines_per_order.append(lines)
+            buyer_id = buyer_by_activity.sample()[0]
+            placed_at.append(now - timedelta(seconds=rng.randint(0, days * 86400)))
+            order_rows.append(Order(
+                user_id=buyer_id,
+                shipping_address=f'{rng.randint(1, 9999)} {rng.choice(WORDS).title()} St',
+                payment_method=rng.choice(PAYMENT_METHODS),
+                total_price=sum(price_by_id[product_id] * quantity for product_id, quantity in lines),
+                shipping_status=rng.choices(
+                    ['delivered', 'shipped', 'pending', 'cancelled'], weights=[70, 15, 10, 5]
+                )[0],
+            ))
+        with transaction.atomic():
+            created = Order.objects.bulk_create(order_rows)
+            # created_at is auto_now_add, so the spread of past dates goes in with a second statement
+            for order, created_at in zip(created, placed_at):
+                order.created_at = created_at
+            Order.objects.bulk_update(created, ['created_at'], batch_size=batch_size)
+            written['order_items'] += len(_insert(OrderItem, (
+                OrderItem(
+                    order_id=order.pk, product_id=product_id, quantity=quantity,
+                    price=price_by_id[product_id] * quantity,
+                )
+                for order, lines in zip(created, lines_per_order)
+                for product_id, quantity in lines
+            ), batch_size))
+        written['orders'] += len(created)
+
+    invalidate('product', 'category')
+    search_index.reset()
+    return written
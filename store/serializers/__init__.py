@@ -1,5 +1,5 @@
 from .user import SignupSerializer, UserProfileSerializer
 from .product import ProductSerializer
 from .category import CategorySerializer
-from .order import OrderCreateSerializer, OrderListSerializer, OrderDetailSerializer, OrderItemDetailSerializer, OrderStatusUpdateSerializer
-from .cart import CartItemSerializer
\ No newline at end of file
+from .order import OrderCreateSerializer, CheckoutSerializer, OrderListSerializer, OrderDetailSerializer, OrderItemDetailSerializer, OrderStatusUpdateSerializer
+from .cart import CartAddSerializer, CartBatchSerializer, CartItemSerializer
\ No newline at end of file
@@ -1,36 +1,27 @@
 from rest_framework import serializers
+from store.serializers.timing import TimedSerializerMixin
 from store.models import CartItem
 
-class CartItemSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = CartItem
-        fields = ['id', 'product', 'quantity']
-    
-    def validate(self, data):
-        product = data['product']
-        quantity = data['quantity']
-        
-        if quantity > product.stock_quantity:
-            raise serializers.ValidationError("Product out of quantity.")
-        
-        return data
+class CartAddSerializer(TimedSerializerMixin, serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
 
-    def create(self, validated_data):
-        cart = validated_data.get('cart')
-        product = validated_data.get('product')
-        quantity = validated_data.get('quantity')
+class CartBatchLineSerializer(TimedSerializerMixin, serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0)  # 0 removes the line
 
-        # Check if the product is already in the cart
-        cart_item, created = CartItem.objects.get_or_create(cart=cart, product=product)
+class CartBatchSerializer(TimedSerializerMixin, serializers.Serializer):
+    items = CartBatchLineSerializer(many=True, allow_empty=False, max_length=100)
 
-        if not created:
-            # Update the quantity if already exists
-            cart_item.quantity += quantity
+    def validate_items(self, value):
+        product_ids = [line['product_id'] for line in value]
+        if len(set(product_ids)) != len(product_ids):
+            raise serializers.ValidationError("Each product may appear only once.")
+        return value
 
-            if cart_item.quantity > product.stock_quantity:
-                raise serializers.ValidationError("Product out of quantity.")
-        else:
-            cart_item.quantity = quantity
-        
-        cart_item.save()
-        return cart_item
+class CartItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # Output only: AddToCartView validates with CartAddSerializer and writes through CartItem.objects.add
+    class Meta:
+        model = CartItem
+        fields = ['id', 'product', 'quantity']
+        read_only_fields = fields
@@ -1,12 +1,15 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+from store.serializers.timing import TimedSerializerMixin
 from store.models import Category
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ['id', 'name', 'description']
-
-    def validate_name(self, value):
-        if Category.objects.filter(name=value).exists():
-            raise serializers.ValidationError("Category with this name already exists.")
-        return value
+        extra_kwargs = {
+            # The single uniqueness check ModelSerializer would add, keeping the API's error message
+            'name': {'validators': [UniqueValidator(
+                queryset=Category.objects.all(), message="Category with this name already exists."
+            )]},
+        }
@@ -1,41 +1,76 @@
+import logging
+from collections import defaultdict
+from django.db import transaction
 from rest_framework import serializers
+from store.serializers.timing import TimedSerializerMixin
+from store.exceptions import InsufficientStock
+from store.checkout import place_order
 from store.models import OrderItem, Product, Order, CustomUser
 
-class OrderItemSerializer(serializers.ModelSerializer):
+logger = logging.getLogger(__name__)
+
+PAYMENT_METHODS = ['Credit Card', 'PayPal', 'Cash on Delivery']
+
+def stock_errors(exc):
+    """Field errors for an InsufficientStock, one per short product."""
+    return {
+        f'product_{product_id}': (
+            f"Product with ID {product_id} does not exist." if available is None
+            else f"Only {available} units are available."
+        )
+        for product_id, available in exc.shortages.items()
+    }
+
+class OrderItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = ['product', 'quantity', 'price']
 
-class OrderCreateSerializer(serializers.Serializer):
+class OrderLineSerializer(TimedSerializerMixin, serializers.Serializer):
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+    price = serializers.DecimalField(max_digits=None, decimal_places=None, required=False, allow_null=True)
+
+class OrderCreateSerializer(TimedSerializerMixin, serializers.Serializer):
     user_id = serializers.IntegerField()
-    products = serializers.ListField(
-        child=serializers.DictField()
-    )
+    products = OrderLineSerializer(many=True)
     shipping_address = serializers.CharField(max_length=255)
     payment_method = serializers.CharField(max_length=50)
 
+    @staticmethod
+    def requested_quantities(lines):
+        # Total quantity per product, so repeated lines are checked and decremented together.
+        # The lines are already validated, so ids and quantities are ints.
+        quantities = defaultdict(int)
+        for product_data in lines:
+            quantities[product_data['product_id']] += product_data['quantity']
+        return quantities
+
     def validate(self, data):
         errors = {}
 
+        # One query for every product in the order
+        quantities = self.requested_quantities(data['products'])
+        products = Product.objects.in_bulk(list(quantities))
+
         for product_data in data['products']:
-            product_id = product_data.get('product_id')
-            quantity = product_data.get('quantity')
+            product_id = product_data['product_id']
+            quantity = product_data['quantity']
             price = product_data.get('price')
 
-            try:
-                product = Product.objects.get(id=product_id)
-            except Product.DoesNotExist:
+            product = products.get(product_id)
+            if product is None:
                 errors[f'product_{product_id}'] = f"Product with ID {product_id} does not exist."
                 continue
 
-            if product.stock_quantity < quantity:
+            if product.stock_quantity < quantities[product_id]:
                 errors[f'product_{product_id}'] = f"Only {product.stock_quantity} units of {product.name} are available."
 
             expected_price = product.price * quantity
             if price is not None and price != expected_price:
                 errors[f'product_{product_id}_price'] = f"Invalid price for {product.name}. The correct price should be {expected_price:.2f}."
 
-        if data['payment_method'] not in ['Credit Card', 'PayPal', 'Cash on Delivery']:
+        if data['payment_method'] not in PAYMENT_METHODS:
             errors['payment_method'] = "Invalid payment method."
 
         if errors:
@@ -45,71 +80,57 @@ class OrderCreateSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         try:
-            user = CustomUser.objects.get(id=validated_data['user_id'])
-            order = Order.objects.create(
-                user=user,
-                shipping_address=validated_data['shipping_address'],
-                payment_method=validated_data['payment_method'],
-            )
-
-            total_price = 0
-            for product_data in validated_data['products']:
-                product_id = product_data.get('product_id')
-                quantity = product_data.get('quantity')
-                price = product_data.get('price')
+            with transaction.atomic():
+                user = CustomUser.objects.get(id=validated_data['user_id'])
 
+                # Takes the stock for every line or raises without touching anything
                 try:
-                    product = Product.objects.get(id=product_id)
-                except Product.DoesNotExist:
-                    # Handle the case if product is not found
-                    raise serializers.ValidationError(f"Product with ID {product_id} does not exist.")
-
-                item_price = product.price * quantity
-                total_price += item_price
-
-                OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    quantity=quantity,
-                    price=item_price
-                )
-
-                product.stock_quantity -= quantity
-                product.save()
-
-            order.total_price = total_price
-            order.save()
+                    order = place_order(
+                        user,
+                        [(line.get('product_id'), line.get('quantity')) for line in validated_data['products']],
+                        validated_data['shipping_address'],
+                        validated_data['payment_method'],
+                    )
+                except InsufficientStock as e:
+                    raise serializers.ValidationError(stock_errors(e))
 
             return order
         except serializers.ValidationError as e:
-            # Log validation errors
-            print(f"Validation Error: {e}")
+            logger.info("Order validation failed: %s", e.detail)
             raise
-        except Exception as e:
-            # Log unexpected errors
-            print(f"Unexpected Error: {e}")
+        except Exception:
+            logger.exception("Unexpected error while creating an order")
             raise
 
-class OrderListSerializer(serializers.ModelSerializer):
+class CheckoutSerializer(TimedSerializerMixin, serializers.Serializer):
+    shipping_address = serializers.CharField(max_length=255)
+    payment_method = serializers.CharField(max_length=50)
+
+    def validate_payment_method(self, value):
+        if value not in PAYMENT_METHODS:
+            raise serializers.ValidationError("Invalid payment method.")
+        return value
+
+class OrderListSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True)  # Nested serializer for order items
 
     class Meta:
         model = Order
         fields = ['id', 'created_at', 'shipping_address', 'payment_method', 'total_price', 'items']
 
-class OrderItemDetailSerializer(serializers.ModelSerializer):
+class OrderItemDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = ['product', 'quantity', 'price']
 
-class OrderDetailSerializer(serializers.ModelSerializer):
+class OrderDetailSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     items = OrderItemDetailSerializer(many=True, read_only=True)
 
     class Meta:
         model = Order
         fields = ['id', 'user', 'created_at', 'shipping_address', 'payment_method', 'total_price', 'shipping_status', 'items']
 
-class OrderStatusUpdateSerializer(serializers.ModelSerializer):
+class OrderStatusUpdateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ['shipping_status']
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from store.serializers.timing import TimedSerializerMixin
 from store.models import Product, Category
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     category = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all()
     )
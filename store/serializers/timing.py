@@ -0,0 +1,18 @@
+from rest_framework.fields import empty
+
+from store.middleware import time_serializer
+
+
+class TimedSerializerMixin:
+    """
+    Count validation and representation as serializer time in PerformanceMiddleware.
+
+    With ``many=True`` the ListSerializer calls its child's methods, so lists
+    are timed too.
+    """
+
+    def run_validation(self, data=empty):
+        return time_serializer(super().run_validation, data)
+
+    def to_representation(self, instance):
+        return time_serializer(super().to_representation, instance)
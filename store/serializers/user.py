@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from .timing import TimedSerializerMixin
 from ..models import CustomUser
 
-class SignupSerializer(serializers.ModelSerializer):
+class SignupSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     confirm_password = serializers.CharField(write_only=True, min_length=8)
 
     class Meta:
@@ -28,7 +29,7 @@ class SignupSerializer(serializers.ModelSerializer):
         )
         return user
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ['name', 'email', 'address', 'phone_number']
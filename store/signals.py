@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from store.authentication import auth_cache
+from store.cache import invalidate
+from store.middleware import install_query_wrappers
+from store.models import Category, CustomUser, Product
+from store.search import search_index
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_cached_user(sender, instance, using, **kwargs):
+    # Again on commit, as store.cache.invalidate does: a request may re-cache the old row in between
+    user_id = instance.pk
+    auth_cache.invalidate_user(user_id)
+    transaction.on_commit(lambda: auth_cache.invalidate_user(user_id), using=using)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_responses(sender, instance, **kwargs):
+    invalidate('product')
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, **kwargs):
+    search_index.update(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    search_index.remove(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_responses(sender, instance, **kwargs):
+    # Product lists filter by category name, so they depend on categories too
+    invalidate('category', 'product')
+
+
+@receiver(connection_created)
+def wrap_connection_queries(sender, connection, **kwargs):
+    install_query_wrappers(connection)
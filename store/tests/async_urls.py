@@ -0,0 +1,11 @@
+from django.urls import path
+
+from ecommerce_project.urls import urlpatterns as project_urlpatterns
+from store.views import AsyncCategoryListView, AsyncProductDetailView, AsyncProductListView
+
+# The project's routes as with ASYNC_CATALOG_VIEWS=True: the async views shadow the sync ones
+urlpatterns = [
+    path('api/products/', AsyncProductListView.as_view(), name='product-list'),
+    path('api/products/<int:pk>/', AsyncProductDetailView.as_view(), name='product-detail'),
+    path('api/categories/all/', AsyncCategoryListView.as_view(), name='category-list'),
+] + project_urlpatterns
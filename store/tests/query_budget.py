@@ -0,0 +1,40 @@
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Assertions that fail when code runs more queries than budgeted.
+
+    Failures list every captured statement, so the N+1 shows up in the test
+    output instead of having to be reproduced.
+    """
+
+    # Data sizes every budget is checked at; a budget that holds at both does not grow with the data
+    query_budget_sizes = (2, 20)
+
+    @contextmanager
+    def assertMaxQueries(self, budget, label='', using='default'):
+        with CaptureQueriesContext(connections[using]) as captured:
+            yield captured
+        if len(captured) > budget:
+            statements = '\n'.join(f'{i}. {query["sql"]}' for i, query in enumerate(captured.captured_queries, 1))
+            self.fail(f'{label or "Block"} ran {len(captured)} queries, budget is {budget}:\n{statements}')
+
+    def assertQueryBudget(self, budget, request, grow, label=''):
+        """
+        Check ``request()`` against ``budget`` once per size in ``query_budget_sizes``.
+
+        ``grow(size)`` brings the data the request reads up to ``size`` rows
+        (cart lines, order items, products...) before each measurement.
+        ``request`` returns the response, which must not be an error.
+        """
+        for size in self.query_budget_sizes:
+            grow(size)
+            with self.assertMaxQueries(budget, f'{label} with {size} rows'):
+                response = request()
+                if getattr(response, 'streaming', False):
+                    b''.join(response.streaming_content)  # Streaming bodies query as they are consumed
+            self.assertLess(response.status_code, 400, f'{label} with {size} rows returned {response.status_code}')
@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ..cache import cache_stats
+from ..metrics import registry
+from ..models import Category, Product
+
+User = get_user_model()
+
+
+@override_settings(ROOT_URLCONF='store.tests.async_urls')
+class AsyncCatalogViewTests(APITestCase):
+    """The async catalog views answer exactly as their sync counterparts."""
+
+    def setUp(self):
+        cache_stats.clear()
+        registry.clear()
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.category = Category.objects.create(name='Category 1', description='First', created_by=self.user)
+        other = Category.objects.create(name='Category 2', created_by=self.user)
+        self.products = [
+            Product.objects.create(
+                name=f'Product {i}', description=f'Description {i}', price=price, stock_quantity=10,
+                category=self.category if i % 2 else other, image='path/to/image.jpg', created_by=self.user
+            )
+            for i, price in enumerate([30.00, 10.00, 20.00, 10.00, 20.00])
+        ]
+        # After the fixtures: with replicas configured, their writes would hold off caching replica reads
+        cache.clear()
+
+    def assertSameAsSync(self, url, **extra):
+        response = self.client.get(url, **extra)
+        with override_settings(ROOT_URLCONF='ecommerce_project.urls'):
+            cache.clear()
+            expected = self.client.get(url, **extra)
+        cache.clear()
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.json(), expected.json())
+        return response
+
+    def test_product_list(self):
+        for url in (
+            '/api/products/',
+            '/api/products/?page_size=2&page=2',
+            '/api/products/?page=last&page_size=2',
+            '/api/products/?category=Category%201',
+            '/api/products/?min_price=15&max_price=25',
+            '/api/products/?page=9',
+        ):
+            with self.subTest(url=url):
+                self.assertSameAsSync(url)
+
+    def test_product_list_keyset_pages(self):
+        response = self.assertSameAsSync('/api/products/?pagination=cursor&ordering=price&page_size=2')
+        self.assertSameAsSync(response.json()['data']['next'])
+
+    def test_product_detail(self):
+        response = self.assertSameAsSync(f'/api/products/{self.products[0].id}/')
+        self.assertEqual(response.json()['data']['price'], '30.00')
+        self.assertSameAsSync('/api/products/0/')
+
+    def test_category_list(self):
+        response = self.assertSameAsSync('/api/categories/all/')
+        self.assertEqual(len(response.json()['data']['categories']), 2)
+
+    def test_authentication(self):
+        self.assertSameAsSync('/api/products/', HTTP_AUTHORIZATION='Bearer not-a-token')
+
+        token = RefreshToken.for_user(self.user).access_token
+        self.assertSameAsSync('/api/products/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_unsupported_method(self):
+        response = self.client.post('/api/products/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertEqual(response.json()['message'], 'Method "POST" not allowed.')
+
+    def test_responses_are_cached(self):
+        first = self.client.get('/api/products/')
+        second = self.client.get('/api/products/')
+
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.json(), first.json())
+
+        Product.objects.filter(pk=self.products[0].pk).update(name='Renamed')
+        self.products[0].save()  # Signals bump the version
+        self.assertEqual(self.client.get('/api/products/')['X-Cache'], 'MISS')
+
+    async def test_served_through_the_async_middleware_chain(self):
+        response = await self.async_client.get('/api/categories/all/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        (view, method, entry), = registry.snapshot()['series']
+        self.assertEqual((view, method), ('category-list', 'GET'))
+        self.assertEqual(entry[-1], 1)  # The query ran on another thread and was still counted
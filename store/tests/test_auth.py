@@ -2,13 +2,14 @@ from rest_framework.test import APITestCase, APIClient
 from django.urls import reverse
 from rest_framework import status
 from django.core import mail
-from ..models import CustomUser, Product, Category, Order, OrderItem
+from django.core.management import call_command
+from ..models import CustomUser, Product, Category, Order, OrderItem, OutboxEmail
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.core.files.uploadedfile import SimpleUploadedFile
 from store.serializers import ProductSerializer, OrderDetailSerializer
 from PIL import Image
-from io import BytesIO
+from io import BytesIO, StringIO
 from django.test import TestCase
 from django.db import IntegrityError
 from unittest.mock import patch
@@ -43,7 +44,12 @@ class SignupViewTests(APITestCase):
         # Send the request
         response = self.client.post(self.signup_url, self.valid_payload, format='json')
 
-        # Verify the email was sent
+        # The email is queued, not sent during the request
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.filter(status='pending').count(), 1)
+
+        # Verify the email was sent once the outbox is drained
+        call_command('send_outbox', stdout=StringIO())
         self.assertEqual(len(mail.outbox), 1)
         email = mail.outbox[0]
         self.assertEqual(email.subject, 'Thank You for Signing Up')
@@ -697,6 +703,15 @@ class CategoryCreateTestCase(APITestCase):
         # Assert the category was created
         self.assertTrue(Category.objects.filter(name='Fashion').exists())
 
+    def test_create_duplicate_category(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self.token)
+        self.client.post(self.url, {'name': 'Fashion'})
+
+        response = self.client.post(self.url, {'name': 'Fashion'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['data']['name'], ["Category with this name already exists."])
+
     def test_create_category_unauthenticated(self):
         data = {
             'name': 'Fashion',
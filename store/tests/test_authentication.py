@@ -0,0 +1,80 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+from store.authentication import AuthCache, auth_cache
+
+User = get_user_model()
+
+class AuthCacheTests(APITestCase):
+    def setUp(self):
+        auth_cache.clear()
+        self.user = User.objects.create_user(
+            email='testuser@example.com',
+            password='testpassword123',
+            name='Test User',
+            address='123 Test Address',
+            phone_number='+1234567890'
+        )
+        self.token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def get_profile(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_second_request_skips_user_query(self):
+        _, first_queries = self.get_profile()
+        _, second_queries = self.get_profile()
+
+        self.assertEqual(first_queries, 1)
+        self.assertEqual(second_queries, 0)
+        stats = auth_cache.stats()
+        self.assertEqual(stats['user_hits'], 1)
+        self.assertEqual(stats['user_misses'], 1)
+        self.assertEqual(stats['token_hits'], 1)
+        self.assertEqual(stats['token_misses'], 1)
+
+    def test_saving_user_invalidates_entry(self):
+        self.get_profile()
+        User.objects.filter(pk=self.user.pk).update(name='Stale Name')
+        self.user.name = 'Fresh Name'
+        self.user.save()
+
+        response, queries = self.get_profile()
+
+        self.assertEqual(queries, 1)
+        self.assertEqual(response.data['data']['name'], 'Fresh Name')
+
+    def test_user_cached_before_the_commit_is_dropped_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.name = 'Fresh Name'
+            self.user.save()
+            auth_cache.get_user(self.user.pk)  # Another request reading the row before the commit
+
+        self.assertIsNone(auth_cache.users.get(self.user.pk))
+
+    def test_deleted_user_is_rejected(self):
+        self.get_profile()
+        self.user.delete()
+
+        response = self.client.get('/api/auth/profile/')
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_shared_tier_serves_other_workers(self):
+        shared = AuthCache({'SHARED_CACHE': 'default'})
+        shared.get_user(self.user.id)
+        other_worker = AuthCache({'SHARED_CACHE': 'default'})
+
+        with CaptureQueriesContext(connection) as queries:
+            user = other_worker.get_user(self.user.id)
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(user.email, self.user.email)
+        self.assertEqual(other_worker.stats()['user_shared_hits'], 1)
+        shared.invalidate_user(self.user.id)
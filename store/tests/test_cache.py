@@ -0,0 +1,131 @@
+import time
+from unittest import mock
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from store.cache import bump_version, cache_response, cache_stats, response_cache_stats
+from store.db_router import use_replica
+from ..models import Product, Category
+
+User = get_user_model()
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache_stats.clear()
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Category 1', created_by=self.user)
+        self.product = Product.objects.create(
+            name='Product 1', description='Description 1', price=10.00, stock_quantity=100,
+            category=self.category, image='path/to/image1.jpg', created_by=self.user
+        )
+        # After the fixtures: with replicas configured, their writes would hold off caching replica reads
+        cache.clear()
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_repeated_reads_are_served_from_cache(self):
+        for url in ['/api/products/', f'/api/products/{self.product.id}/', '/api/categories/all/']:
+            first, _ = self.get(url)
+            second, queries = self.get(url)
+
+            self.assertEqual(first['X-Cache'], 'MISS')
+            self.assertEqual(second['X-Cache'], 'HIT')
+            self.assertEqual(queries, 0)
+            self.assertEqual(second.data, first.data)
+
+        stats = response_cache_stats()
+        self.assertEqual(stats['ProductListView'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_query_string_is_normalized(self):
+        self.get('/api/products/?min_price=1&max_price=50')
+        response, _ = self.get('/api/products/?max_price=50&min_price=1')
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_product_update_invalidates(self):
+        self.get('/api/products/')
+        self.client.patch(f'/api/products/{self.product.id}/update/', {'name': 'Renamed'}, format='json')
+
+        response, _ = self.get('/api/products/')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['data']['products'][0]['name'], 'Renamed')
+
+    def test_category_write_invalidates_products_and_categories(self):
+        self.get('/api/products/?category=Category 1')
+        self.get('/api/categories/all/')
+        self.client.put(f'/api/categories/{self.category.id}/update/', {'name': 'Category 2'}, format='json')
+
+        products, _ = self.get('/api/products/?category=Category 1')
+        categories, _ = self.get('/api/categories/all/')
+
+        self.assertEqual(products['X-Cache'], 'MISS')
+        self.assertEqual(categories['X-Cache'], 'MISS')
+        self.assertEqual(categories.data['data']['categories'][0]['name'], 'Category 2')
+
+    def test_stock_reservation_invalidates(self):
+        self.get(f'/api/products/{self.product.id}/')
+        self.client.post('/api/orders/create/', {
+            'user_id': self.user.id,
+            'products': [{'product_id': self.product.id, 'quantity': 1}],
+            'shipping_address': '123 Test St',
+            'payment_method': 'Credit Card'
+        }, format='json')
+
+        response, _ = self.get(f'/api/products/{self.product.id}/')
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['data']['stock_quantity'], 99)
+
+
+class LaggingReplicaView:
+    """Answers with whatever the replica has, which may be behind the primary."""
+    replica_names = ['Product 1']
+
+    @cache_response('product')
+    def get(self, request):
+        return Response({'names': list(self.replica_names)})
+
+
+@override_settings(REPLICAS={'ALIASES': ['replica1'], 'PIN_SECONDS': 5, 'CACHE_ALIAS': 'default'})
+class ReplicaResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.view = LaggingReplicaView()
+        self.view.replica_names = ['Product 1']
+
+    def get(self):
+        with use_replica():
+            return self.view.get(Request(APIRequestFactory().get('/api/products/')))
+
+    def test_lagging_replica_read_after_a_write_is_not_cached(self):
+        self.get()
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+
+        bump_version('product')  # The primary now has 'Renamed'; the replica has not caught up
+        stale = self.get()
+        self.view.replica_names = ['Renamed']  # Caught up
+        fresh = self.get()
+
+        self.assertEqual((stale['X-Cache'], stale.data['names']), ('MISS', ['Product 1']))
+        self.assertEqual((fresh['X-Cache'], fresh.data['names']), ('MISS', ['Renamed']))
+
+    def test_replica_reads_are_cached_again_once_the_lag_window_passes(self):
+        bump_version('product')
+        with mock.patch('time.time', return_value=time.time() + 6):
+            self.get()
+
+        response = self.get()
+
+        self.assertEqual(response['X-Cache'], 'HIT')
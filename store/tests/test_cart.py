@@ -0,0 +1,247 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from ..models import Product, Category, Cart, CartItem, Order
+
+User = get_user_model()
+
+class AddToCartTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name='Test Category', created_by=self.user)
+        self.product = Product.objects.create(
+            name='Product 1', description='Description 1', price=10.00, stock_quantity=5,
+            category=category, image='path/to/image1.jpg', created_by=self.user
+        )
+        self.url = '/api/cart/add/'
+
+    def add(self, quantity, product_id=None):
+        return self.client.post(self.url, {'product_id': product_id or self.product.id, 'quantity': quantity}, format='json')
+
+    def test_add_takes_two_statements(self):
+        self.add(1)  # Creates the cart
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.add(2)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(response.data['data']['quantity'], 3)
+        self.assertEqual(CartItem.objects.get().quantity, 3)
+
+    def test_repeated_adds_keep_one_line(self):
+        self.add(1)
+        self.add(1)
+
+        cart = Cart.objects.get(user=self.user)
+        self.assertEqual(list(cart.items.values_list('product_id', 'quantity')), [(self.product.id, 2)])
+
+    def test_add_beyond_stock_is_rejected(self):
+        self.add(5)
+
+        response = self.add(1)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Product out of quantity.')
+        self.assertEqual(CartItem.objects.get().quantity, 5)
+
+    def test_unknown_product(self):
+        response = self.add(1, product_id=999999)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['message'], 'Product not found.')
+
+    def test_invalid_quantity(self):
+        response = self.add(0)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(CartItem.objects.exists())
+
+class CartBatchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name='Test Category', created_by=self.user)
+        self.products = [
+            Product.objects.create(
+                name=f'Product {i}', description='Description', price=10.00 + i, stock_quantity=5,
+                category=category, image='path/to/image.jpg', created_by=self.user
+            )
+            for i in range(4)
+        ]
+        self.url = '/api/cart/batch/'
+
+    def sync(self, quantities):
+        items = [{'product_id': product.id, 'quantity': quantity} for product, quantity in quantities]
+        return self.client.post(self.url, {'items': items}, format='json')
+
+    def test_sync_creates_updates_and_removes_lines(self):
+        self.sync([(self.products[0], 1), (self.products[1], 1), (self.products[2], 1)])
+
+        response = self.sync([(self.products[0], 3), (self.products[1], 0), (self.products[3], 2)])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = [(item['product'], item['quantity'], item['line_total']) for item in response.data['data']['items']]
+        self.assertEqual(lines, [
+            (self.products[0].id, 3, '30.00'),
+            (self.products[2].id, 1, '12.00'),
+            (self.products[3].id, 2, '26.00'),
+        ])
+        self.assertEqual(response.data['data']['total'], '68.00')
+
+    def test_queries_do_not_grow_with_lines(self):
+        def count(products):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.sync([(product, 1) for product in products])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        Cart.objects.create(user=self.user)
+        one_line = count(self.products[:1])
+        CartItem.objects.all().delete()
+        four_lines = count(self.products)
+
+        self.assertEqual(one_line, four_lines)
+
+    def test_line_added_concurrently_is_set_not_duplicated(self):
+        cart = Cart.objects.create(user=self.user)
+
+        def concurrent_add(execute, sql, params, many, context):
+            # Another request adds the product between the batch's read of the cart and its insert
+            if sql.startswith('INSERT INTO "store_cartitem"') and not CartItem.objects.exists():
+                CartItem.objects.add(cart, self.products[0].id, 1)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(concurrent_add):
+            response = self.sync([(self.products[0], 3)])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(CartItem.objects.values_list('product_id', 'quantity')), [(self.products[0].id, 3)])
+
+    def test_any_invalid_line_rejects_the_whole_batch(self):
+        response = self.sync([(self.products[0], 2), (self.products[1], 6)])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(f'product_{self.products[1].id}', response.data['data'])
+        self.assertFalse(CartItem.objects.exists())
+
+    def test_duplicate_products_are_rejected(self):
+        response = self.sync([(self.products[0], 1), (self.products[0], 2)])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+
+class CartViewTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name='Test Category', created_by=self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        for i in range(3):
+            product = Product.objects.create(
+                name=f'Product {i}', description='Description', price='10.25', stock_quantity=5,
+                category=category, image='path/to/image.jpg', created_by=self.user
+            )
+            CartItem.objects.create(cart=self.cart, product=product, quantity=i + 1)
+
+    def test_lines_and_totals_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/cart/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([item['line_total'] for item in response.data['data']['items']], ['10.25', '20.50', '30.75'])
+        self.assertEqual(response.data['data']['total'], '61.50')
+
+    def test_empty_cart(self):
+        self.cart.items.all().delete()
+
+        response = self.client.get('/api/cart/')
+
+        self.assertEqual(response.data['data'], {'items': [], 'total': '0.00'})
+
+    def test_unchanged_cart_returns_not_modified(self):
+        etag = self.client.get('/api/cart/')['ETag']
+
+        unchanged = self.client.get('/api/cart/', HTTP_IF_NONE_MATCH=etag)
+        self.cart.items.update(quantity=1)
+        changed = self.client.get('/api/cart/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(unchanged.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], etag)
+
+class CheckoutTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Test Category', created_by=self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        self.url = '/api/cart/checkout/'
+        self.payload = {'shipping_address': '123 Test St', 'payment_method': 'PayPal'}
+
+    def fill_cart(self, lines, quantity=2):
+        products = []
+        for i in range(lines):
+            product = Product.objects.create(
+                name=f'Product {i}', description='Description', price='10.00', stock_quantity=5,
+                category=self.category, image='path/to/image.jpg', created_by=self.user
+            )
+            CartItem.objects.create(cart=self.cart, product=product, quantity=quantity)
+            products.append(product)
+        return products
+
+    def checkout(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, self.payload, format='json')
+        return response, len(queries)
+
+    def test_checkout_creates_order_and_empties_cart(self):
+        products = self.fill_cart(3)
+
+        response, _ = self.checkout()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(id=response.data['data']['order_id'])
+        self.assertEqual(order.total_price, 60)
+        self.assertEqual(order.items.count(), 3)
+        self.assertFalse(CartItem.objects.filter(cart=self.cart).exists())
+        self.assertEqual({p.stock_quantity for p in Product.objects.filter(id__in=[p.id for p in products])}, {3})
+
+    def test_query_count_is_constant_in_cart_size(self):
+        self.fill_cart(1)
+        _, one_line = self.checkout()
+        self.fill_cart(20, quantity=1)
+        _, twenty_lines = self.checkout()
+
+        self.assertEqual(one_line, twenty_lines)
+
+    def test_insufficient_stock_leaves_everything_untouched(self):
+        products = self.fill_cart(2)
+        Product.objects.filter(id=products[1].id).update(stock_quantity=1)
+
+        response, _ = self.checkout()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(f'product_{products[1].id}', response.data['data'])
+        self.assertEqual(Order.objects.count(), 0)
+        self.assertEqual(CartItem.objects.filter(cart=self.cart).count(), 2)
+        self.assertEqual(Product.objects.get(id=products[0].id).stock_quantity, 5)
+
+    def test_empty_cart(self):
+        response, _ = self.checkout()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Cart is empty.')
+
+    def test_invalid_payment_method(self):
+        self.fill_cart(1)
+        self.payload['payment_method'] = 'Barter'
+
+        response, _ = self.checkout()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('payment_method', response.data['data'])
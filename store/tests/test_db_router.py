@@ -0,0 +1,158 @@
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..db_router import ReplicaPinMiddleware, ReplicaRouter, is_pinned, pin_to_primary, use_replica
+from ..models import Cart, CartItem, Category, Product
+
+User = get_user_model()
+
+REPLICAS = {'ALIASES': ['replica1', 'replica2'], 'PIN_SECONDS': 5, 'CACHE_ALIAS': 'default'}
+
+
+@override_settings(REPLICAS=REPLICAS)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_the_primary_by_default(self):
+        self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    def test_reads_rotate_over_replicas_inside_use_replica(self):
+        with use_replica():
+            aliases = {self.router.db_for_read(Product) for _ in range(4)}
+        self.assertEqual(aliases, {'replica1', 'replica2'})
+        self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    def test_writes_always_go_to_the_primary(self):
+        with use_replica():
+            self.assertEqual(self.router.db_for_write(Product), 'default')
+
+    def test_reads_inside_a_transaction_stay_on_the_primary(self):
+        with use_replica(), mock.patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    @override_settings(REPLICAS={**REPLICAS, 'ALIASES': []})
+    def test_use_replica_is_a_no_op_without_replicas(self):
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    def test_pin_to_primary(self):
+        pin_to_primary(1)
+        self.assertTrue(is_pinned(1))
+        self.assertFalse(is_pinned(2))
+
+
+@override_settings(REPLICAS=REPLICAS)
+class ReplicaPinMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = User(pk=7)
+
+    def run_middleware(self, method, status_code, user):
+        request = getattr(self.factory, method)('/api/cart/add/')
+        request.user = user
+        ReplicaPinMiddleware(lambda request: HttpResponse(status=status_code))(request)
+
+    def test_successful_write_pins_the_user(self):
+        self.run_middleware('post', 201, self.user)
+        self.assertTrue(is_pinned(self.user.pk))
+
+    def test_failed_write_does_not_pin(self):
+        self.run_middleware('post', 400, self.user)
+        self.assertFalse(is_pinned(self.user.pk))
+
+    def test_read_does_not_pin(self):
+        self.run_middleware('get', 200, self.user)
+        self.assertFalse(is_pinned(self.user.pk))
+
+    def test_anonymous_write_is_ignored(self):
+        self.run_middleware('post', 201, AnonymousUser())
+
+    @override_settings(REPLICAS={**REPLICAS, 'ALIASES': []})
+    def test_unused_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaPinMiddleware(lambda request: HttpResponse())
+
+
+def _stand_in_replica():
+    # A replica alias with a test database of its own, e.g. a second SQLite file
+    # or, with DATABASE_REPLICA_TEST_MIRROR=False, a second PostgreSQL database
+    for alias in settings.REPLICAS['ALIASES']:
+        if not settings.DATABASES[alias].get('TEST', {}).get('MIRROR'):
+            return alias
+    return None
+
+
+@unittest.skipUnless(_stand_in_replica(), 'needs a replica database that is not a test mirror of default')
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    The primary and the replica are separate databases here and nothing copies
+    rows between them, so which one served a read shows in the response.
+    """
+    databases = {'default', _stand_in_replica()} - {None}
+
+    def setUp(self):
+        cache.clear()
+        self.replica = _stand_in_replica()
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        User.objects.using(self.replica).create(pk=self.user.pk, email=self.user.email)
+        self.category = Category.objects.create(name='Primary Category', created_by=self.user)
+        self.product = Product.objects.create(
+            name='Product 1', description='Description', price=10, stock_quantity=5,
+            category=self.category, image='path/to/image.jpg', created_by=self.user
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_safe_requests_read_from_the_replica(self):
+        response = self.client.get(f'/api/products/{self.product.id}/')
+        self.assertEqual(response.status_code, 404)  # Not replicated yet
+
+        response = self.client.get('/api/categories/all/')
+        self.assertEqual(response.data['data']['categories'], [])
+
+    def test_user_reads_their_own_writes_after_writing(self):
+        response = self.client.post('/api/cart/add/', {'product_id': self.product.id, 'quantity': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(is_pinned(self.user.pk))
+
+        response = self.client.get(f'/api/products/{self.product.id}/')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get('/api/categories/all/')
+        self.assertEqual([c['name'] for c in response.data['data']['categories']], ['Primary Category'])
+
+    def test_other_users_still_read_from_the_replica(self):
+        pin_to_primary(self.user.pk)
+        other = User.objects.create_user(email='other@example.com', password='testpassword')
+        client = APIClient()
+        client.force_authenticate(user=other)
+
+        response = client.get(f'/api/products/{self.product.id}/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_cart_add_writes_to_the_primary_inside_use_replica(self):
+        cart = Cart.objects.create(user=self.user)
+
+        with use_replica():
+            item = CartItem.objects.add(cart, self.product.id, 2)
+
+        self.assertIsNotNone(item)
+        self.assertEqual(CartItem.objects.using('default').get(cart=cart).quantity, 2)
+
+    def test_unsafe_requests_use_the_primary(self):
+        response = self.client.put(
+            f'/api/categories/{self.category.id}/update/', {'description': 'Updated'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
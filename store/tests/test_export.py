@@ -0,0 +1,69 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from ..models import Product, Category
+
+User = get_user_model()
+
+class ProductExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name='Category 1', created_by=self.user)
+        self.products = [
+            Product.objects.create(
+                name=f'Product {i}', description=f'Description, with "quotes" {i}', price=10.50 + i,
+                stock_quantity=i, category=category, image='products/image.jpg', created_by=self.user
+            )
+            for i in range(3)
+        ]
+
+    def export(self, query=''):
+        response = self.client.get(f'/api/products/export/{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_ndjson_export(self):
+        response, body = self.export()
+
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([row['id'] for row in rows], [product.id for product in self.products])
+        self.assertEqual(rows[1]['price'], '11.50')
+        self.assertEqual(rows[1]['category'], 'Category 1')
+
+    def test_csv_export(self):
+        response, body = self.export('?output=csv')
+
+        rows = list(csv.DictReader(io.StringIO(body.decode())))
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['description'], 'Description, with "quotes" 0')
+
+    def test_gzip_export(self):
+        response, body = self.export('?output=csv&gzip=1')
+
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('products.csv.gz', response['Content-Disposition'])
+        self.assertTrue(gzip.decompress(body).decode().startswith('id,name,description'))
+
+    def test_unknown_format(self):
+        response = self.client.get('/api/products/export/?output=xml')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.data['success'])
+
+    def test_management_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'products.ndjson.gz')
+            call_command('export_products', '--gzip', '-o', path)
+            with gzip.open(path, 'rt') as export:
+                self.assertEqual(len(export.readlines()), 3)
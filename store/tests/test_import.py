@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+from store import bulk_import
+from store.bulk_import import import_products
+from ..models import Product, Category
+
+User = get_user_model()
+
+class ProductImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.category = Category.objects.create(name='Category 1', created_by=self.user)
+        self.existing = Product.objects.create(
+            name='Old Name', description='Old', price=5.00, stock_quantity=1,
+            category=self.category, image='products/old.jpg', created_by=self.user
+        )
+
+    def csv_source(self, rows):
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=['id', 'name', 'description', 'price', 'stock_quantity', 'category', 'image'])
+        writer.writeheader()
+        writer.writerows(rows)
+        output.seek(0)
+        return output
+
+    def test_csv_import_creates_updates_and_reports_errors(self):
+        source = self.csv_source([
+            {'name': 'New 1', 'description': 'D', 'price': '9.99', 'stock_quantity': '3', 'category': 'Category 1'},
+            {'name': 'New 2', 'description': 'D', 'price': '1.00', 'stock_quantity': '3', 'category': self.category.id},
+            {'id': self.existing.id, 'name': 'New Name', 'description': 'New', 'price': '6.00', 'stock_quantity': '2', 'category': 'Category 1'},
+            {'name': 'Free', 'description': 'D', 'price': '0', 'stock_quantity': '3', 'category': 'Category 1'},
+            {'name': 'Lost', 'description': 'D', 'price': '2.00', 'stock_quantity': '3', 'category': 'Missing'},
+            {'name': 'No stock', 'description': 'D', 'price': '2.00', 'category': 'Category 1'},
+        ])
+        error_file = io.StringIO()
+
+        report = import_products(source, 'csv', self.user, error_file=error_file)
+
+        self.assertEqual((report.rows, report.created, report.updated, report.failed), (6, 2, 1, 3))
+        self.assertEqual(set(Product.objects.values_list('name', flat=True)), {'New 1', 'New 2', 'New Name'})
+        errors = {int(row['line']): json.loads(row['errors']) for row in csv.DictReader(io.StringIO(error_file.getvalue()))}
+        self.assertEqual(errors[5], {'price': ['Price must be greater than zero.']})
+        self.assertEqual(errors[6], {'category': ['Category Missing does not exist.']})
+        self.assertIn('stock_quantity', errors[7])
+
+    def test_ndjson_import(self):
+        source = io.StringIO(
+            json.dumps({'name': 'A', 'description': 'D', 'price': 3, 'stock_quantity': 1, 'category': 'Category 1'}) + '\n'
+            + 'not json\n'
+        )
+
+        report = import_products(source, 'ndjson', self.user)
+
+        self.assertEqual((report.created, report.failed), (1, 1))
+        self.assertEqual(report.errors[0][0], 2)
+
+    def test_report_keeps_a_sample_of_errors_and_the_file_gets_them_all(self):
+        rows = [
+            {'name': f'Free {i}', 'description': 'D', 'price': '0', 'stock_quantity': '1', 'category': 'Category 1'}
+            for i in range(7)
+        ]
+        error_file = io.StringIO()
+
+        with mock.patch.object(bulk_import, 'ERROR_SAMPLE_SIZE', 2):
+            report = import_products(self.csv_source(rows), 'csv', self.user, chunk_size=3, error_file=error_file)
+
+        self.assertEqual(report.failed, 7)
+        self.assertEqual([line for line, _ in report.errors], [2, 3])
+        lines = [int(row['line']) for row in csv.DictReader(io.StringIO(error_file.getvalue()))]
+        self.assertEqual(lines, list(range(2, 9)))
+
+    def test_queries_per_chunk_do_not_grow_with_rows(self):
+        def run(count):
+            rows = [
+                {'name': f'P{i}', 'description': 'D', 'price': '1.00', 'stock_quantity': '1', 'category': 'Category 1'}
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                import_products(self.csv_source(rows), 'csv', self.user, chunk_size=500)
+            return len(queries)
+
+        self.assertEqual(run(5), run(100))
@@ -0,0 +1,91 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from store.exceptions import InsufficientStock
+from store.inventory import check_stock, reserve_stock
+from ..models import Product, Category
+
+User = get_user_model()
+
+class StockReservationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        category = Category.objects.create(name='Test Category', created_by=self.user)
+        self.product1 = Product.objects.create(
+            name='Product 1', description='Description 1', price=10.00, stock_quantity=5,
+            category=category, image='path/to/image1.jpg', created_by=self.user
+        )
+        self.product2 = Product.objects.create(
+            name='Product 2', description='Description 2', price=20.00, stock_quantity=2,
+            category=category, image='path/to/image2.jpg', created_by=self.user
+        )
+
+    def assertStock(self, product, expected):
+        product.refresh_from_db()
+        self.assertEqual(product.stock_quantity, expected)
+
+    def test_reserve_decrements_every_product(self):
+        products = reserve_stock({self.product1.id: 3, self.product2.id: 2})
+
+        self.assertEqual(set(products), {self.product1.id, self.product2.id})
+        self.assertStock(self.product1, 2)
+        self.assertStock(self.product2, 0)
+
+    def test_reserve_is_all_or_nothing(self):
+        with self.assertRaises(InsufficientStock) as raised:
+            reserve_stock({self.product1.id: 3, self.product2.id: 3})
+
+        self.assertEqual(raised.exception.shortages, {self.product2.id: 2})
+        self.assertStock(self.product1, 5)
+        self.assertStock(self.product2, 2)
+
+    def test_reserve_reports_missing_products(self):
+        with self.assertRaises(InsufficientStock) as raised:
+            reserve_stock({self.product1.id: 1, 999999: 1})
+
+        self.assertEqual(raised.exception.shortages, {999999: None})
+        self.assertStock(self.product1, 5)
+
+    def test_stock_taken_between_read_and_update_rolls_back_the_rest(self):
+        sold = []
+
+        def concurrent_sale(execute, sql, params, many, context):
+            # Another sale takes product 2's stock after the reservation read it
+            if sql.startswith('UPDATE "store_product"') and not sold:
+                sold.append(True)
+                Product.objects.filter(id=self.product2.id).update(stock_quantity=1)
+            return execute(sql, params, many, context)
+
+        with self.assertRaises(InsufficientStock) as raised, connection.execute_wrapper(concurrent_sale):
+            reserve_stock({self.product1.id: 3, self.product2.id: 2})
+
+        self.assertNotIn(self.product1.id, raised.exception.shortages)
+        self.assertStock(self.product1, 5)
+
+    def test_check_stock_does_not_decrement(self):
+        check_stock({self.product1.id: 5})
+        with self.assertRaises(InsufficientStock):
+            check_stock({self.product1.id: 6})
+
+        self.assertStock(self.product1, 5)
+
+class AddToCartStockTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name='Test Category', created_by=self.user)
+        self.product = Product.objects.create(
+            name='Product 1', description='Description 1', price=10.00, stock_quantity=5,
+            category=category, image='path/to/image1.jpg', created_by=self.user
+        )
+
+    def test_combined_cart_quantity_is_checked(self):
+        first = self.client.post('/api/cart/add/', {'product_id': self.product.id, 'quantity': 3}, format='json')
+        second = self.client.post('/api/cart/add/', {'product_id': self.product.id, 'quantity': 3}, format='json')
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(second.data['message'], 'Product out of quantity.')
+        self.assertFalse(second.data['success'])
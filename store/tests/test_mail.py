@@ -0,0 +1,63 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.core import mail
+from django.core.mail import get_connection
+from django.test import TestCase
+from django.utils import timezone
+from store.mail import send_pending
+from ..models import OutboxEmail
+
+class OutboxDispatchTests(TestCase):
+    def enqueue(self, count):
+        for i in range(count):
+            OutboxEmail.objects.enqueue('Subject', f'Body {i}', [f'user{i}@example.com'])
+
+    def test_sends_batch_over_one_connection(self):
+        self.enqueue(3)
+
+        with patch('store.mail.get_connection', wraps=get_connection) as connections:
+            sent, failed = send_pending(batch_size=10)
+
+        self.assertEqual((sent, failed), (3, 0))
+        self.assertEqual(connections.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(OutboxEmail.objects.filter(status='pending').exists())
+        self.assertTrue(all(email.sent_at for email in OutboxEmail.objects.all()))
+
+    def test_batch_size_limits_each_run(self):
+        self.enqueue(3)
+
+        self.assertEqual(send_pending(batch_size=2), (2, 0))
+        self.assertEqual(send_pending(batch_size=2), (1, 0))
+        self.assertEqual(send_pending(batch_size=2), (0, 0))
+
+    @patch('django.core.mail.EmailMessage.send', side_effect=ConnectionRefusedError('SMTP down'))
+    def test_failure_is_retried_with_backoff(self, mock_send):
+        self.enqueue(1)
+
+        with self.assertLogs('store.mail', 'WARNING') as logs:
+            self.assertEqual(send_pending(), (0, 1))
+
+        self.assertEqual(logs.records[0].getMessage(), f'Sending outbox email {OutboxEmail.objects.get().id} failed (attempt 1): SMTP down')
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, 'SMTP down')
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=20))
+        # Not due yet, so the next run leaves it alone
+        self.assertEqual(send_pending(), (0, 0))
+
+    @patch('django.core.mail.EmailMessage.send', side_effect=ConnectionRefusedError('SMTP down'))
+    def test_gives_up_after_max_attempts(self, mock_send):
+        self.enqueue(1)
+        OutboxEmail.objects.update(attempts=4)
+
+        with self.assertLogs('store.mail', 'WARNING') as logs:
+            send_pending(max_attempts=5)
+
+        self.assertIn('(attempt 5): SMTP down', logs.output[0])
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, 'failed')
+        self.assertEqual(email.attempts, 5)
@@ -0,0 +1,155 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..cache import cache_stats
+from ..metrics import MetricsRegistry, registry, render_prometheus
+
+User = get_user_model()
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})? (-?[0-9.e+-]+|\+Inf|NaN)$')
+SUFFIXES = {'counter': ('',), 'gauge': ('',), 'histogram': ('_bucket', '_sum', '_count')}
+
+
+def parse_exposition(body):
+    """
+    Parse the Prometheus text format strictly enough to catch malformed families.
+
+    Returns {family: (type, [sample lines])}; fails if a sample does not
+    belong to the family declared right before it, or a family lacks HELP.
+    """
+    families, helped, family, kind = {}, set(), None, None
+    for line in body.splitlines():
+        if line.startswith('# HELP '):
+            helped.add(line.split()[2])
+        elif line.startswith('# TYPE '):
+            _, _, family, kind = line.split()
+            assert family not in families, f'{family} declared twice'
+            assert family in helped, f'{family} has no HELP'
+            families[family] = (kind, [])
+        elif line:
+            match = SAMPLE.match(line)
+            assert match, f'malformed sample: {line}'
+            name = match.group(1)
+            assert family and name in [family + suffix for suffix in SUFFIXES[kind]], (
+                f'{name} does not belong to the {kind} {family}'
+            )
+            families[family][1].append(line)
+    return families
+
+
+@override_settings(METRICS={'ENABLED': True, 'TOKEN': 'scrape-secret'})
+class MetricsEndpointTests(APITestCase):
+    def setUp(self):
+        registry.clear()
+        cache_stats.clear()
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        cache.clear()
+
+    def test_latency_status_and_queries_per_view(self):
+        self.client.get('/api/products/')
+        self.client.get('/api/products/')
+        self.client.post('/api/orders/create/', {}, format='json')  # Unauthenticated
+
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        body = response.content.decode()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('store_request_duration_seconds_count{view="product-list",method="GET"} 2', body)
+        self.assertIn('store_request_duration_seconds_bucket{view="product-list",method="GET",le="+Inf"} 2', body)
+        self.assertIn('store_responses_total{view="order-create",method="POST",status="401"} 1', body)
+        self.assertIn('store_request_queries_total{view="product-list",method="GET"}', body)
+        self.assertIn('store_auth_cache{stat="user_hits"}', body)
+        self.assertIn('store_response_cache_requests_total{view="ProductListView",result="hit"} 1', body)
+        parse_exposition(body)
+
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS={'ENABLED': True, 'TOKEN': None})
+    def test_nobody_may_read_without_a_configured_token(self):
+        self.client.force_authenticate(user=self.user)
+
+        self.assertEqual(self.client.get('/api/metrics/').status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer ').status_code, status.HTTP_403_FORBIDDEN)
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    def test_buckets_are_cumulative_in_output(self):
+        metrics = MetricsRegistry({'BUCKETS': [0.1, 1.0], 'DIRECTORY': None})
+        for seconds in (0.05, 0.5, 0.5, 5):
+            metrics.record('product-list', 'GET', 200, seconds, 2)
+
+        (view, method, entry), = metrics.snapshot()['series']
+
+        self.assertEqual(entry[:3], [1, 2, 1])
+        self.assertEqual(entry[-2:], [4, 8])
+
+    def test_threads_record_into_separate_shards(self):
+        metrics = MetricsRegistry({'DIRECTORY': None})
+
+        def worker():
+            for _ in range(1000):
+                metrics.record('order-create', 'POST', 201, 0.01, 5)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        (_, _, entry), = metrics.snapshot()['series']
+        self.assertEqual(entry[-2:], [4000, 20000])
+        self.assertEqual(metrics.snapshot()['statuses'], [['order-create', 'POST', 201, 4000]])
+
+    def test_finished_threads_shards_are_folded_in(self):
+        metrics = MetricsRegistry({'DIRECTORY': None})
+        for _ in range(20):
+            thread = threading.Thread(target=metrics.record, args=('product-list', 'GET', 200, 0.01, 1))
+            thread.start()
+            thread.join()
+        metrics.record('product-list', 'GET', 200, 0.01, 1)
+
+        self.assertEqual(len(metrics._shards), 1)  # This thread's
+        (_, _, entry), = metrics.snapshot()['series']
+        self.assertEqual(entry[-2:], [21, 21])
+
+    def test_collect_merges_every_worker_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        metrics = MetricsRegistry({'DIRECTORY': directory, 'FLUSH_INTERVAL': 3600})
+        metrics.record('product-list', 'GET', 200, 0.01, 1)
+        # Another worker's totals, as it would have flushed them
+        with open(os.path.join(directory, '1.json'), 'w') as f:
+            json.dump(metrics.snapshot(), f)
+
+        (_, _, entry), = metrics.collect()['series']
+
+        self.assertEqual(entry[-2], 2)
+        self.assertEqual(sorted(os.listdir(directory)), sorted(['1.json', f'{os.getpid()}.json']))
+
+    def test_pool_stats_parse_as_separate_families(self):
+        stats = dict.fromkeys(('checkouts', 'connects', 'waits', 'timeouts', 'check_failures', 'expired', 'discarded',
+                               'idle', 'in_use', 'waiting'), 1)
+        stats.update(wait_seconds_total=0.5, wait_seconds_max=0.25)
+
+        families = parse_exposition(render_prometheus(
+            MetricsRegistry({'DIRECTORY': None}).collect(), pool_stats={('default', 'store'): stats},
+        ))
+
+        self.assertEqual(families['store_db_pool_wait_seconds_total'][0], 'counter')
+        self.assertEqual(families['store_db_pool_wait_seconds_max'][0], 'gauge')
+        self.assertEqual(families['store_db_pool_wait_seconds_max'][1],
+                         ['store_db_pool_wait_seconds_max{alias="default",database="store"} 0.25'])
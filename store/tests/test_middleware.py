@@ -0,0 +1,81 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import override_settings
+from rest_framework import serializers, status
+from rest_framework.test import APITestCase
+
+from ..middleware import PerformanceMiddleware
+from ..models import Cart, CartItem, Category, Product
+
+User = get_user_model()
+
+DRF_TO_REPRESENTATION = serializers.Serializer.to_representation
+
+PERFORMANCE = {'ENABLED': True, 'SERVER_TIMING': True, 'SLOW_REQUEST_MS': 10_000, 'SLOW_QUERY_LIMIT': 10}
+
+
+@override_settings(PERFORMANCE=PERFORMANCE)
+class PerformanceMiddlewareTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        category = Category.objects.create(name='Test Category', created_by=self.user)
+        product = Product.objects.create(
+            name='Product 1', description='Description', price=10, stock_quantity=5,
+            category=category, image='path/to/image.jpg', created_by=self.user
+        )
+        CartItem.objects.create(cart=Cart.objects.create(user=self.user), product=product, quantity=1)
+
+    def test_server_timing_header_and_log_line(self):
+        with self.assertLogs('store.performance', 'INFO') as logs:
+            response = self.client.get('/api/cart/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response['Server-Timing']
+        self.assertIn('total;dur=', timing)
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="1 queries"', timing)
+        self.assertIn('serializer;dur=', timing)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'cart')
+        self.assertEqual(record['queries'], 1)
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+
+    def test_serializer_time_is_recorded(self):
+        with self.assertLogs('store.performance', 'INFO') as logs:
+            self.client.post('/api/cart/checkout/', {'shipping_address': 'x', 'payment_method': 'Barter'}, format='json')
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertGreater(record['serializer_ms'], 0)
+
+    def test_list_serialization_is_timed_without_patching_drf(self):
+        cache.clear()  # A response cache hit would skip serialization
+        with self.assertLogs('store.performance', 'INFO') as logs:
+            self.client.get('/api/categories/all/')
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertGreater(record['serializer_ms'], 0)
+        self.assertIs(serializers.Serializer.to_representation, DRF_TO_REPRESENTATION)
+        self.assertIsInstance(serializers.ListSerializer.__dict__['data'], property)
+        self.assertFalse(hasattr(serializers.ListSerializer.data.fget, '__wrapped__'))
+
+    @override_settings(PERFORMANCE={**PERFORMANCE, 'SLOW_REQUEST_MS': 0, 'SLOW_QUERY_LIMIT': 1})
+    def test_slow_request_logs_its_sql(self):
+        with self.assertLogs('store.performance', 'WARNING') as logs:
+            self.client.get('/api/cart/')
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(len(record['slow_sql']), 1)
+        self.assertIn('store_cartitem', record['slow_sql'][0]['sql'])
+
+    @override_settings(PERFORMANCE={**PERFORMANCE, 'ENABLED': False})
+    def test_disabled_middleware_leaves_the_chain(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            PerformanceMiddleware(lambda request: None)
+
+        response = self.client.get('/api/cart/')
+
+        self.assertNotIn('Server-Timing', response)
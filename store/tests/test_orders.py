@@ -0,0 +1,244 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase, APIClient
+from django.urls import reverse
+from rest_framework import status
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+from store.serializers import OrderCreateSerializer
+from ..models import CustomUser, IdempotencyKey, Product, Category, Order, OrderItem
+
+class OrderCreateTestCase(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email='testuser@example.com',
+            password='testpassword',
+            name='Test User',
+            address='123 Test St',
+            phone_number='+1234567890'
+        )
+        self.category = Category.objects.create(
+            name='Test Category',
+            description='Test Category Description',
+            created_by=self.user
+        )
+        self.products = [
+            Product.objects.create(
+                name=f'Product {i}',
+                description='Test Product Description',
+                price=10.00,
+                stock_quantity=5,
+                category=self.category,
+                image='path/to/image.jpg',
+                created_by=self.user
+            )
+            for i in range(20)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('order-create')
+
+    def order_payload(self, products, quantity=1):
+        return {
+            'user_id': self.user.id,
+            'products': [
+                {'product_id': product.id, 'quantity': quantity, 'price': 10.00 * quantity}
+                for product in products
+            ],
+            'shipping_address': '123 Test St',
+            'payment_method': 'Credit Card'
+        }
+
+class OrderCreateBatchingTests(OrderCreateTestCase):
+    def count_queries(self, payload):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return len(queries)
+
+    def test_query_count_is_constant_in_line_count(self):
+        single_line = self.count_queries(self.order_payload(self.products[:1]))
+        twenty_lines = self.count_queries(self.order_payload(self.products))
+
+        self.assertEqual(single_line, twenty_lines)
+
+    def test_creates_items_and_decrements_stock(self):
+        response = self.client.post(self.url, self.order_payload(self.products[:3], quantity=2), format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get()
+        self.assertEqual(order.total_price, 60)
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 3)
+        for product in self.products[:3]:
+            product.refresh_from_db()
+            self.assertEqual(product.stock_quantity, 3)
+
+    def test_repeated_lines_are_checked_against_combined_quantity(self):
+        payload = self.order_payload([self.products[0]] * 2, quantity=3)
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+        self.products[0].refresh_from_db()
+        self.assertEqual(self.products[0].stock_quantity, 5)
+
+    def test_string_product_ids_are_accepted(self):
+        payload = self.order_payload(self.products[:1])
+        payload['products'][0]['product_id'] = str(self.products[0].id)
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_invalid_lines_are_rejected_before_touching_stock(self):
+        for line in ({'product_id': self.products[0].id}, {'product_id': self.products[0].id, 'quantity': 'two'},
+                     {'product_id': self.products[0].id, 'quantity': -3}):
+            payload = self.order_payload([])
+            payload['products'] = [line]
+            response = self.client.post(self.url, payload, format='json')
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, line)
+        self.assertFalse(Order.objects.exists())
+        self.products[0].refresh_from_db()
+        self.assertEqual(self.products[0].stock_quantity, 5)
+
+    def test_stock_change_after_validation_rolls_back(self):
+        serializer = OrderCreateSerializer(data=self.order_payload(self.products[:2], quantity=2))
+        self.assertTrue(serializer.is_valid())
+
+        # Another checkout takes the stock of the second product in the meantime
+        Product.objects.filter(id=self.products[1].id).update(stock_quantity=1)
+
+        with self.assertRaises(ValidationError):
+            serializer.save()
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+        self.products[0].refresh_from_db()
+        self.assertEqual(self.products[0].stock_quantity, 5)
+
+class IdempotencyKeyTests(OrderCreateTestCase):
+    def post(self, payload, key='retry-1'):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+        return response, len(queries)
+
+    def test_retry_replays_stored_response_without_a_second_order(self):
+        payload = self.order_payload(self.products[:2], quantity=2)
+        first, _ = self.post(payload)
+        retry, queries = self.post(payload)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(queries, 1)
+        self.assertEqual(Order.objects.count(), 1)
+        self.products[0].refresh_from_db()
+        self.assertEqual(self.products[0].stock_quantity, 3)
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        self.post(self.order_payload(self.products[:1]))
+        response, _ = self.post(self.order_payload(self.products[1:2]))
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_request_does_not_store_the_key(self):
+        payload = self.order_payload([self.products[0]], quantity=6)
+        failed, _ = self.post(payload)
+        Product.objects.filter(id=self.products[0].id).update(stock_quantity=10)
+        retried, _ = self.post(payload)
+
+        self.assertEqual(failed.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retried.status_code, status.HTTP_201_CREATED)
+
+    def test_keys_are_scoped_per_user(self):
+        self.post(self.order_payload(self.products[:1]))
+        other = CustomUser.objects.create_user(email='other@example.com', password='testpassword')
+        self.client.force_authenticate(user=other)
+        response, _ = self.post(self.order_payload(self.products[:1]))
+
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_purge_removes_only_expired_keys(self):
+        self.post(self.order_payload(self.products[:1]), key='old')
+        self.post(self.order_payload(self.products[:1]), key='new')
+        IdempotencyKey.objects.filter(key='old').update(created_at=timezone.now() - timedelta(days=2))
+
+        call_command('purge_idempotency_keys', ttl=86400, stdout=StringIO())
+
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['new'])
+
+class OrderReadQueryTests(APITestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            email='testuser@example.com',
+            password='testpassword',
+            name='Test User',
+            address='123 Test St',
+            phone_number='+1234567890'
+        )
+        category = Category.objects.create(name='Test Category', created_by=self.user)
+        self.products = [
+            Product.objects.create(
+                name=f'Product {i}', description='Test Product Description', price=10.00,
+                stock_quantity=100, category=category, image='path/to/image.jpg', created_by=self.user
+            )
+            for i in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_orders(self, count):
+        orders = []
+        for _ in range(count):
+            order = Order.objects.create(
+                user=self.user, shipping_address='123 Test St', payment_method='PayPal', total_price=30.00
+            )
+            for product in self.products:
+                OrderItem.objects.create(order=order, product=product, quantity=1, price=10.00)
+            orders.append(order)
+        return orders
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_order_list_query_count_is_constant(self):
+        self.create_orders(2)
+        _, few = self.count_queries(f'/api/orders/all/?user_id={self.user.id}')
+        self.create_orders(8)
+        response, many = self.count_queries(f'/api/orders/all/?user_id={self.user.id}')
+
+        # COUNT, the page of orders and one batched items query
+        self.assertEqual(few, 3)
+        self.assertEqual(many, 3)
+        self.assertEqual(len(response.data['data']['orders']), 10)
+        self.assertTrue(all(len(order['items']) == 3 for order in response.data['data']['orders']))
+
+    def test_order_list_is_newest_first(self):
+        orders = self.create_orders(3)
+
+        response, _ = self.count_queries('/api/orders/all/')
+
+        self.assertEqual([order['id'] for order in response.data['data']['orders']], [order.id for order in reversed(orders)])
+
+    def test_order_list_with_unknown_user(self):
+        self.create_orders(1)
+
+        response, _ = self.count_queries('/api/orders/all/?user_id=abc')
+
+        self.assertEqual(response.data['data']['orders'], [])
+
+    def test_order_detail_query_count(self):
+        order = self.create_orders(1)[0]
+
+        response, queries = self.count_queries(f'/api/orders/{order.id}/')
+
+        self.assertEqual(queries, 2)
+        self.assertEqual(len(response.data['data']['items']), 3)
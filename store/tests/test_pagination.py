@@ -0,0 +1,66 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from ..models import Product, Category
+
+User = get_user_model()
+
+class ProductKeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='testuser@example.com',
+            password='testpassword'
+        )
+        category = Category.objects.create(name='Category 1', created_by=self.user)
+
+        # Duplicate prices make sure the id tiebreaker keeps the order stable
+        self.products = [
+            Product.objects.create(
+                name=f'Product {i}',
+                description=f'Description {i}',
+                price=price,
+                stock_quantity=10,
+                category=category,
+                image='path/to/image.jpg',
+                created_by=self.user
+            )
+            for i, price in enumerate([30.00, 10.00, 20.00, 10.00, 20.00])
+        ]
+
+    def collect_pages(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([product['id'] for product in response.data['data']['products']])
+            url = response.data['data']['next']
+        return pages
+
+    def test_walks_every_product_in_id_order(self):
+        pages = self.collect_pages('/api/products/?pagination=cursor&page_size=2')
+
+        expected = [product.id for product in self.products]
+        self.assertEqual(pages, [expected[0:2], expected[2:4], expected[4:5]])
+
+    def test_walks_every_product_in_price_order(self):
+        pages = self.collect_pages('/api/products/?pagination=cursor&ordering=price&page_size=2')
+
+        ordered = sorted(self.products, key=lambda product: (product.price, product.id))
+        self.assertEqual(sum(pages, []), [product.id for product in ordered])
+
+    def test_previous_link_returns_prior_page(self):
+        first = self.client.get('/api/products/?pagination=cursor&ordering=price&page_size=2')
+        self.assertIsNone(first.data['data']['previous'])
+
+        second = self.client.get(first.data['data']['next'])
+        previous = self.client.get(second.data['data']['previous'])
+
+        self.assertEqual(previous.data['data']['products'], first.data['data']['products'])
+        self.assertIsNone(previous.data['data']['previous'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/products/?cursor=not-a-cursor')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['message'], 'Invalid cursor')
+        self.assertFalse(response.data['success'])
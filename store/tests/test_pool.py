@@ -0,0 +1,198 @@
+import threading
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base as django_base
+from django.test import SimpleTestCase
+
+from ..backends.postgresql import base
+from ..metrics import MetricsRegistry, render_prometheus
+from ..pool import ConnectionPool, PoolTimeout, close_pool, pool_stats, pools
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.healthy = True
+        self.clean = True
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.opened = []
+
+    def connect(self):
+        connection = FakeConnection(len(self.opened))
+        self.opened.append(connection)
+        return connection
+
+    @staticmethod
+    def check(connection):
+        if not connection.healthy:
+            raise OSError('server closed the connection')
+
+    @staticmethod
+    def reset(connection):
+        return connection.clean
+
+
+def make_pool(**options):
+    database = FakeDatabase()
+    return database, ConnectionPool(database.connect, database.check, database.reset, **options)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_returned_connections_are_reused(self):
+        database, pool = make_pool(max_size=2)
+
+        first = pool.checkout()
+        pool.checkin(first)
+        again = pool.checkout()
+
+        self.assertIs(again, first)
+        self.assertEqual(len(database.opened), 1)
+        self.assertEqual(pool.stats()['checkouts'], 2)
+        self.assertEqual(pool.stats()['in_use'], 1)
+
+    def test_checkout_waits_for_a_free_connection(self):
+        database, pool = make_pool(max_size=1, timeout=5)
+        held = pool.checkout()
+        got = []
+
+        waiter = threading.Thread(target=lambda: got.append(pool.checkout()))
+        waiter.start()
+        while not pool.stats()['waiting']:
+            pass
+        pool.checkin(held)
+        waiter.join()
+
+        self.assertEqual(got, [held])
+        self.assertEqual(len(database.opened), 1)
+        self.assertEqual(pool.stats()['waits'], 1)
+
+    def test_checkout_times_out_when_the_pool_is_exhausted(self):
+        database, pool = make_pool(max_size=1, timeout=0.01)
+        pool.checkout()
+
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_connections_past_max_lifetime_are_replaced(self):
+        database, pool = make_pool(max_lifetime=10)
+        with mock.patch('store.pool.time.monotonic', return_value=100):
+            first = pool.checkout()
+            pool.checkin(first)
+        with mock.patch('store.pool.time.monotonic', return_value=111):
+            second = pool.checkout()
+
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()['expired'], 1)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_idle_connections_beyond_min_size_are_closed(self):
+        database, pool = make_pool(min_size=1, max_idle=60, check_after=1000)
+        with mock.patch('store.pool.time.monotonic', return_value=0):
+            connections = [pool.checkout() for _ in range(3)]
+            for connection in connections[:2]:
+                pool.checkin(connection)
+        with mock.patch('store.pool.time.monotonic', return_value=100):
+            pool.checkin(connections[2])
+
+        self.assertEqual([c.closed for c in connections], [True, True, False])
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_connection_failing_its_check_is_replaced(self):
+        database, pool = make_pool(check_after=0)
+        first = pool.checkout()
+        pool.checkin(first)
+        first.healthy = False
+
+        second = pool.checkout()
+
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()['check_failures'], 1)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_connection_that_cannot_be_reset_is_discarded(self):
+        database, pool = make_pool()
+        first = pool.checkout()
+        first.clean = False
+        pool.checkin(first)
+
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()['discarded'], 1)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_failed_connect_frees_its_slot(self):
+        pool = ConnectionPool(mock.Mock(side_effect=OSError), FakeDatabase.check, FakeDatabase.reset, max_size=1)
+
+        with self.assertRaises(OSError):
+            pool.checkout()
+        self.assertEqual(pool.stats()['size'], 0)
+
+
+class PooledBackendTests(SimpleTestCase):
+    def settings_dict(self, **overrides):
+        return {
+            'ENGINE': 'store.backends.postgresql', 'NAME': 'store-pool-test', 'USER': '', 'PASSWORD': '',
+            'HOST': '', 'PORT': '', 'OPTIONS': {'pool': {'max_size': 2}}, 'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False, 'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False, 'TIME_ZONE': None,
+            'TEST': {}, **overrides,
+        }
+
+    def tearDown(self):
+        close_pool(('pool-test', 'store-pool-test'))
+
+    def test_pool_and_conn_max_age_are_exclusive(self):
+        with self.assertRaises(ImproperlyConfigured):
+            base.DatabaseWrapper(self.settings_dict(CONN_MAX_AGE=60), 'pool-test')
+
+    def test_pool_option_is_not_passed_to_the_driver(self):
+        wrapper = base.DatabaseWrapper(self.settings_dict(), 'pool-test')
+
+        self.assertNotIn('pool', wrapper.get_connection_params())
+
+    def test_closing_returns_the_connection_to_the_pool(self):
+        database = FakeDatabase()
+        wrapper = base.DatabaseWrapper(self.settings_dict(), 'pool-test')
+        with mock.patch.object(django_base.DatabaseWrapper, 'get_new_connection',
+                               lambda self, params: database.connect()), \
+                mock.patch.object(base, 'reset', FakeDatabase.reset):
+            for _ in range(3):
+                wrapper.connection = wrapper.get_new_connection(wrapper.get_connection_params())
+                wrapper._close()
+                wrapper.connection = None
+
+        self.assertEqual(len(database.opened), 1)
+        stats = pool_stats()[('pool-test', 'store-pool-test')]
+        self.assertEqual((stats['checkouts'], stats['idle']), (3, 1))
+
+    def test_exhausted_pool_raises_the_driver_error(self):
+        wrapper = base.DatabaseWrapper(self.settings_dict(OPTIONS={'pool': {'max_size': 1, 'timeout': 0}}), 'pool-test')
+        with mock.patch.object(django_base.DatabaseWrapper, 'get_new_connection',
+                               lambda self, params: FakeConnection(0)):
+            wrapper.get_new_connection({})
+            with self.assertRaises(wrapper.Database.OperationalError):
+                wrapper.get_new_connection({})
+
+    def test_without_the_pool_option_connections_are_not_pooled(self):
+        wrapper = base.DatabaseWrapper(self.settings_dict(OPTIONS={}), 'pool-test')
+
+        self.assertIsNone(wrapper.pool)
+        self.assertNotIn(('pool-test', 'store-pool-test'), pools)
+
+    def test_pool_stats_are_exported_as_metrics(self):
+        database, pool = make_pool()
+        pool.checkin(pool.checkout())
+
+        body = render_prometheus(MetricsRegistry({'DIRECTORY': None}).collect(), pool_stats={('default', 'store'): pool.stats()})
+
+        self.assertIn('store_db_pool_connections{alias="default",database="store",state="idle"} 1', body)
+        self.assertIn('store_db_pool_events_total{alias="default",database="store",event="connects"} 1', body)
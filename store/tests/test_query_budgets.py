@@ -0,0 +1,199 @@
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from django.core.cache import caches
+from rest_framework.test import APITestCase
+
+from ..models import Cart, CartItem, Category, Order, OrderItem, Product
+from ..search import search_index
+from .query_budget import QueryBudgetMixin
+
+User = get_user_model()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ViewQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """Every view in store.views, at a small and a larger data size."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='testuser@example.com', password='testpassword', name='Test User',
+            address='123 Test St', phone_number='+1234567890',
+        )
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Test Category', created_by=self.user)
+        self.products = []
+        self.cart = Cart.objects.create(user=self.user)
+        self.order = Order.objects.create(user=self.user, shipping_address='123 Test St', payment_method='PayPal')
+        # Measure the uncached path of cached views
+        caches['default'].clear()
+        search_index.reset()
+
+    def grow_products(self, size):
+        while len(self.products) < size:
+            self.products.append(Product.objects.create(
+                name=f'Widget {len(self.products)}', description='A searchable widget', price=10, stock_quantity=10**6,
+                category=self.category, image='path/to/image.jpg', created_by=self.user,
+            ))
+        caches['default'].clear()
+
+    def grow_cart(self, size):
+        self.grow_products(size)
+        for product in self.products[self.cart.items.count():size]:
+            CartItem.objects.create(cart=self.cart, product=product, quantity=1)
+
+    def grow_order(self, size):
+        self.grow_products(size)
+        for product in self.products[self.order.items.count():size]:
+            OrderItem.objects.create(order=self.order, product=product, quantity=1, price=10)
+
+    def grow_orders(self, size):
+        self.grow_order(3)
+        while Order.objects.filter(user=self.user).count() < size:
+            order = Order.objects.create(user=self.user, shipping_address='123 Test St', payment_method='PayPal')
+            OrderItem.objects.bulk_create(OrderItem(order=order, product=p, quantity=1, price=10) for p in self.products[:3])
+
+    def grow_categories(self, size):
+        for i in range(Category.objects.count(), size):
+            Category.objects.create(name=f'Category {i}', created_by=self.user)
+        caches['default'].clear()
+
+    def create_image(self):
+        image_file = BytesIO()
+        Image.new('RGB', (10, 10), color='red').save(image_file, format='JPEG')
+        return SimpleUploadedFile(name='test_image.jpg', content=image_file.getvalue(), content_type='image/jpeg')
+
+    def no_data(self, size):
+        pass
+
+    # User views
+
+    def test_signup(self):
+        emails = iter(range(100))
+        self.assertQueryBudget(5, lambda: self.client.post('/api/auth/signup/', {
+            'name': 'New User', 'email': f'new{next(emails)}@example.com', 'password': 'newpassword',
+            'confirm_password': 'newpassword', 'address': '1 New St', 'phone_number': '+1234567890',
+        }, format='json'), self.no_data, 'signup')
+
+    def test_login(self):
+        self.assertQueryBudget(1, lambda: self.client.post('/api/auth/login/', {
+            'email': 'testuser@example.com', 'password': 'testpassword',
+        }, format='json'), self.no_data, 'login')
+
+    def test_profile(self):
+        self.assertQueryBudget(0, lambda: self.client.get('/api/auth/profile/'), self.no_data, 'profile')
+        self.assertQueryBudget(1, lambda: self.client.put('/api/auth/profile/', {'name': 'Renamed'}, format='json'),
+                               self.no_data, 'profile update')
+
+    # Product views
+
+    def test_product_list(self):
+        self.assertQueryBudget(2, lambda: self.client.get('/api/products/'), self.grow_products, 'product list')
+        self.assertQueryBudget(1, lambda: self.client.get('/api/products/?pagination=cursor'), self.grow_products,
+                               'product list by cursor')
+
+    def test_product_search(self):
+        def grow(size):
+            self.grow_products(size)
+            search_index.build()
+        self.assertQueryBudget(1, lambda: self.client.get('/api/products/search/?q=widget'), grow, 'product search')
+
+    def test_product_export(self):
+        self.assertQueryBudget(1, lambda: self.client.get('/api/products/export/'), self.grow_products, 'product export')
+
+    def test_product_detail(self):
+        self.assertQueryBudget(1, lambda: self.client.get(f'/api/products/{self.products[0].id}/'),
+                               self.grow_products, 'product detail')
+
+    def test_product_create(self):
+        self.assertQueryBudget(2, lambda: self.client.post('/api/products/create/', {
+            'name': 'New', 'description': 'New product', 'price': '5.00', 'stock_quantity': 1,
+            'category': self.category.id, 'image': self.create_image(),
+        }, format='multipart'), self.grow_products, 'product create')
+
+    def test_product_update(self):
+        self.assertQueryBudget(3, lambda: self.client.patch(f'/api/products/{self.products[0].id}/update/', {'price': '11.00'},
+                                                           format='json'), self.grow_products, 'product update')
+
+    def test_product_delete(self):
+        def delete():
+            return self.client.delete(f'/api/products/{self.products.pop().id}/delete/')
+        self.assertQueryBudget(4, delete, self.grow_products, 'product delete')
+
+    # Category views
+
+    def test_category_list(self):
+        self.assertQueryBudget(1, lambda: self.client.get('/api/categories/all/'), self.grow_categories, 'category list')
+
+    def test_category_create(self):
+        names = iter(range(100))
+        self.assertQueryBudget(2, lambda: self.client.post('/api/categories/add/', {'name': f'New {next(names)}'}, format='json'),
+                               self.grow_categories, 'category create')
+
+    def test_category_update(self):
+        self.assertQueryBudget(2, lambda: self.client.put(f'/api/categories/{self.category.id}/update/', {'description': 'x'},
+                                                         format='json'), self.grow_categories, 'category update')
+
+    def test_category_delete(self):
+        def grow(size):
+            self.grow_categories(size)
+            self.disposable = Category.objects.create(name=f'Disposable {size}', created_by=self.user)
+        self.assertQueryBudget(3, lambda: self.client.delete(f'/api/categories/{self.disposable.id}/delete/'),
+                               grow, 'category delete')
+
+    # Order views
+
+    def test_order_create(self):
+        def create():
+            return self.client.post('/api/orders/create/', {
+                'user_id': self.user.id,
+                'products': [{'product_id': p.id, 'quantity': 1, 'price': 10} for p in self.products],
+                'shipping_address': '123 Test St', 'payment_method': 'PayPal',
+            }, format='json')
+        self.assertQueryBudget(14, create, self.grow_products, 'order create')
+
+    def test_order_list(self):
+        self.assertQueryBudget(3, lambda: self.client.get(f'/api/orders/all/?user_id={self.user.id}'), self.grow_orders, 'order list')
+
+    def test_order_detail(self):
+        self.assertQueryBudget(2, lambda: self.client.get(f'/api/orders/{self.order.id}/'), self.grow_order, 'order detail')
+
+    def test_order_status_update(self):
+        def grow(size):
+            self.order = Order.objects.create(user=self.user, shipping_address='123 Test St', payment_method='PayPal')
+            self.grow_order(size)
+        self.assertQueryBudget(2, lambda: self.client.put(f'/api/orders/{self.order.id}/status', {'shipping_status': 'shipped'},
+                                                         format='json'), grow, 'order status update')
+
+    # Cart views
+
+    def test_cart(self):
+        self.assertQueryBudget(1, lambda: self.client.get('/api/cart/'), self.grow_cart, 'cart')
+
+    def test_add_to_cart(self):
+        self.assertQueryBudget(2, lambda: self.client.post('/api/cart/add/', {'product_id': self.products[0].id},
+                                                          format='json'), self.grow_cart, 'add to cart')
+
+    def test_cart_batch(self):
+        def batch():
+            return self.client.post('/api/cart/batch/', {
+                'items': [{'product_id': p.id, 'quantity': 2} for p in self.products],
+            }, format='json')
+        self.assertQueryBudget(7, batch, self.grow_cart, 'cart batch')
+
+    def test_checkout(self):
+        def checkout():
+            return self.client.post('/api/cart/checkout/', {'shipping_address': '1 St', 'payment_method': 'PayPal'}, format='json')
+        self.assertQueryBudget(14, checkout, self.grow_cart, 'checkout')
+
+    # Metrics
+
+    @override_settings(METRICS={'ENABLED': True, 'TOKEN': 'scrape-secret'})
+    def test_metrics(self):
+        def scrape():
+            return self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertQueryBudget(0, scrape, self.no_data, 'metrics')
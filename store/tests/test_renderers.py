@@ -0,0 +1,94 @@
+import datetime
+import io
+import json
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from ..parsers import FastJSONParser
+from ..renderers import FastJSONRenderer, default
+from ..responses import JSONResponse, api_response, envelope
+
+
+class EnvelopeTests(SimpleTestCase):
+    def test_success_follows_the_code(self):
+        self.assertEqual(
+            envelope('Created', {}, status.HTTP_201_CREATED),
+            {'code': 201, 'message': 'Created', 'data': {}, 'success': True},
+        )
+        self.assertFalse(envelope('Nope', code=status.HTTP_404_NOT_FOUND)['success'])
+
+    def test_data_is_left_out_unless_given_and_extra_keys_precede_success(self):
+        body = envelope('Login successful', userId=1, token='abc')
+
+        self.assertEqual(list(body), ['code', 'message', 'userId', 'token', 'success'])
+
+    def test_api_response_status_matches_the_code(self):
+        response = api_response('Invalid data', {'name': ['required']}, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['code'], 400)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_output_matches_drf_for_serializer_data(self):
+        data = envelope('ok', {'products': [
+            {'id': 1, 'name': 'Café table', 'price': '10.50', 'tags': [], 'next': None, 'ok': True},
+        ]})
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_decimals_and_datetimes_are_encoded_without_drf_encoder(self):
+        when = datetime.datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=datetime.timezone.utc)
+
+        content = FastJSONRenderer().render({'price': Decimal('19.99'), 'at': when, 'on': when.date()})
+
+        self.assertEqual(json.loads(content), {'price': '19.99', 'at': '2024-05-01T12:30:15.250000Z', 'on': '2024-05-01'})
+
+    def test_fallback_encoder_formats_like_orjson(self):
+        when = datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc)
+
+        self.assertEqual(default(when), '2024-05-01T12:30:00Z')
+        self.assertEqual(default(Decimal('0.10')), '0.10')
+
+    def test_javascript_line_separators_are_escaped(self):
+        self.assertEqual(FastJSONRenderer().render({'name': 'a\u2028b'}), b'{"name":"a\\u2028b"}')
+
+    def test_indented_output_is_left_to_drf(self):
+        content = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+
+        self.assertEqual(content, b'{\n  "a": 1\n}')
+
+    def test_json_response_renders_the_same_bytes(self):
+        data = envelope('ok', {'price': '1.00'})
+
+        self.assertEqual(JSONResponse(data).content, FastJSONRenderer().render(data))
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def test_parses_utf8_bodies(self):
+        body = '{"name": "Café", "quantity": 2, "price": 1.5}'.encode('utf-8')
+
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), {'name': 'Café', 'quantity': 2, 'price': 1.5})
+
+    def test_malformed_bodies_raise_parse_error(self):
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"name": '))
+
+    def test_other_charsets_go_through_drf(self):
+        body = '{"name": "Café"}'.encode('latin-1')
+
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body), parser_context={'encoding': 'latin-1'}), {'name': 'Café'})
+
+
+class RendererEndpointTests(APITestCase):
+    def test_malformed_json_gets_the_error_envelope(self):
+        response = self.client.post('/api/auth/login/', '{"email": ', content_type='application/json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['code'], 400)
+        self.assertFalse(response.json()['success'])
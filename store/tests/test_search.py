@@ -0,0 +1,53 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from store.search import search_index
+from ..models import Product, Category
+
+User = get_user_model()
+
+class ProductSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        search_index.reset()
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.category = Category.objects.create(name='Category 1', created_by=self.user)
+        self.headphones = self.create_product('Wireless Headphones', 'Over-ear headphones with bluetooth.')
+        self.speaker = self.create_product('Bluetooth Speaker', 'Portable speaker, pairs with wireless headphones.')
+        self.mug = self.create_product('Coffee Mug', 'Ceramic mug for coffee.')
+
+    def create_product(self, name, description):
+        return Product.objects.create(
+            name=name, description=description, price=10.00, stock_quantity=10,
+            category=self.category, image='path/to/image.jpg', created_by=self.user
+        )
+
+    def search(self, query):
+        response = self.client.get('/api/products/search/', {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [product['name'] for product in response.data['data']['products']]
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.assertEqual(self.search('wireless headphones'), ['Wireless Headphones', 'Bluetooth Speaker'])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.search('coffee headphones'), [])
+        self.assertEqual(self.search('CERAMIC'), ['Coffee Mug'])
+
+    def test_index_follows_product_writes(self):
+        self.search('mug')  # Builds the index
+        self.mug.name = 'Espresso Cup'
+        self.mug.save()
+        self.create_product('Travel Mug', 'Insulated.')
+        self.speaker.delete()
+
+        self.assertEqual(self.search('mug'), ['Travel Mug', 'Espresso Cup'])
+        self.assertEqual(self.search('speaker'), [])
+
+    def test_query_is_required(self):
+        response = self.client.get('/api/products/search/')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['message'], 'Search query is required')
+        self.assertFalse(response.data['success'])
@@ -0,0 +1,46 @@
+import random
+from collections import Counter
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from ..models import Cart, CartItem, Category, CustomUser, Order, Product
+from ..seeding import Zipf
+
+
+class SeedStoreTests(TestCase):
+    def test_command_writes_the_requested_rows(self):
+        out = StringIO()
+        call_command(
+            'seed_store', users=50, categories=5, products=200, carts=20, orders=300,
+            batch_size=64, seed=3, stdout=out,
+        )
+
+        self.assertEqual(CustomUser.objects.count(), 50)
+        self.assertEqual(Category.objects.count(), 5)
+        self.assertEqual(Product.objects.count(), 200)
+        self.assertEqual(Cart.objects.count(), 20)
+        self.assertEqual(Order.objects.count(), 300)
+        self.assertTrue(CartItem.objects.exists())
+        self.assertIn('Wrote', out.getvalue())
+
+    def test_users_share_one_password_hash(self):
+        call_command('seed_store', users=5, categories=1, products=1, carts=0, orders=0, password='s3cret', stdout=StringIO())
+
+        self.assertEqual(CustomUser.objects.values('password').distinct().count(), 1)
+        self.assertTrue(CustomUser.objects.first().check_password('s3cret'))
+
+    def test_order_totals_match_their_items(self):
+        call_command('seed_store', users=10, categories=2, products=50, carts=0, orders=40, seed=5, stdout=StringIO())
+
+        for order in Order.objects.annotate(items_total=Sum('items__price')):
+            self.assertEqual(order.total_price, order.items_total)
+        self.assertGreater(len({order.created_at.date() for order in Order.objects.all()}), 1)
+
+    def test_popularity_is_skewed(self):
+        counts = Counter(Zipf(range(1000), 1.1, random.Random(1)).sample(20000))
+        ranked = [count for _, count in counts.most_common()]
+
+        self.assertGreater(ranked[0], 20 * ranked[len(ranked) // 2])
@@ -0,0 +1,105 @@
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import threading
+
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..management.commands.replay_traffic import PASSWORD, Command as ReplayCommand
+from ..models import Category, Product
+from ..traffic import body_shape, pseudonym, query_shape, read_traffic
+
+User = get_user_model()
+
+
+class TrafficCaptureTests(APITestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'traffic.jsonl')
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpassword')
+        self.category = Category.objects.create(name='Test Category', created_by=self.user)
+        self.product = Product.objects.create(
+            name='Product 1', description='Description', price=10, stock_quantity=5,
+            category=self.category, image='path/to/image.jpg', created_by=self.user
+        )
+
+    def capture(self, sample_rate=1.0):
+        return override_settings(TRAFFIC_CAPTURE={
+            'ENABLED': True, 'PATH': self.path, 'SAMPLE_RATE': sample_rate, 'MAX_BODY_BYTES': 65536,
+        })
+
+    def test_requests_are_recorded_without_personal_data(self):
+        self.client.force_authenticate(user=self.user)
+        with self.capture():
+            self.client.get('/api/products/?page=2&category=Test')
+            self.client.post('/api/cart/add/', {'product_id': self.product.id, 'quantity': 2}, format='json')
+            self.client.put('/api/auth/profile/', {'name': 'Secret Name'}, format='json')
+
+        listing, add, profile = read_traffic(self.path)
+        self.assertEqual(listing['route'], 'product-list')
+        self.assertEqual(listing['query'], {'page': ['2'], 'category': ['<str:4>']})
+        self.assertEqual(add['body'], {'product_id': self.product.id, 'quantity': 2})
+        self.assertEqual(add['identity'], pseudonym(self.user.id))
+        self.assertEqual(profile['body'], {'name': '<str:11>'})
+        self.assertNotIn('Secret', open(self.path).read())
+        self.assertNotIn('testuser', open(self.path).read())
+
+    def test_malformed_content_length_is_not_a_server_error(self):
+        with self.capture():
+            response = self.client.generic(
+                'POST', '/api/auth/login/', '{"email": "a@example.com"}',
+                content_type='application/json', CONTENT_LENGTH='abc',
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        [record] = read_traffic(self.path)
+        self.assertIsNone(record['body'])
+
+    def test_sampling_rate_zero_records_nothing(self):
+        with self.capture(sample_rate=0.0):
+            self.client.get('/api/products/')
+
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_body_shape_masks_nested_strings(self):
+        shape = body_shape({'items': [{'product_id': 3, 'note': 'gift'}], 'paid': True, 'address': None})
+
+        self.assertEqual(shape, {'items': [{'product_id': 3, 'note': '<str:4>'}], 'paid': True, 'address': None})
+
+    def test_query_shape_keeps_numbers_and_masks_text(self):
+        shape = query_shape(QueryDict('q=blue+lamp&min_price=9.50&page=3&user_id=-1'))
+
+        self.assertEqual(shape, {'q': ['<str:9>'], 'min_price': ['9.50'], 'page': ['3'], 'user_id': ['-1']})
+
+    def test_replay_rebuilds_requests_against_local_rows(self):
+        records = [
+            {'t': 1, 'method': 'DELETE', 'path': '/api/products/987654/delete/', 'route': 'product-delete',
+             'body': None, 'identity': 'abc'},
+            {'t': 2, 'method': 'POST', 'path': '/api/auth/signup/', 'route': 'signup', 'identity': None,
+             'body': {'email': '<str:20>', 'password': '<str:12>', 'confirm_password': '<str:12>', 'name': '<str:5>'}},
+            {'t': 3, 'method': 'GET', 'path': '/api/products/', 'route': 'product-list', 'identity': None,
+             'query': {'page': ['2'], 'category': ['<str:4>']}, 'body': None},
+        ]
+        command = ReplayCommand()
+        command.rng = random.Random(1)
+        command.lock = threading.Lock()
+        command.counter = itertools.count()
+        command.prepare(records)
+
+        method, path, _, _, token = command.build(records[0])
+        _, _, _, body, _ = command.build(records[1])
+        _, _, query, _, _ = command.build(records[2])
+
+        self.assertEqual((method, path), ('DELETE', f'/api/products/{self.product.id}/delete/'))
+        self.assertIsNotNone(token)
+        self.assertEqual(body['password'], PASSWORD)
+        self.assertEqual(body['confirm_password'], PASSWORD)
+        self.assertIn('@example.com', body['email'])
+        self.assertEqual(query, {'page': ['2'], 'category': [self.category.name]})
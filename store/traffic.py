@@ -0,0 +1,109 @@
+import hashlib
+import json
+import re
+import threading
+import time
+
+from django.conf import settings
+
+# Routes whose URL carries a row id, and the model that id belongs to; replay swaps in ids that exist locally
+ROUTE_MODELS = {
+    'product-detail': 'Product',
+    'product-update': 'Product',
+    'product-delete': 'Product',
+    'category-update': 'Category',
+    'category-delete': 'Category',
+    'order-detail': 'Order',
+    'order-status-update': 'Order',
+}
+NUMBER = re.compile(r'^-?\d+(\.\d+)?$')
+
+
+def body_shape(value):
+    """
+    ``value`` with every string replaced by a ``<str:length>`` placeholder.
+
+    Numbers, booleans and the structure are kept, so a replayed request takes
+    the same code path, but no names, addresses or passwords are recorded.
+    """
+    if isinstance(value, dict):
+        return {key: body_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [body_shape(item) for item in value]
+    if isinstance(value, str):
+        return f'<str:{len(value)}>'
+    return value
+
+
+def query_shape(query):
+    """
+    A QueryDict as ``{key: [values]}``, masked as body_shape masks strings.
+
+    Every value arrives as a string, so the numeric ones (page numbers, price
+    bounds, ids) stand in for JSON numbers and are kept; the rest are masked.
+    """
+    return {
+        key: [value if NUMBER.match(value) else body_shape(value) for value in values]
+        for key, values in query.lists()
+    }
+
+
+def pseudonym(user_id):
+    """A stable stand-in for a user id that cannot be mapped back without SECRET_KEY."""
+    return hashlib.sha256(f'{settings.SECRET_KEY}:{user_id}'.encode('utf-8')).hexdigest()[:12]
+
+
+class TrafficRecorder:
+    """Appends captured requests to a JSONL file, one line per request."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def write(self, record):
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            if self._file is None:
+                # Line-buffered append: whole lines from several workers interleave, never bytes
+                self._file = open(self.path, 'a', buffering=1, encoding='utf-8')
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def capture_record(request, response, body, started):
+    """The JSONL record of one request: what replay needs, minus anything identifying."""
+    user = getattr(request, 'user', None)
+    match = getattr(request, 'resolver_match', None)
+    return {
+        't': round(started, 6),
+        'method': request.method,
+        'path': request.path,
+        'route': match.view_name if match else None,
+        'query': query_shape(request.GET),
+        'content_type': request.content_type,
+        'body': body,
+        'identity': pseudonym(user.pk) if user is not None and user.is_authenticated else None,
+        'status': response.status_code,
+        'duration_ms': round((time.time() - started) * 1000, 3),
+    }
+
+
+def read_traffic(path):
+    """Captured records from ``path`` in time order; unreadable lines are skipped."""
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # A line cut short by a crash
+            if isinstance(record, dict) and 'method' in record and 'path' in record:
+                records.append(record)
+    records.sort(key=lambda record: record.get('t', 0))
+    return records
@@ -1,6 +1,9 @@
 from django.urls import path
-from store.views import AddToCartView
+from store.views import AddToCartView, CartBatchView, CartView, CheckoutView
 
 urlpatterns = [
+    path('', CartView.as_view(), name='cart'),
     path('add/', AddToCartView.as_view(), name='add-to-cart'),
+    path('batch/', CartBatchView.as_view(), name='cart-batch'),
+    path('checkout/', CheckoutView.as_view(), name='cart-checkout'),
 ]
@@ -1,8 +1,12 @@
+from django.conf import settings
 from django.urls import path
-from store.views import CategoryListView, CategoryCreateView, CategoryUpdateView, CategoryDeleteView
+from store.views import CategoryListView, AsyncCategoryListView, CategoryCreateView, CategoryUpdateView, CategoryDeleteView
+
+# ASYNC_CATALOG_VIEWS swaps in the async version of the category list
+list_view = AsyncCategoryListView if settings.ASYNC_CATALOG_VIEWS else CategoryListView
 
 urlpatterns = [
-    path('all/', CategoryListView.as_view(), name='category-list'),
+    path('all/', list_view.as_view(), name='category-list'),
     path('add/', CategoryCreateView.as_view(), name='category-add'),
     path('<int:id>/update/', CategoryUpdateView.as_view(), name='category-update'),
     path('<int:id>/delete/', CategoryDeleteView.as_view(), name='category-delete'),
@@ -1,9 +1,18 @@
+from django.conf import settings
 from django.urls import path
-from ..views import ProductListView, ProductDetailView, ProductCreateView, ProductUpdateView, ProductDeleteView
+from ..views import ProductListView, AsyncProductListView, ProductSearchView, ProductExportView, ProductDetailView, AsyncProductDetailView, ProductCreateView, ProductUpdateView, ProductDeleteView
+
+# ASYNC_CATALOG_VIEWS swaps in the async versions of the catalog reads
+if settings.ASYNC_CATALOG_VIEWS:
+    list_view, detail_view = AsyncProductListView, AsyncProductDetailView
+else:
+    list_view, detail_view = ProductListView, ProductDetailView
 
 urlpatterns = [
-    path('', ProductListView.as_view(), name='product-list'),
-    path('<int:pk>/', ProductDetailView.as_view(), name='product-detail'),
+    path('', list_view.as_view(), name='product-list'),
+    path('search/', ProductSearchView.as_view(), name='product-search'),
+    path('export/', ProductExportView.as_view(), name='product-export'),
+    path('<int:pk>/', detail_view.as_view(), name='product-detail'),
     path('create/', ProductCreateView.as_view(), name='product-create'),
     path('<int:pk>/update/', ProductUpdateView.as_view(), name='product-update'),
     path('<int:id>/delete/', ProductDeleteView.as_view(), name='product-delete')
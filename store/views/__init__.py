@@ -1,5 +1,6 @@
 from .user import SignupView, LoginView, ProfileView
-from .product import ProductPagination, ProductListView, ProductDetailView, ProductCreateView, ProductUpdateView, ProductDeleteView
-from .category import CategoryListView, CategoryCreateView, CategoryUpdateView, CategoryDeleteView
+from .product import ProductPagination, ProductKeysetPagination, ProductListView, AsyncProductListView, ProductSearchView, ProductExportView, ProductDetailView, AsyncProductDetailView, ProductCreateView, ProductUpdateView, ProductDeleteView
+from .category import CategoryListView, AsyncCategoryListView, CategoryCreateView, CategoryUpdateView, CategoryDeleteView
 from .order import OrderCreateView, OrderListView, OrderDetailView, OrderStatusUpdateView
-from .cart import AddToCartView
\ No newline at end of file
+from .cart import AddToCartView, CartBatchView, CartView, CheckoutView
+from .metrics import MetricsView
\ No newline at end of file
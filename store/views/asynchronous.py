@@ -0,0 +1,65 @@
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed, MethodNotAllowed, NotAuthenticated
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from store.db_router import ais_pinned, replica_aliases, use_replica
+from store.responses import JSONResponse
+
+
+class AsyncAPIView(View):
+    """
+    Base for async read endpoints, served without a thread per request under ASGI.
+
+    DRF's APIView dispatch is synchronous, so this does the parts of it the
+    catalog reads rely on: authentication with the configured classes,
+    replica routing as in ReadReplicaMixin, and error bodies from the
+    project's exception handler. Handlers are async, receive a DRF Request
+    and return a store.responses.JSONResponse.
+    """
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    read_from_replica = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = Request(request, authenticators=[auth() for auth in self.authentication_classes])
+        self.request = request
+        try:
+            await self.authenticate(request)
+            method = request.method.lower()
+            handler = getattr(self, method, None) if method in self.http_method_names else None
+            if handler is None:
+                raise MethodNotAllowed(request.method)
+            with use_replica() if await self.reads_from_replica(request) else nullcontext():
+                return await handler(request, *args, **kwargs)
+        except Exception as exc:
+            return self.handle_exception(exc, request, args, kwargs)
+
+    async def authenticate(self, request):
+        if 'HTTP_AUTHORIZATION' in request.META:
+            # Checking a token can read the user from the database
+            await sync_to_async(lambda: request.user)()
+        else:
+            request.user  # Resolves to AnonymousUser without I/O
+
+    async def reads_from_replica(self, request):
+        if not self.read_from_replica or request.method not in SAFE_METHODS or not replica_aliases():
+            return False
+        user = request.user
+        return not (user.is_authenticated and await ais_pinned(user.pk))
+
+    def handle_exception(self, exc, request, args, kwargs):
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            # As APIView.handle_exception: 401 with a challenge, or 403 without one
+            auth_header = request.authenticators[0].authenticate_header(request) if request.authenticators else None
+            if auth_header:
+                exc.auth_header = auth_header
+            else:
+                exc.status_code = 403
+        context = {'view': self, 'args': args, 'kwargs': kwargs, 'request': request}
+        response = api_settings.EXCEPTION_HANDLER(exc, context)
+        headers = {name: value for name, value in response.items() if name.lower() != 'content-type'}
+        return JSONResponse(response.data, status=response.status_code, headers=headers)
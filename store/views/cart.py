@@ -1,9 +1,16 @@
+import hashlib
+import json
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from store.models import Cart
-from store.serializers import CartItemSerializer
+from store.models import Cart, CartItem
+from store.responses import api_response
+from store.checkout import checkout_cart
+from store.exceptions import EmptyCart, InsufficientStock
+from store.serializers import CartAddSerializer, CartBatchSerializer, CartItemSerializer, CheckoutSerializer
+from store.serializers.order import stock_errors
 from store.models import Product
 
 class AddToCartView(APIView):
@@ -11,40 +18,126 @@ class AddToCartView(APIView):
 
     def post(self, request, *args, **kwargs):
         user = request.user
-        product_id = request.data.get('product_id')
-        quantity = request.data.get('quantity', 1)
-
-        try:
-            product = Product.objects.get(id=product_id)
-        except Product.DoesNotExist:
-            return Response({
-                "code": status.HTTP_404_NOT_FOUND,
-                "message": "Product not found.",
-                "success": False
-            }, status=status.HTTP_404_NOT_FOUND)
+        input_serializer = CartAddSerializer(data=request.data)
+        if not input_serializer.is_valid():
+            error_message = list(input_serializer.errors.values())[0][0]
+            return api_response(error_message, code=status.HTTP_400_BAD_REQUEST)
+        product_id = input_serializer.validated_data['product_id']
+        quantity = input_serializer.validated_data['quantity']
 
         # Get or create the cart for the user
         cart, created = Cart.objects.get_or_create(user=user)
 
-        data = {
-            'cart': cart.id,
-            'product': product.id,
-            'quantity': quantity,
-        }
-
-        serializer = CartItemSerializer(data=data)
-        if serializer.is_valid():
-            serializer.save(cart=cart)
-            return Response({
-                "code": status.HTTP_200_OK,
-                "message": "Product added to cart successfully.",
-                "data": serializer.data,
-                "success": True
-            }, status=status.HTTP_200_OK)
+        # Single upsert, guarded by the product's stock
+        cart_item = CartItem.objects.add(cart, product_id, quantity)
+        if cart_item is None:
+            # Only the failure path pays for telling the two causes apart
+            if not Product.objects.filter(id=product_id).exists():
+                return api_response("Product not found.", code=status.HTTP_404_NOT_FOUND)
+            return api_response("Product out of quantity.", code=status.HTTP_400_BAD_REQUEST)
+
+        return api_response("Product added to cart successfully.", CartItemSerializer(cart_item).data)
+
+
+def cart_contents(user):
+    """Every line of the user's cart with its total, plus the grand total, in one query."""
+    rows = (
+        CartItem.objects.with_totals()
+        .filter(cart__user=user)
+        .order_by('id')
+        .values('id', 'product_id', 'product__name', 'product__price', 'quantity', 'line_total', 'cart_total')
+    )
+    items = [{
+        "id": row['id'],
+        "product": row['product_id'],
+        "name": row['product__name'],
+        "price": f"{row['product__price']:.2f}",
+        "quantity": row['quantity'],
+        "line_total": f"{row['line_total']:.2f}",
+    } for row in rows]
+    total = rows[0]['cart_total'] if items else 0
+    return {"items": items, "total": f"{total:.2f}"}
+
+class CartView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        data = cart_contents(request.user)
+
+        # Clients revalidate with If-None-Match and get a bodiless 304 while the cart is unchanged
+        etag = '"%s"' % hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+        if etag in request.headers.get('If-None-Match', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
         else:
-            error_message = list(serializer.errors.values())[0][0]
-            return Response({
-                "code": status.HTTP_400_BAD_REQUEST,
-                "message": error_message,
-                "success": False
-            }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            response = api_response("Cart retrieved successfully.", data)
+        response['ETag'] = etag
+        return response
+
+class CartBatchView(APIView):
+    """Set the quantity of many cart lines at once; a quantity of 0 removes the line."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = CartBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return api_response("Invalid cart items", serializer.errors, status.HTTP_400_BAD_REQUEST)
+        quantities = {line['product_id']: line['quantity'] for line in serializer.validated_data['items']}
+
+        with transaction.atomic():
+            # Locking the cart row serializes concurrent syncs of the same cart
+            cart, created = Cart.objects.select_for_update().get_or_create(user=request.user)
+
+            # Stock for every product in one query
+            products = Product.objects.in_bulk(list(quantities))
+            errors = {}
+            for product_id, quantity in quantities.items():
+                product = products.get(product_id)
+                if product is None:
+                    errors[f'product_{product_id}'] = f"Product with ID {product_id} does not exist."
+                elif quantity > product.stock_quantity:
+                    errors[f'product_{product_id}'] = f"Only {product.stock_quantity} units of {product.name} are available."
+            if errors:
+                return api_response("Failed to update cart", errors, status.HTTP_400_BAD_REQUEST)
+
+            existing = {item.product_id: item for item in cart.items.filter(product_id__in=list(quantities))}
+            to_create, to_update, to_delete = [], [], []
+            for product_id, quantity in quantities.items():
+                item = existing.get(product_id)
+                if quantity == 0:
+                    if item is not None:
+                        to_delete.append(item.id)
+                elif item is None:
+                    to_create.append(CartItem(cart=cart, product_id=product_id, quantity=quantity))
+                elif item.quantity != quantity:
+                    item.quantity = quantity
+                    to_update.append(item)
+
+            # A concurrent AddToCart may have inserted one of these lines since they were read: the batch
+            # sets quantities, so its value wins instead of the insert failing on (cart, product)
+            CartItem.objects.bulk_set(to_create)
+            CartItem.objects.bulk_update(to_update, ['quantity'])
+            if to_delete:
+                CartItem.objects.filter(id__in=to_delete).delete()
+
+        return api_response("Cart updated successfully.", cart_contents(request.user))
+
+class CheckoutView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = CheckoutSerializer(data=request.data)
+        if not serializer.is_valid():
+            return api_response("Failed to check out", serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            order = checkout_cart(request.user, **serializer.validated_data)
+        except EmptyCart:
+            return api_response("Cart is empty.", {}, status.HTTP_400_BAD_REQUEST)
+        except InsufficientStock as e:
+            return api_response("Failed to check out", stock_errors(e), status.HTTP_400_BAD_REQUEST)
+
+        return api_response(
+            "Order successfully created",
+            {"order_id": order.id, "total_price": f"{order.total_price:.2f}"},
+            status.HTTP_201_CREATED,
+        )
@@ -1,26 +1,31 @@
 from rest_framework import generics, status
+from store.cache import acache_response, cache_response
+from store.db_router import ReadReplicaMixin
 from store.models import Category
+from store.responses import JSONResponse, api_response, envelope
 from store.serializers import CategorySerializer
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
 from rest_framework.views import APIView
+from store.views.asynchronous import AsyncAPIView
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(ReadReplicaMixin, generics.ListAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
+    @cache_response('category')
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         serializer = self.get_serializer(queryset, many=True)
-        
-        response_data = {
-            "code": 200,
-            "message": "Categories retrieved successfully",
-            "data": {"categories": serializer.data},
-            "success": True
-        }
-        
-        return Response(response_data, status=status.HTTP_200_OK)
+        return api_response("Categories retrieved successfully", {"categories": serializer.data})
+
+class AsyncCategoryListView(AsyncAPIView):
+    """CategoryListView on the async ORM, for ASGI deployments (ASYNC_CATALOG_VIEWS)."""
+
+    @acache_response('category')
+    async def get(self, request):
+        categories = [category async for category in Category.objects.all().aiterator()]
+        serializer = CategorySerializer(categories, many=True)
+        return JSONResponse(envelope('Categories retrieved successfully', {'categories': serializer.data}))
 
 class CategoryCreateView(APIView):
     permission_classes = [IsAuthenticated]
@@ -29,18 +34,8 @@ class CategoryCreateView(APIView):
         serializer = CategorySerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
-            return Response({
-                'code': 201,
-                'message': 'Category created successfully',
-                'data': {},
-                'success': True
-            }, status=status.HTTP_201_CREATED)
-        return Response({
-            'code': 400,
-            'message': 'Category creation failed',
-            'data': serializer.errors,
-            'success': False
-        }, status=status.HTTP_400_BAD_REQUEST)
+            return api_response('Category created successfully', {}, status.HTTP_201_CREATED)
+        return api_response('Category creation failed', serializer.errors, status.HTTP_400_BAD_REQUEST)
 
 class CategoryUpdateView(APIView):
     permission_classes = [IsAuthenticated]
@@ -50,29 +45,16 @@ class CategoryUpdateView(APIView):
             # Try to get the category by id and check ownership
             category = Category.objects.get(id=id, created_by=request.user)
         except Category.DoesNotExist:
-            return Response({
-                'code': 404,
-                'message': 'Category not found or you do not have permission to update it',
-                'data': {},
-                'success': False
-            }, status=status.HTTP_404_NOT_FOUND)
+            return api_response(
+                'Category not found or you do not have permission to update it', {}, status.HTTP_404_NOT_FOUND
+            )
 
         # Initialize the serializer with partial update
         serializer = CategorySerializer(category, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            return Response({
-                'code': 200,
-                'message': 'Category updated successfully',
-                'data': serializer.data,
-                'success': True
-            }, status=status.HTTP_200_OK)
-        return Response({
-            'code': 400,
-            'message': 'Invalid data',
-            'data': serializer.errors,
-            'success': False
-        }, status=status.HTTP_400_BAD_REQUEST)
+            return api_response('Category updated successfully', serializer.data)
+        return api_response('Invalid data', serializer.errors, status.HTTP_400_BAD_REQUEST)
 
 class CategoryDeleteView(APIView):
     permission_classes = [IsAuthenticated]
@@ -81,20 +63,12 @@ class CategoryDeleteView(APIView):
         try:
             category = Category.objects.get(id=id, created_by=request.user)
         except Category.DoesNotExist:
-            return Response({
-                'code': 404,
-                'message': 'Category not found or you do not have permission to delete it',
-                'data': {},
-                'success': False
-            }, status=status.HTTP_404_NOT_FOUND)
+            return api_response(
+                'Category not found or you do not have permission to delete it', {}, status.HTTP_404_NOT_FOUND
+            )
 
         # Handle product reassignment logic here if needed
         # For now, we'll just delete the category
 
         category.delete()
-        return Response({
-            'code': 200,
-            'message': 'Category deleted successfully',
-            'data': {},
-            'success': True
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        return api_response('Category deleted successfully', {})
\ No newline at end of file
@@ -0,0 +1,26 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+
+from store.authentication import get_auth_cache_stats
+from store.cache import response_cache_stats
+from store.metrics import registry, render_prometheus
+from store.pool import pool_stats
+from store.responses import api_response
+
+class MetricsView(APIView):
+    # Scrapers authenticate with METRICS['TOKEN'], not a user JWT; with no token set nobody may read the metrics
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        token = settings.METRICS.get('TOKEN')
+        if not token or not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return api_response("You do not have permission to perform this action", {}, status.HTTP_403_FORBIDDEN)
+
+        body = render_prometheus(registry.collect(), get_auth_cache_stats(), response_cache_stats(), pool_stats())
+        return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
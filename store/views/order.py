@@ -1,89 +1,106 @@
+import hashlib
+import json
 from rest_framework import status, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from store.serializers import OrderCreateSerializer, OrderListSerializer, OrderDetailSerializer, OrderStatusUpdateSerializer
 from rest_framework.pagination import PageNumberPagination
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from rest_framework.permissions import IsAuthenticated
-from store.models import Order, CustomUser
+from django.db.models import Prefetch
+from store.db_router import ReadReplicaMixin
+from store.models import IdempotencyKey, Order, OrderItem
+from store.responses import api_response, envelope
 
 class OrderCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
         try:
+            key = request.headers.get('Idempotency-Key')
+            if key is not None:
+                if not 0 < len(key) <= 255:
+                    return api_response("Idempotency-Key must be 1 to 255 characters.", {}, status.HTTP_400_BAD_REQUEST)
+                fingerprint = hashlib.sha256(json.dumps(request.data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+                stored = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+                if stored is not None:
+                    return self.replay(stored, fingerprint)
+
             serializer = OrderCreateSerializer(data=request.data)
             if serializer.is_valid():
-                serializer.save()
-                return Response({
-                    "code": status.HTTP_201_CREATED,
-                    "message": "Order successfully created",
-                    "data": {},
-                    "success": True
-                }, status=status.HTTP_201_CREATED)
-            return Response({
-                "code": status.HTTP_400_BAD_REQUEST,
-                "message": "Failed to create order",
-                "data": serializer.errors,
-                "success": False
-            }, status=status.HTTP_400_BAD_REQUEST)
+                body = envelope("Order successfully created", {}, status.HTTP_201_CREATED)
+                if key is None:
+                    serializer.save()
+                    return Response(body, status=status.HTTP_201_CREATED)
+                try:
+                    # The order and its key commit together, so a retry either finds the key or finds no order
+                    with transaction.atomic():
+                        serializer.save()
+                        IdempotencyKey.objects.create(
+                            user=request.user, key=key, fingerprint=fingerprint,
+                            response_code=status.HTTP_201_CREATED, response_body=body,
+                        )
+                except IntegrityError:
+                    # A concurrent request with the same key won; this order was rolled back
+                    stored = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+                    if stored is None:
+                        raise
+                    return self.replay(stored, fingerprint)
+                return Response(body, status=status.HTTP_201_CREATED)
+            return api_response("Failed to create order", serializer.errors, status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            # Stock changed between validation and the locked write
+            return api_response("Failed to create order", e.detail, status.HTTP_400_BAD_REQUEST)
         except ObjectDoesNotExist as e:
-            return Response({
-                "code": status.HTTP_404_NOT_FOUND,
-                "message": str(e),
-                "data": {},
-                "success": False
-            }, status=status.HTTP_404_NOT_FOUND)
+            return api_response(str(e), {}, status.HTTP_404_NOT_FOUND)
         except IntegrityError:
-            return Response({
-                "code": status.HTTP_400_BAD_REQUEST,
-                "message": "Integrity error occurred.",
-                "data": {},
-                "success": False
-            }, status=status.HTTP_400_BAD_REQUEST)
+            return api_response("Integrity error occurred.", {}, status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            return Response({
-                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
-                "message": "An unexpected error occurred.",
-                "data": str(e),
-                "success": False
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return api_response("An unexpected error occurred.", str(e), status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @staticmethod
+    def replay(stored, fingerprint):
+        if stored.fingerprint != fingerprint:
+            return api_response(
+                "Idempotency-Key was already used with a different request.", {}, status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        response = Response(stored.response_body, status=stored.response_code)
+        response['Idempotent-Replayed'] = 'true'
+        return response
 
 class OrderPagination(PageNumberPagination):
     page_size = 10  # Number of orders per page
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class OrderListView(generics.ListAPIView):
+class OrderListView(ReadReplicaMixin, generics.ListAPIView):
     serializer_class = OrderListSerializer
     pagination_class = OrderPagination
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
+        # Items are fetched in one batched query for the whole page
+        queryset = Order.objects.prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.order_by('id'))
+        ).order_by('-created_at', '-id')
         user_id = self.request.query_params.get('user_id')
         if user_id:
-            try:
-                user = CustomUser.objects.get(id=user_id)
-            except CustomUser.DoesNotExist:
+            if not user_id.isdigit():
                 return Order.objects.none()  # Return an empty queryset if user is not found
-            return Order.objects.filter(user=user)
-        return Order.objects.all()
+            return queryset.filter(user_id=user_id)
+        return queryset
 
     def get(self, request, *args, **kwargs):
         queryset = self.get_queryset()
         paginator = self.pagination_class()
         paginated_queryset = paginator.paginate_queryset(queryset, request)
         serializer = self.get_serializer(paginated_queryset, many=True)
-        return Response({
-            "code": status.HTTP_200_OK,
-            "message": "Orders retrieved successfully",
-            "data": {
-                "orders": serializer.data,
-                "count": paginator.page.paginator.count
-            },
-            "success": True
-        }, status=status.HTTP_200_OK)
+        return api_response("Orders retrieved successfully", {
+            "orders": serializer.data,
+            "count": paginator.page.paginator.count
+        })
     
 class OrderDetailView(APIView):
     permission_classes = [IsAuthenticated]
@@ -92,24 +109,11 @@ class OrderDetailView(APIView):
         try:
             order = Order.objects.get(id=id)
             serializer = OrderDetailSerializer(order)
-            return Response({
-                "code": status.HTTP_200_OK,
-                "message": "Order details retrieved successfully",
-                "data": serializer.data,
-                "success": True
-            }, status=status.HTTP_200_OK)
+            return api_response("Order details retrieved successfully", serializer.data)
         except Order.DoesNotExist:
-            return Response({
-                "code": status.HTTP_404_NOT_FOUND,
-                "message": "Order not found",
-                "success": False
-            }, status=status.HTTP_404_NOT_FOUND)
+            return api_response("Order not found", code=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            return Response({
-                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
-                "message": f"An unexpected error occurred: {str(e)}",
-                "success": False
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return api_response(f"An unexpected error occurred: {str(e)}", code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 class OrderStatusUpdateView(APIView):
     permission_classes = [IsAuthenticated]
@@ -118,25 +122,13 @@ class OrderStatusUpdateView(APIView):
         try:
             order = Order.objects.get(id=id, user=request.user)
         except Order.DoesNotExist:
-            return Response({
-                "code": status.HTTP_404_NOT_FOUND,
-                "message": "Order not found or you do not have permission to modify this order.",
-                "success": False
-            }, status=status.HTTP_404_NOT_FOUND)
+            return api_response(
+                "Order not found or you do not have permission to modify this order.", code=status.HTTP_404_NOT_FOUND
+            )
 
         serializer = OrderStatusUpdateSerializer(order, data=request.data)
         if serializer.is_valid():
             serializer.save()
-            return Response({
-                "code": status.HTTP_200_OK,
-                "message": "Order status updated successfully.",
-                "data": serializer.data,
-                "success": True
-            }, status=status.HTTP_200_OK)
+            return api_response("Order status updated successfully.", serializer.data)
         else:
-            return Response({
-                "code": status.HTTP_400_BAD_REQUEST,
-                "message": "Invalid data",
-                "errors": serializer.errors,
-                "success": False
-            }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            return api_response("Invalid data", code=status.HTTP_400_BAD_REQUEST, errors=serializer.errors)
\ No newline at end of file
@@ -1,10 +1,25 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from decimal import Decimal, InvalidOperation
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from ..cache import acache_response, cache_response
+from ..db_router import ReadReplicaMixin
+from django.http import StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from ..export import EXPORT_FORMATS, export_chunks
 from ..models import Product, Category
+from ..responses import JSONResponse, api_response, envelope
+from ..search import search_products
 from rest_framework.permissions import IsAuthenticated
 from ..serializers import ProductSerializer
 from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from .asynchronous import AsyncAPIView
 
 class ProductCreateView(generics.CreateAPIView):
     queryset = Product.objects.all()
@@ -20,13 +35,7 @@ class ProductCreateView(generics.CreateAPIView):
         if serializer.is_valid():
             self.perform_create(serializer)
             headers = self.get_success_headers(serializer.data)
-            response_data = {
-                "code": 201,
-                "message": "Product successfully created",
-                "data": serializer.data,
-                "success": True
-            }
-            return Response(response_data, status=status.HTTP_201_CREATED, headers=headers)
+            return api_response("Product successfully created", serializer.data, status.HTTP_201_CREATED, headers=headers)
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -35,7 +44,146 @@ class ProductPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class ProductListView(APIView):
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views: the count and the page are fetched with the async ORM."""
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        paginator.count = await queryset.acount()  # Paginator would count synchronously
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        bottom = (number - 1) * paginator.per_page
+        objects = [obj async for obj in queryset[bottom:bottom + paginator.per_page].aiterator()]
+        self.page = paginator._get_page(objects, number, paginator)
+        self.request = request
+        return objects
+
+class ProductKeysetPagination(BasePagination):
+    """
+    Opt-in keyset (cursor) pagination for the product list.
+
+    Pages are located by seeking past the last seen ``(price, id)`` or ``id``
+    instead of counting and skipping rows, so every page costs one indexed
+    range scan no matter how deep it is. Cursors are opaque base64 tokens.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    invalid_cursor_message = 'Invalid cursor'
+
+    # Allowed orderings mapped to their (stable, indexed) key columns
+    orderings = {
+        'id': ('id',),
+        'price': ('price', 'id'),
+    }
+    default_ordering = 'id'
+
+    @classmethod
+    def is_requested(cls, request):
+        return (
+            request.query_params.get(cls.mode_query_param) == 'cursor'
+            or cls.cursor_query_param in request.query_params
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param, self.default_ordering)
+        return self.orderings.get(ordering, self.orderings[self.default_ordering])
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': [str(value) for value in position], 'r': int(reverse)})
+        return base64.urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+
+    def get_link(self, position, reverse):
+        cursor = self.encode_cursor(position, reverse)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = payload['p']
+            if len(position) != len(self.key_fields):
+                raise ValueError
+            values = [
+                int(value) if field == 'id' else Decimal(value)
+                for field, value in zip(self.key_fields, position)
+            ]
+            return values, bool(payload['r'])
+        except (TypeError, ValueError, KeyError, InvalidOperation, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_seek_filter(self, position, reverse):
+        # Expands (a, b) > (x, y) into a >= x AND (a > x OR (a = x AND b > y)).
+        # The redundant bound on the leading column lets the planner range-scan the index.
+        lookup = 'lt' if reverse else 'gt'
+        seek = Q()
+        equal = {}
+        for field, value in zip(self.key_fields, position):
+            seek |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        leading_field, leading_value = self.key_fields[0], position[0]
+        return Q(**{f'{leading_field}__{lookup}e': leading_value}) & seek
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return self.set_page([obj async for obj in self.get_page_queryset(queryset, request).aiterator()])
+
+    def get_page_queryset(self, queryset, request):
+        # One row past the page tells whether there is more in the direction of travel
+        self.key_fields = self.get_ordering(request)
+        self.base_url = remove_query_param(request.build_absolute_uri(), self.cursor_query_param)
+        self.limit = self.get_page_size(request)
+        self.position, self.reverse = self.decode_cursor(request)
+
+        if self.position is not None:
+            queryset = queryset.filter(self.get_seek_filter(self.position, self.reverse))
+        order = [f'-{field}' if self.reverse else field for field in self.key_fields]
+        return queryset.order_by(*order)[:self.limit + 1]
+
+    def set_page(self, results):
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if self.reverse:
+            results.reverse()
+            self.has_next, self.has_previous = self.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+
+        self.page = results
+        return results
+
+    def get_position(self, instance):
+        return [getattr(instance, field) for field in self.key_fields]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.get_link(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.get_link(self.get_position(self.page[0]), reverse=True)
+
+class ProductListView(ReadReplicaMixin, APIView):
+    @cache_response('product')
     def get(self, request):
         # Filtering parameters
         category_name = request.query_params.get('category')
@@ -53,46 +201,115 @@ class ProductListView(APIView):
         if min_price and max_price:
             products = products.filter(price__gte=min_price, price__lte=max_price)
         
-        # Pagination
-        paginator = ProductPagination()  # Use your custom pagination class
+        # Pagination: keyset cursors when requested, page numbers otherwise
+        if ProductKeysetPagination.is_requested(request):
+            paginator = ProductKeysetPagination()
+        else:
+            paginator = ProductPagination()  # Use your custom pagination class
+            products = products.order_by('id')
         result_page = paginator.paginate_queryset(products, request)
         
         serializer = ProductSerializer(result_page, many=True)
-        
-        response_data = {
-            'code': 200,
-            'message': 'Successfully retrieved all products',
-            'data': {
-                'products': serializer.data,
-                'next': paginator.get_next_link(),  # Pagination metadata
-                'previous': paginator.get_previous_link(),  # Pagination metadata
-            },
-            'success': True
-        }
-        
-        return Response(response_data, status=status.HTTP_200_OK)
+        return api_response('Successfully retrieved all products', {
+            'products': serializer.data,
+            'next': paginator.get_next_link(),  # Pagination metadata
+            'previous': paginator.get_previous_link(),  # Pagination metadata
+        })
 
-class ProductDetailView(generics.RetrieveAPIView):
+class AsyncProductListView(AsyncAPIView):
+    """ProductListView on the async ORM, for ASGI deployments (ASYNC_CATALOG_VIEWS)."""
+
+    @acache_response('product')
+    async def get(self, request):
+        category_name = request.query_params.get('category')
+        min_price = request.query_params.get('min_price')
+        max_price = request.query_params.get('max_price')
+
+        products = Product.objects.all()
+        if category_name:
+            category = await Category.objects.filter(name=category_name).afirst()
+            if category:
+                products = products.filter(category=category)
+        if min_price and max_price:
+            products = products.filter(price__gte=min_price, price__lte=max_price)
+
+        if ProductKeysetPagination.is_requested(request):
+            paginator = ProductKeysetPagination()
+        else:
+            paginator = ProductPagination()
+            products = products.order_by('id')
+        result_page = await paginator.apaginate_queryset(products, request)
+
+        serializer = ProductSerializer(result_page, many=True)
+        return JSONResponse(envelope('Successfully retrieved all products', {
+            'products': serializer.data,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+        }))
+
+class ProductSearchView(APIView):
+    default_limit = 20
+    max_limit = 100
+
+    @cache_response('product')
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return api_response('Search query is required', {}, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+
+        # Ranked full-text match over name and description
+        products = search_products(query, limit=max(limit, 1))
+        serializer = ProductSerializer(products, many=True)
+
+        return api_response('Successfully searched products', {'products': serializer.data})
+
+class ProductExportView(APIView):
+    permission_classes = [IsAuthenticated]
+    content_types = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+    def get(self, request):
+        # Not "format": DRF reserves that query parameter for renderer selection
+        export_format = request.query_params.get('output', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return api_response(
+                f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}", {}, status.HTTP_400_BAD_REQUEST
+            )
+
+        gzip = request.query_params.get('gzip') in ('1', 'true')
+        filename = f'products.{export_format}' + ('.gz' if gzip else '')
+        response = StreamingHttpResponse(
+            export_chunks(export_format, gzip=gzip),
+            content_type='application/gzip' if gzip else self.content_types[export_format],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class ProductDetailView(ReadReplicaMixin, generics.RetrieveAPIView):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
 
+    @cache_response('product')
     def get(self, request, *args, **kwargs):
         try:
             product = self.get_object()
             serializer = self.get_serializer(product)
-            return Response({
-                'code': 200,
-                'message': 'Successfully retrieved single product',
-                'data': serializer.data,
-                'success': True
-            }, status=status.HTTP_200_OK)
+            return api_response('Successfully retrieved single product', serializer.data)
         except Product.DoesNotExist:
-            return Response({
-                'code': 404,
-                'message': 'Product not found',
-                'data': {},
-                'success': False
-            }, status=status.HTTP_404_NOT_FOUND)
+            return api_response('Product not found', {}, status.HTTP_404_NOT_FOUND)
+
+class AsyncProductDetailView(AsyncAPIView):
+    """ProductDetailView on the async ORM, for ASGI deployments (ASYNC_CATALOG_VIEWS)."""
+
+    @acache_response('product')
+    async def get(self, request, pk):
+        product = await aget_object_or_404(Product, pk=pk)
+        serializer = ProductSerializer(product, context={'request': request})
+        return JSONResponse(envelope('Successfully retrieved single product', serializer.data))
 
 class ProductUpdateView(APIView):
     permission_classes = [IsAuthenticated]
@@ -106,34 +323,16 @@ class ProductUpdateView(APIView):
     def patch(self, request, pk, format=None):
         product = self.get_object(pk)
         if product is None:
-            return Response({
-                "code": 404,
-                "message": "Product not found",
-                "success": False
-            }, status=status.HTTP_404_NOT_FOUND)
+            return api_response("Product not found", code=status.HTTP_404_NOT_FOUND)
 
         if product.created_by != request.user:
-            return Response({
-                "code": 403,
-                "message": "You do not have permission to edit this product.",
-                "success": False
-            }, status=status.HTTP_403_FORBIDDEN)
+            return api_response("You do not have permission to edit this product.", code=status.HTTP_403_FORBIDDEN)
 
         serializer = ProductSerializer(product, data=request.data, partial=True)  # Handle partial updates
         if serializer.is_valid():
             serializer.save()
-            return Response({
-                "code": 200,
-                "message": "Product successfully updated",
-                "data": serializer.data,
-                "success": True
-            }, status=status.HTTP_200_OK)
-        return Response({
-            "code": 400,
-            "message": "Invalid data",
-            "data": serializer.errors,
-            "success": False
-        }, status=status.HTTP_400_BAD_REQUEST)
+            return api_response("Product successfully updated", serializer.data)
+        return api_response("Invalid data", serializer.errors, status.HTTP_400_BAD_REQUEST)
 
 class ProductDeleteView(generics.DestroyAPIView):
     queryset = Product.objects.all()
@@ -144,18 +343,10 @@ class ProductDeleteView(generics.DestroyAPIView):
         try:
             product = self.get_queryset().get(id=product_id, created_by=request.user)
         except Product.DoesNotExist:
-            return Response({
-                "code": 404,
-                "message": "Product not found or you don't have permission to delete it.",
-                "data": {},
-                "success": False
-            }, status=status.HTTP_404_NOT_FOUND)
+            return api_response(
+                "Product not found or you don't have permission to delete it.", {}, status.HTTP_404_NOT_FOUND
+            )
 
         product.delete()
-        return Response({
-            "code": 200,
-            "message": "Product successfully deleted",
-            "data": {},
-            "success": True
-        }, status=status.HTTP_200_OK)
+        return api_response("Product successfully deleted", {})
 
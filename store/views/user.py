@@ -6,8 +6,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from ..serializers import SignupSerializer, UserProfileSerializer
 from rest_framework.permissions import AllowAny
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import transaction
+from ..models import OutboxEmail
+from ..responses import api_response
 
 class SignupView(APIView):
     authentication_classes = []  # Disable authentication for this view
@@ -16,29 +17,18 @@ class SignupView(APIView):
     def post(self, request):
         serializer = SignupSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
+            # The thank you email is queued with the user and sent by the send_outbox worker
+            with transaction.atomic():
+                user = serializer.save()
+                message = "Thank you for signing up to Stephen's Stores"
+                OutboxEmail.objects.enqueue('Thank You for Signing Up', message, [user.email])
 
-            # Send thank you email
-            message = "Thank you for signing up to Stephen's Stores"
-            send_mail(
-                'Thank You for Signing Up',
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                fail_silently=False,
-            )
-
-            return Response({
-                "code": 200,
-                "message": "Successful signup. Thank you for signing up to Stephen's Stores.",
-                "data": {
-                    "name": user.name,
-                    "phone_number": user.phone_number,
-                    "address": user.address,
-                    "email": user.email
-                },
-                "success": True
-            }, status=status.HTTP_200_OK)
+            return api_response("Successful signup. Thank you for signing up to Stephen's Stores.", {
+                "name": user.name,
+                "phone_number": user.phone_number,
+                "address": user.address,
+                "email": user.email
+            })
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -48,32 +38,18 @@ class LoginView(APIView):
         password = request.data.get('password')
 
         if not email or not password:
-            return Response({
-                "code": 400,
-                "message": "Email and password are required",
-                "success": False
-            }, status=status.HTTP_400_BAD_REQUEST)
+            return api_response("Email and password are required", code=status.HTTP_400_BAD_REQUEST)
 
         user = authenticate(email=email, password=password)
 
         if user is None:
-            return Response({
-                "code": 400,
-                "message": "Invalid email or password",
-                "success": False
-            }, status=status.HTTP_400_BAD_REQUEST)
+            return api_response("Invalid email or password", code=status.HTTP_400_BAD_REQUEST)
 
         # Generate JWT token
         refresh = RefreshToken.for_user(user)
         access_token = str(refresh.access_token)
 
-        return Response({
-            "code": 200,
-            "message": "Login successful",
-            "userId": user.id,
-            "token": access_token,
-            "success": True
-        }, status=status.HTTP_200_OK)
+        return api_response("Login successful", userId=user.id, token=access_token)
 
 class ProfileView(APIView):
     permission_classes = [IsAuthenticated]
@@ -82,18 +58,9 @@ class ProfileView(APIView):
         try:
             user = request.user
             serializer = UserProfileSerializer(user)
-            return Response({
-                "code": 200,
-                "message": "Successfully fetched profile",
-                "data": serializer.data,
-                "success": True
-            }, status=status.HTTP_200_OK)
+            return api_response("Successfully fetched profile", serializer.data)
         except Exception as e:
-            return Response({
-                "code": 500,
-                "message": str(e),
-                "success": False
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            return api_response(str(e), code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     def put(self, request):
         try:
@@ -101,21 +68,7 @@ class ProfileView(APIView):
             serializer = UserProfileSerializer(user, data=request.data, partial=True)
             if serializer.is_valid():
                 serializer.save()
-                return Response({
-                    "code": 200,
-                    "message": "Successfully updated user",
-                    "data": serializer.data,
-                    "success": True
-                }, status=status.HTTP_200_OK)
-            return Response({
-                "code": 400,
-                "message": "Invalid data",
-                "errors": serializer.errors,
-                "success": False
-            }, status=status.HTTP_400_BAD_REQUEST)
+                return api_response("Successfully updated user", serializer.data)
+            return api_response("Invalid data", code=status.HTTP_400_BAD_REQUEST, errors=serializer.errors)
         except Exception as e:
-            return Response({
-                "code": 500,
-                "message": str(e),
-                "success": False
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return api_response(str(e), code=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file